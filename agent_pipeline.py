@@ -0,0 +1,130 @@
+"""The optional features every agent script wraps around its agent, action handler and screenshots.
+
+Each is enabled with its own environment variable (see README): settle
+detection (FREECAD_AGENT_SETTLE), action coalescing (FREECAD_AGENT_COALESCE),
+screenshot preprocessing (FREECAD_AGENT_IMAGE_PIPELINE), trajectory replay
+(FREECAD_AGENT_TRAJECTORY_CACHE), screenshot prefetching
+(FREECAD_AGENT_PREFETCH), stuck detection (FREECAD_AGENT_STUCK), todo budgets
+(FREECAD_AGENT_BUDGET), binary traces (FREECAD_AGENT_TRACE). Checkpoints and
+latency recording are always on.
+"""
+
+import contextlib
+import os
+
+from agent_trace import maybe_trace
+from checkpoint import attach_checkpoint
+from coalesce import maybe_coalesce
+from image_pipeline import maybe_preprocess
+from latency import LatencyRecorder
+from prefetch import maybe_prefetch
+from settle import maybe_settle
+from stuck_detector import detect_stuck
+from todo_budget import maybe_budget
+from trajectory_cache import TrajectoryCache, maybe_cache
+
+
+class AgentPipeline:
+    """What build_pipeline() attached: pass ``action_handler`` and ``image_provider`` to agent.execute()."""
+
+    def __init__(self, agent, action_handler, image_provider, checkpoint, trace, stuck, budget, latency,
+                 installed=None):
+        self.agent = agent
+        self.action_handler = action_handler
+        self.image_provider = image_provider
+        self.checkpoint = checkpoint
+        self.trace = trace
+        self.stuck = stuck
+        self.budget = budget
+        self.latency = latency
+        self._installed = installed or contextlib.ExitStack()
+
+    @property
+    def abandoned(self):
+        """(todo number, description, reason) of the todos the stuck detector or a budget abandoned."""
+        return sorted((self.stuck.abandoned if self.stuck else []) + (self.budget.abandoned if self.budget else []))
+
+    def outcome(self, success):
+        """Describe the run from agent.execute()'s result.
+
+        An abandoned todo makes agent.execute() return False even when the
+        run carried on to the end, so that case is reported as partial.
+
+        Returns:
+            'completed', 'partial (N of M todos abandoned)' or 'failed'
+        """
+        if success:
+            return 'completed'
+        abandoned = self.abandoned
+        todos = self.agent.get_memory().todos
+        if abandoned and all(todo.status.value in ('completed', 'skipped') for todo in todos):
+            return f"partial ({len(abandoned)} of {len(todos)} todos abandoned)"
+        return 'failed'
+
+    def print_hint(self):
+        """Tell the user how to resume after an interruption."""
+        self.checkpoint.print_hint()
+
+    def print_summary(self, *components):
+        """Print the summaries of the wrappers, then of any extra components (e.g. the observer queue)."""
+        for component in (self.action_handler, self.image_provider) + components:
+            if hasattr(component, 'print_summary'):
+                component.print_summary()
+        self.latency.print_report()
+        if self.stuck:
+            self.stuck.print_summary()
+        if self.budget:
+            self.budget.print_summary()
+
+    def close(self):
+        """Undo the patches made for the run (the trajectory cache's actor) and finish the trace."""
+        self._installed.close()
+        if self.trace:
+            self.trace.close()
+
+
+def build_pipeline(agent, definition=None, action_handler=None, image_provider=None,
+                   directory=None, verbose=True):
+    """Attach the checkpoint, trace and optional wrappers to an agent.
+
+    Call after the agent's step_observer and task are set.
+
+    Args:
+        agent: The TaskerAgent to run
+        definition: Task definition from task_defs.load_task() (for its todo budgets)
+        action_handler: Defaults to AsyncPyautoguiActionHandler (needs a display)
+        image_provider: Defaults to AsyncScreenshotMaker
+        directory: Keep the checkpoint and trace in this directory (batch jobs)
+        verbose: Let the wrappers print a line per intervention
+
+    Returns:
+        AgentPipeline
+    """
+    if action_handler is None:
+        from oagi import AsyncPyautoguiActionHandler
+
+        action_handler = AsyncPyautoguiActionHandler()
+    if image_provider is None:
+        from oagi import AsyncScreenshotMaker
+
+        image_provider = AsyncScreenshotMaker()
+
+    # Save progress at each todo boundary; --resume continues from the last checkpoint
+    checkpoint_path = os.path.join(directory, 'checkpoint.json') if directory else None
+    checkpoint = attach_checkpoint(agent, path=checkpoint_path, verbose=verbose)
+    trace = maybe_trace(agent, directory=directory)
+
+    action_handler = maybe_settle(maybe_coalesce(action_handler, agent), verbose=verbose)
+    image_provider = maybe_preprocess(image_provider, action_handler)
+    image_provider = maybe_cache(image_provider, agent)
+    # Undone by AgentPipeline.close()
+    installed = contextlib.ExitStack()
+    if isinstance(image_provider, TrajectoryCache):
+        installed.enter_context(image_provider.installed())
+    action_handler, image_provider = maybe_prefetch(action_handler, image_provider)
+    stuck = detect_stuck(agent, verbose=verbose)
+    budget = maybe_budget(agent, (definition or {}).get('budgets'), verbose=verbose)
+    latency = LatencyRecorder(agent)
+    action_handler, image_provider = latency.instrument(action_handler, image_provider)
+    return AgentPipeline(agent, action_handler, image_provider, checkpoint, trace, stuck, budget, latency,
+                         installed)
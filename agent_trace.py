@@ -0,0 +1,683 @@
+#!/usr/bin/env python3
+"""Compact, indexed binary traces of agent runs.
+
+A trace is one append-only file:
+
+    header     magic, version
+    chunks     'B' image blob: sha256 digest + encoded image bytes (each image stored once)
+               'R' event record: fixed 60-byte layout + JSON of the text fields
+    index      record offsets (u64 each), then blob entries sorted by digest
+    trailer    index offset, record count, blob count, magic
+
+The index and trailer are written on close. A trace that was never closed
+(crash, kill) is still readable: the reader rebuilds the index by walking
+the chunks, and ``TraceWriter(path, append=True)`` continues it.
+
+Usage:
+    python agent_trace.py convert freecad_execution_log.md run.trace
+    python agent_trace.py info run.trace
+    python agent_trace.py show run.trace 42
+    python agent_trace.py show run.trace 3 --step --todo 2
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+from datetime import datetime
+
+from observer_base import ObserverWrapper
+from progress import ProgressTracker
+from streaming_export import _image_bytes, event_record
+from todo_ops import is_todo_end, todo_number
+
+# Record every event of a script's run to this trace file
+TRACE_ENV = "FREECAD_AGENT_TRACE"
+
+MAGIC = b"FCTRACE1"
+INDEX_MAGIC = b"FCTRIDX1"
+VERSION = 1
+
+HEADER = struct.Struct('<8sH6x')          # magic, version
+CHUNK = struct.Struct('<cI')              # tag, payload length
+RECORD = struct.Struct('<IBBHdii32sI')    # seq, type, flags, actions, time, step_num, todo, digest, text length
+BLOB_ENTRY = struct.Struct('<32sQI')      # digest, data offset, data length
+TRAILER = struct.Struct('<QII8s')         # index offset, records, blobs, magic
+
+BLOB = b'B'
+RECORD_TAG = b'R'
+
+EVENT_TYPES = ('StepEvent', 'ActionEvent', 'LogEvent', 'SplitEvent', 'PlanEvent', 'ImageEvent')
+TYPE_CODES = {name: code for code, name in enumerate(EVENT_TYPES, 1)}
+
+FLAG_STOP = 1
+FLAG_ERROR = 2
+FLAG_IMAGE = 4
+
+NO_DIGEST = bytes(32)
+
+# Stored in the fixed layout, so left out of the JSON text
+FIXED_FIELDS = ('seq', 'type', 'time', 'step_num')
+
+
+class TraceWriter:
+    """Appends events to a trace file.
+
+    ``write(event)`` has the same shape as StreamingExporter.write, so any
+    observer that feeds an exporter can feed a trace. Screenshots are
+    stored once per distinct content.
+    """
+
+    def __init__(self, path, append=False):
+        """Open a trace for writing.
+
+        Args:
+            path: Trace file path
+            append: Continue an existing trace instead of starting a new one
+        """
+        self.path = path
+        self.offsets = []
+        self.blobs = {}
+        self.images_deduplicated = 0
+
+        if append and os.path.exists(path) and os.path.getsize(path) > 0:
+            with TraceReader(path) as reader:
+                self.offsets = list(reader.offsets)
+                self.blobs = dict(reader.blob_table())
+                end = reader.data_end
+            self._file = open(path, 'r+b')
+            self._file.truncate(end)
+            self._file.seek(end)
+        else:
+            self._file = open(path, 'w+b')
+            self._file.write(HEADER.pack(MAGIC, VERSION))
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def _chunk(self, tag, *parts):
+        """Append one chunk and return the offset of its payload."""
+        length = sum(len(part) for part in parts)
+        offset = self._file.tell() + CHUNK.size
+        self._file.write(CHUNK.pack(tag, length))
+        for part in parts:
+            self._file.write(part)
+        return offset
+
+    def add_image(self, data):
+        """Store image bytes unless identical ones are stored already.
+
+        Returns:
+            The sha256 digest that records refer to
+        """
+        digest = hashlib.sha256(data).digest()
+        if digest in self.blobs:
+            self.images_deduplicated += 1
+        else:
+            offset = self._chunk(BLOB, digest, data)
+            self.blobs[digest] = (offset + len(digest), len(data))
+        return digest
+
+    def write(self, event, todo_index=-1, extra=None):
+        """Append an observer event, with optional extra text fields."""
+        image = _image_bytes(vars(event).get('image'))
+        fields = event_record(event, len(self.offsets) + 1)
+        if extra:
+            fields.update(extra)
+        self.write_fields(type(event).__name__, event.timestamp.timestamp(), fields, image, todo_index)
+
+    def write_fields(self, event_type, timestamp, fields, image=None, todo_index=-1):
+        """Append a record from already extracted fields.
+
+        Args:
+            event_type: Event class name (StepEvent, ActionEvent, ...)
+            timestamp: POSIX time of the event
+            fields: Text fields as built by streaming_export.event_record
+            image: Encoded screenshot bytes, if any
+            todo_index: Index of the todo the event belongs to (-1 if unknown)
+        """
+        digest = self.add_image(image) if image else NO_DIGEST
+        flags = (FLAG_STOP if fields.get('stop') else 0) | (FLAG_ERROR if fields.get('error') else 0)
+        if image:
+            flags |= FLAG_IMAGE
+        step_num = fields.get('step_num')
+        text = json.dumps({k: v for k, v in fields.items() if k not in FIXED_FIELDS},
+                          default=str, separators=(',', ':')).encode()
+        record = RECORD.pack(
+            len(self.offsets) + 1, TYPE_CODES.get(event_type, 0), flags,
+            min(len(fields.get('actions', ())), 0xFFFF), timestamp,
+            -1 if step_num is None else step_num, -1 if todo_index is None else todo_index,
+            digest, len(text),
+        )
+        self.offsets.append(self._chunk(RECORD_TAG, record, text))
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        """Write the index and trailer and close the file."""
+        if self._file.closed:
+            return
+        index_offset = self._file.tell()
+        self._file.write(struct.pack(f'<{len(self.offsets)}Q', *self.offsets))
+        for digest in sorted(self.blobs):
+            offset, length = self.blobs[digest]
+            self._file.write(BLOB_ENTRY.pack(digest, offset, length))
+        self._file.write(TRAILER.pack(index_offset, len(self.offsets), len(self.blobs), INDEX_MAGIC))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class TraceRecord:
+    """One event record, decoded from the fixed layout on access.
+
+    The JSON text fields are only parsed when ``fields()`` is called.
+    """
+
+    __slots__ = ('reader', 'seq', 'type_code', 'flags', 'action_count', 'timestamp',
+                 'step_num', 'todo_index', 'digest', '_text', '_fields')
+
+    def __init__(self, reader, offset):
+        (self.seq, self.type_code, self.flags, self.action_count, self.timestamp,
+         self.step_num, self.todo_index, self.digest, length) = RECORD.unpack_from(reader.buffer, offset)
+        start = offset + RECORD.size
+        self.reader = reader
+        self._text = reader.buffer[start:start + length]
+        self._fields = None
+
+    @property
+    def event_type(self):
+        return EVENT_TYPES[self.type_code - 1] if 0 < self.type_code <= len(EVENT_TYPES) else 'Unknown'
+
+    @property
+    def stop(self):
+        return bool(self.flags & FLAG_STOP)
+
+    @property
+    def error(self):
+        return bool(self.flags & FLAG_ERROR)
+
+    @property
+    def time(self):
+        return datetime.fromtimestamp(self.timestamp)
+
+    def fields(self):
+        """Text fields (reason, actions, message, label, ...) as a dict."""
+        if self._fields is None:
+            self._fields = json.loads(bytes(self._text))
+        return self._fields
+
+    def image(self):
+        """Screenshot bytes as a zero-copy memoryview, or None."""
+        if not self.flags & FLAG_IMAGE:
+            return None
+        return self.reader.image(self.digest)
+
+    def __repr__(self):
+        return f"<TraceRecord #{self.seq} {self.event_type} step={self.step_num} todo={self.todo_index}>"
+
+
+class TraceReader:
+    """Memory-mapped, random-access view of a trace file.
+
+    ``reader[i]`` decodes record i straight from the mapping; images are
+    returned as memoryviews into it. Call ``close()`` (or use ``with``)
+    only after dropping those views, or copy them with ``bytes()``.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.buffer = memoryview(self._mmap)
+        magic, version = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an agent trace")
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported trace version {version}")
+
+        self._steps = None
+        self._step_numbers = None
+        self._blob_dict = None
+        if not self._load_index():
+            self._scan()
+
+    def _load_index(self):
+        """Use the index written on close; False if there is none."""
+        size = len(self.buffer)
+        if size < HEADER.size + TRAILER.size:
+            return False
+        index_offset, records, blobs, magic = TRAILER.unpack_from(self.buffer, size - TRAILER.size)
+        if magic != INDEX_MAGIC:
+            return False
+        self.data_end = index_offset
+        end = index_offset + records * 8
+        self.offsets = self.buffer[index_offset:end].cast('Q')
+        self._blob_entries = self.buffer[end:end + blobs * BLOB_ENTRY.size]
+        self._blob_count = blobs
+        return True
+
+    def _scan(self):
+        """Rebuild the index from the chunks of an unclosed trace."""
+        offsets = []
+        blobs = {}
+        position = HEADER.size
+        size = len(self.buffer)
+        while position + CHUNK.size <= size:
+            tag, length = CHUNK.unpack_from(self.buffer, position)
+            payload = position + CHUNK.size
+            if payload + length > size or tag not in (BLOB, RECORD_TAG):
+                break   # torn write at the end
+            if tag == BLOB:
+                digest = bytes(self.buffer[payload:payload + 32])
+                blobs[digest] = (payload + 32, length - 32)
+            else:
+                offsets.append(payload)
+            position = payload + length
+        self.data_end = position
+        self.offsets = offsets
+        self._blob_dict = blobs
+        self._blob_entries = None
+        self._blob_count = len(blobs)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        return TraceRecord(self, self.offsets[index])
+
+    def __iter__(self):
+        for offset in self.offsets:
+            yield TraceRecord(self, offset)
+
+    def steps(self):
+        """Record indices of the StepEvents, in order."""
+        if self._steps is None:
+            code = TYPE_CODES['StepEvent']
+            # The type byte sits right after the 4-byte sequence number
+            self._steps = [i for i, offset in enumerate(self.offsets) if self.buffer[offset + 4] == code]
+        return self._steps
+
+    def step(self, n, todo=None):
+        """The StepEvent record for 'Step N' in the markdown logs.
+
+        Step numbers restart with each todo, so pass ``todo`` (1-based) unless
+        n only occurs once in the run.
+
+        Raises:
+            IndexError: No step has that number (in that todo)
+            ValueError: More than one step has it; the message lists their record numbers
+        """
+        if self._step_numbers is None:
+            numbers = {}
+            for i in self.steps():
+                # step_num and todo follow seq, type, flags, actions and time
+                step_num, todo_index = struct.unpack_from('<ii', self.buffer, self.offsets[i] + 16)
+                numbers.setdefault((todo_index, step_num), []).append(i)
+            self._step_numbers = numbers
+        if todo is not None:
+            matches = self._step_numbers.get((todo - 1, n), [])
+        else:
+            matches = [i for (_, step_num), indices in self._step_numbers.items() if step_num == n for i in indices]
+        where = f" in todo {todo}" if todo is not None else ""
+        if not matches:
+            raise IndexError(f"step {n}{where}")
+        if len(matches) > 1:
+            records = ', '.join(f"#{i + 1}" for i in sorted(matches))
+            raise ValueError(f"step {n}{where} is ambiguous: records {records}")
+        return self[matches[0]]
+
+    def image(self, digest):
+        """Image bytes for a digest as a memoryview, or None."""
+        if self._blob_dict is not None:
+            entry = self._blob_dict.get(bytes(digest))
+        else:
+            entry = self._find_blob(bytes(digest))
+        if entry is None:
+            return None
+        offset, length = entry
+        return self.buffer[offset:offset + length]
+
+    def _find_blob(self, digest):
+        """Binary search of the sorted blob entries."""
+        low, high = 0, self._blob_count
+        while low < high:
+            middle = (low + high) // 2
+            key, offset, length = BLOB_ENTRY.unpack_from(self._blob_entries, middle * BLOB_ENTRY.size)
+            if key == digest:
+                return offset, length
+            if key < digest:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def blob_table(self):
+        """Yield (digest, (offset, length)) for every stored image."""
+        if self._blob_dict is not None:
+            yield from self._blob_dict.items()
+            return
+        for i in range(self._blob_count):
+            digest, offset, length = BLOB_ENTRY.unpack_from(self._blob_entries, i * BLOB_ENTRY.size)
+            yield digest, (offset, length)
+
+    @property
+    def image_count(self):
+        return self._blob_count
+
+    def close(self):
+        if isinstance(self.offsets, memoryview):
+            self.offsets.release()
+        if self._blob_entries is not None:
+            self._blob_entries.release()
+        self.buffer.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def trace_paths(arguments):
+    """Expand directories to the *.trace files inside them."""
+    paths = []
+    for argument in arguments:
+        if os.path.isdir(argument):
+            paths.extend(sorted(glob.glob(os.path.join(argument, '**', '*.trace'), recursive=True)))
+        else:
+            paths.append(argument)
+    return paths
+
+
+class TraceRecorder(ObserverWrapper):
+    """step_observer wrapper that records every event to a trace.
+
+    Works in front of any AsyncAgentObserver subclass (or none); events
+    are recorded before the wrapped observer sees them, with the todo
+    index they belong to. Todo boundaries also record the length of the
+    todo list and, at the end of a todo, its status; the first one records
+    the task and script, for trace_analytics.py.
+    """
+
+    def __init__(self, agent, path, append=False):
+        """Wrap the agent's step_observer.
+
+        Args:
+            agent: TaskerAgent whose step_observer is wrapped (set the observer first)
+            path: Trace file path
+            append: Continue an existing trace (e.g. with --resume)
+        """
+        self.agent = agent
+        self.wrap(agent)
+        self.writer = TraceWriter(path, append=append)
+        self.progress = ProgressTracker(agent)
+        self._started = False
+
+    async def on_event(self, event):
+        self.progress.update(event)
+        extra = self._split_fields(event) if type(event).__name__ == 'SplitEvent' else None
+        self.writer.write(event, self.progress.index, extra)
+        await self.forward(event)
+
+    def _split_fields(self, event):
+        """Todo list state at a todo boundary."""
+        fields = {'todos': self.progress.total}
+        if not self._started:
+            self._started = True
+            fields['task'] = self.agent.get_memory().task_description
+            fields['script'] = os.path.basename(sys.argv[0])
+        todos = self.agent.get_memory().todos
+        if is_todo_end(event.label) and 0 <= self.progress.index < len(todos):
+            fields['status'] = todos[self.progress.index].status.value
+        return fields
+
+    def close(self):
+        """Write the trace index."""
+        self.writer.close()
+        print(f"Trace written to {self.writer.path}: {len(self.writer)} events, "
+              f"{len(self.writer.blobs)} images ({self.writer.images_deduplicated} duplicates skipped)")
+
+
+def maybe_trace(agent, append=None, directory=None):
+    """Record a trace to FREECAD_AGENT_TRACE when it is set.
+
+    Args:
+        agent: TaskerAgent whose step_observer is wrapped
+        append: Continue the existing trace (defaults to '--resume' in sys.argv)
+        directory: Write the trace file here instead (batch jobs each get their own)
+
+    Returns:
+        The TraceRecorder, or None
+    """
+    path = os.environ.get(TRACE_ENV, "").strip()
+    if not path:
+        return None
+    if directory is not None:
+        path = os.path.join(directory, os.path.basename(path))
+    if append is None:
+        append = '--resume' in sys.argv[1:]
+    return TraceRecorder(agent, path, append=append)
+
+
+_STEP = re.compile(r"^## Step (\d+)$")
+_ACTIONS = re.compile(r"^### Actions Executed \((\d\d:\d\d:\d\d)\)$")
+_PLAN = re.compile(r"^### (Initial Planning|Reflection|Summary) \((\d\d:\d\d:\d\d)\)$")
+_LOG = re.compile(r"^> \*\*Log \((\d\d:\d\d:\d\d)\):\*\* (.*)$")
+_TIME = re.compile(r"^\*\*Time:\*\* (\d\d:\d\d:\d\d)$")
+_ACTION = re.compile(r"^- `(\w+)`: (.*?)(?: \(x(\d+)\))?$")
+_IMAGE = re.compile(r"^!\[[^\]]*\]\(([^)]+)\)$")
+
+PHASES = {'Initial Planning': 'initial', 'Reflection': 'reflection', 'Summary': 'summary'}
+
+
+def parse_markdown(path):
+    """Read events back from a markdown export (oagi's or StreamingExporter's).
+
+    The export only keeps clock times, so the date is taken from the
+    file's modification time.
+
+    Yields:
+        (event_type, timestamp, fields, image_path) tuples
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    day = datetime.fromtimestamp(os.path.getmtime(path)).date()
+
+    def stamp(clock):
+        return datetime.combine(day, datetime.strptime(clock, "%H:%M:%S").time()).timestamp()
+
+    with open(path) as f:
+        lines = f.read().split('\n')
+
+    current = None
+    text_field = None
+    last_step = None
+
+    def finish():
+        if current is not None:
+            event_type, timestamp, fields, image = current
+            for key in ('reason', 'reasoning'):
+                if key in fields:
+                    fields[key] = fields[key].strip()
+            return event_type, timestamp, fields, image
+        return None
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        i += 1
+        header = None
+        if match := _STEP.match(line):
+            header = ('StepEvent', None, {'step_num': int(match.group(1)), 'stop': False, 'actions': []}, None)
+        elif match := _ACTIONS.match(line):
+            # The export leaves out what was executed; it is the preceding step's plan
+            fields = {'step_num': last_step['step_num'], 'actions': last_step['actions']} if last_step else {}
+            header = ('ActionEvent', stamp(match.group(1)), fields, None)
+        elif match := _PLAN.match(line):
+            header = ('PlanEvent', stamp(match.group(2)), {'phase': PHASES[match.group(1)]}, None)
+        elif match := _LOG.match(line):
+            header = ('LogEvent', None, {'message': match.group(2)}, None)
+            log_time = stamp(match.group(1))
+        elif line == '---':
+            label = ''
+            if i + 1 < len(lines) and lines[i] == '' and lines[i + 1].startswith('### ') \
+                    and not _ACTIONS.match(lines[i + 1]) and not _PLAN.match(lines[i + 1]):
+                label = lines[i + 1][4:]
+                i += 2
+            header = ('SplitEvent', None, {'label': label}, None)
+
+        if header is not None:
+            done = finish()
+            if done:
+                yield done
+            event_type, timestamp, fields, image = header
+            if event_type == 'LogEvent':
+                timestamp = log_time
+            elif event_type == 'SplitEvent' and is_todo_end(fields['label']) and current is not None:
+                timestamp = current[1]
+            current = [event_type, timestamp, fields, image]
+            if event_type == 'StepEvent':
+                last_step = fields
+            text_field = None
+            continue
+        if current is None:
+            continue
+
+        fields = current[2]
+        if match := _TIME.match(line):
+            current[1] = stamp(match.group(1))
+        elif line.startswith('**Task ID:** `'):
+            fields['task_id'] = line[len('**Task ID:** `'):].rstrip('`')
+        elif line.startswith('**Request ID:** `'):
+            fields['request_id'] = line[len('**Request ID:** `'):].rstrip('`')
+        elif line.startswith('**Screenshot URL:** '):
+            fields['image'] = line[len('**Screenshot URL:** '):]
+        elif match := _IMAGE.match(line):
+            current[3] = os.path.join(base, match.group(1))
+        elif line == '**Reasoning:**':
+            text_field = 'reason' if current[0] == 'StepEvent' else 'reasoning'
+            fields[text_field] = ''
+        elif line == '**Planned Actions:**':
+            text_field = None
+        elif current[0] == 'StepEvent' and (match := _ACTION.match(line)):
+            count = int(match.group(3)) if match.group(3) else 1
+            fields['actions'].append({'type': match.group(1), 'argument': match.group(2), 'count': count})
+        elif line == '**Status:** Task Complete':
+            fields['stop'] = True
+        elif line.startswith('**Error:** '):
+            fields['error'] = line[len('**Error:** '):]
+        elif line.startswith('**Result:** '):
+            if current[0] == 'PlanEvent':
+                fields['result'] = line[len('**Result:** '):]
+            text_field = None
+        elif text_field is not None:
+            text = line[2:] if line.startswith('> ') and not fields[text_field] else line
+            fields[text_field] += text + '\n'
+
+    done = finish()
+    if done:
+        yield done
+
+
+def convert_markdown(md_path, trace_path):
+    """Convert a markdown export and its images folder into a trace.
+
+    Returns:
+        Number of records written
+    """
+    events = list(parse_markdown(md_path))
+    # Start-of-todo markers carry no time of their own: use the next event's
+    times = [timestamp for _, timestamp, _, _ in events]
+    following = None
+    for i in range(len(times) - 1, -1, -1):
+        if times[i] is None:
+            times[i] = following
+        following = times[i]
+    previous = 0.0
+    for i, timestamp in enumerate(times):
+        times[i] = previous = timestamp if timestamp is not None else previous
+
+    todo_index = -1
+    with TraceWriter(trace_path) as writer:
+        for (event_type, _, fields, image_path), timestamp in zip(events, times):
+            if event_type == 'SplitEvent' and (number := todo_number(fields.get('label'))) is not None:
+                todo_index = number - 1
+            image = None
+            if image_path and os.path.exists(image_path):
+                with open(image_path, 'rb') as f:
+                    image = f.read()
+            writer.write_fields(event_type, timestamp, fields, image, todo_index)
+        return len(writer)
+
+
+def _print_info(reader):
+    counts = {}
+    for record in reader:
+        counts[record.event_type] = counts.get(record.event_type, 0) + 1
+    size = os.path.getsize(reader.path)
+    print(f"{reader.path}: {len(reader)} records, {reader.image_count} images, {size / 1e6:.1f} MB")
+    for event_type, count in sorted(counts.items()):
+        print(f"  {event_type:<12}{count:>8}")
+
+
+def _print_record(record):
+    print(f"#{record.seq} {record.event_type} at {record.time:%Y-%m-%d %H:%M:%S} "
+          f"step={record.step_num} todo={record.todo_index + 1 if record.todo_index >= 0 else '-'}")
+    for key, value in record.fields().items():
+        print(f"  {key}: {value}")
+    image = record.image()
+    if image is not None:
+        print(f"  image: {len(image)} bytes ({record.digest.hex()[:16]})")
+        image.release()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    convert = commands.add_parser('convert', help="convert a markdown export to a trace")
+    convert.add_argument('markdown')
+    convert.add_argument('trace')
+    info = commands.add_parser('info', help="summarise a trace")
+    info.add_argument('trace')
+    show = commands.add_parser('show', help="print one record")
+    show.add_argument('trace')
+    show.add_argument('index', type=int, help="record number (1-based)")
+    show.add_argument('--step', action='store_true', help="treat index as a step number (the record's step field)")
+    show.add_argument('--todo', type=int, help="with --step, the todo (1-based) the step belongs to")
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        count = convert_markdown(args.markdown, args.trace)
+        print(f"Wrote {count} records to {args.trace}")
+        return 0
+    with TraceReader(args.trace) as reader:
+        if args.command == 'info':
+            _print_info(reader)
+        else:
+            try:
+                record = reader.step(args.index, args.todo) if args.step else reader[args.index - 1]
+            except IndexError as e:
+                print(f"No such step: {e}" if args.step else f"No such record: {args.index}", file=sys.stderr)
+                return 1
+            except ValueError as e:
+                print(f"{e.args[0].capitalize()}; pass --todo or use a record number", file=sys.stderr)
+                return 1
+            _print_record(record)
+            del record
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
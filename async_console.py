@@ -0,0 +1,68 @@
+"""Non-blocking stdin command reader for asyncio programs."""
+
+import asyncio
+import sys
+import threading
+
+
+class AsyncConsole:
+    """Reads stdin lines on a background thread and queues them for the event loop.
+
+    Lines typed at any time are queued, so operators can enter commands
+    ahead of the next step without ever blocking the agent's event loop.
+    """
+
+    def __init__(self, stream=None):
+        """Create the console.
+
+        Args:
+            stream: Text stream to read lines from (defaults to sys.stdin)
+        """
+        self.stream = stream or sys.stdin
+        self.queue = asyncio.Queue()
+        self.closed = False
+        self._thread = None
+
+    def start(self):
+        """Start the reader thread (call from inside the running event loop)."""
+        if self._thread is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._thread = threading.Thread(target=self._read_lines, args=(loop,), daemon=True)
+        self._thread.start()
+
+    def _read_lines(self, loop):
+        """Forward every stdin line to the queue; None marks end of input."""
+        for line in self.stream:
+            loop.call_soon_threadsafe(self.queue.put_nowait, line.rstrip("\n"))
+        loop.call_soon_threadsafe(self.queue.put_nowait, None)
+
+    def pending(self):
+        """Return all commands queued so far without waiting."""
+        commands = []
+        while not self.queue.empty():
+            line = self.queue.get_nowait()
+            if line is None:
+                self.closed = True
+            else:
+                commands.append(line)
+        return commands
+
+    async def read(self, timeout=None):
+        """Wait for the next command.
+
+        Args:
+            timeout: Seconds to wait before giving up (None waits forever)
+
+        Returns:
+            The command line, or None on timeout or end of input
+        """
+        if self.closed:
+            return None
+        try:
+            line = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if line is None:
+            self.closed = True
+        return line
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""Run many FreeCAD agent jobs in parallel, each on its own virtual display.
+
+Every worker process owns one Xvfb display. For each job it starts a fresh
+FreeCAD on that display, runs a TaskerAgent whose screenshot maker and
+action handler are bound to it, and then closes FreeCAD. Job output goes to
+<out>/<job id>/; per-job results are collected in <out>/results.jsonl.
+
+Job file: one JSON object per line:
+    {"id": "cube", "task": "...", "todos": ["...", ...],
+     "instruction": "...", "max_steps": 100, "step_delay": 1.0, "timeout": 1800}
+"task_def": "<name>" takes task, instruction and todos from tasks/<name>.json
+(keys given in the job override it).
+
+Usage:
+    python batch_runner.py batch_jobs.example.jsonl --workers 4
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from task_defs import load_task
+
+DEFAULT_INSTRUCTION = "Use FreeCAD to make a part with PartDesign workbench"
+
+# Display owned by this worker process, set by _init_worker
+_display = None
+
+
+def load_jobs(path):
+    """Read job specs, giving each an id if it has none."""
+    jobs = []
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            spec = json.loads(line)
+            if 'task_def' in spec:
+                spec = {**load_task(spec['task_def']), **spec}
+            if 'task' not in spec or not spec.get('todos'):
+                raise ValueError(f"{path}:{number}: job needs 'task' and 'todos'")
+            spec.setdefault('id', f"job{number:03d}")
+            jobs.append(spec)
+    return jobs
+
+
+def start_display(xvfb, number, screen, timeout=10.0):
+    """Start Xvfb on :number and wait until it accepts connections."""
+    process = subprocess.Popen(
+        [xvfb, f":{number}", "-screen", "0", screen, "-nolisten", "tcp"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    socket_path = f"/tmp/.X11-unix/X{number}"
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(socket_path):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise RuntimeError(f"Xvfb failed to start on :{number}")
+        time.sleep(0.1)
+    return process
+
+
+def stop_process(process, timeout=10.0):
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def _init_worker(displays):
+    """Claim a display for this worker before anything imports pyautogui."""
+    global _display
+    _display = displays.get()
+    os.environ['DISPLAY'] = f":{_display}"
+
+
+async def _run_agent(spec, job_dir):
+    """Run one job's TaskerAgent on this worker's display."""
+    # pyautogui reads DISPLAY on import, so these come after _init_worker
+    from oagi import TaskerAgent
+    from oagi.agent.tasker.models import TodoStatus
+
+    from agent_pipeline import build_pipeline
+    from observer_base import JsonlSink, ObserverBase
+    from streaming_export import StreamingExporter
+
+    agent = TaskerAgent(model=spec.get('model', "lux-thinker-1"))
+    agent.step_delay = spec.get('step_delay', 1.0)
+    agent.max_steps = spec.get('max_steps', 100)
+    agent.set_task(task=spec['task'], todos=spec['todos'])
+
+    exporter = StreamingExporter(os.path.join(job_dir, 'execution_log.md'), os.path.join(job_dir, 'images'))
+    observer = ObserverBase(agent, sinks=[JsonlSink(os.path.join(job_dir, 'steps.jsonl'))], exporter=exporter)
+    agent.step_observer = observer
+    # Same wrappers as the scripts; checkpoint and trace go to the job directory
+    pipeline = build_pipeline(agent, spec, directory=job_dir, verbose=False)
+
+    try:
+        success = await asyncio.wait_for(
+            agent.execute(
+                instruction=spec.get('instruction', DEFAULT_INSTRUCTION),
+                action_handler=pipeline.action_handler,
+                image_provider=pipeline.image_provider,
+            ),
+            spec.get('timeout'),
+        )
+    finally:
+        pipeline.close()
+        exporter.close()
+        observer.close_sinks()
+
+    todos = agent.get_memory().todos
+    completed = sum(1 for todo in todos if todo.status == TodoStatus.COMPLETED)
+    return {'success': success, 'outcome': pipeline.outcome(success), 'abandoned': len(pipeline.abandoned),
+            'events': observer.step_count, 'todos_completed': completed, 'todos_total': len(todos)}
+
+
+def run_job(spec, out_dir, freecad, startup_wait):
+    """Worker entry point: run one job against a fresh FreeCAD."""
+    job_dir = os.path.join(out_dir, spec['id'])
+    os.makedirs(job_dir, exist_ok=True)
+    result = {'id': spec['id'], 'display': f":{_display}", 'success': False}
+    start = time.monotonic()
+
+    with open(os.path.join(job_dir, 'agent.log'), 'w', buffering=1) as log:
+        app = subprocess.Popen(shlex.split(freecad), stdout=log, stderr=subprocess.STDOUT)
+        try:
+            time.sleep(startup_wait)
+            if app.poll() is not None:
+                raise RuntimeError(f"FreeCAD exited with status {app.returncode}")
+            with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+                result.update(asyncio.run(_run_agent(spec, job_dir)))
+        except asyncio.TimeoutError:
+            result['error'] = f"timed out after {spec.get('timeout')}s"
+        except Exception as e:
+            result['error'] = f"{type(e).__name__}: {e}"
+        finally:
+            stop_process(app)
+
+    result['seconds'] = round(time.monotonic() - start, 1)
+    result['log'] = os.path.join(job_dir, 'agent.log')
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('jobs', help="JSONL file of job specs")
+    parser.add_argument('--workers', type=int, default=2, help="parallel displays / agents")
+    parser.add_argument('--out', default='batch_runs', help="output directory")
+    parser.add_argument('--freecad', default='freecad', help="command that starts FreeCAD")
+    parser.add_argument('--startup-wait', type=float, default=15.0, help="seconds to let FreeCAD open")
+    parser.add_argument('--xvfb', default='Xvfb', help="Xvfb executable")
+    parser.add_argument('--screen', default='1920x1080x24', help="virtual screen geometry")
+    parser.add_argument('--base-display', type=int, default=100, help="first display number")
+    args = parser.parse_args()
+
+    if not shutil.which(args.xvfb):
+        sys.exit(f"{args.xvfb} not found; install Xvfb (e.g. apt install xvfb)")
+
+    jobs = load_jobs(args.jobs)
+    workers = max(1, min(args.workers, len(jobs)))
+    os.makedirs(args.out, exist_ok=True)
+
+    context = multiprocessing.get_context('spawn')
+    displays = context.Queue()
+    servers = []
+    results = []
+    results_path = os.path.join(args.out, 'results.jsonl')
+    try:
+        for i in range(workers):
+            number = args.base_display + i
+            servers.append(start_display(args.xvfb, number, args.screen))
+            displays.put(number)
+        print(f"Running {len(jobs)} jobs on {workers} displays (:{args.base_display}-:{args.base_display + workers - 1})")
+
+        with open(results_path, 'w') as results_file, ProcessPoolExecutor(
+            workers, mp_context=context, initializer=_init_worker, initargs=(displays,)
+        ) as pool:
+            futures = {
+                pool.submit(run_job, spec, args.out, args.freecad, args.startup_wait): spec['id']
+                for spec in jobs
+            }
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {'id': futures[future], 'success': False, 'error': f"worker failed: {e}"}
+                results.append(result)
+                results_file.write(json.dumps(result) + "\n")
+                results_file.flush()
+                status = "OK  " if result['success'] else "PART" if result.get('abandoned') else "FAIL"
+                detail = result.get('error') or f"{result.get('todos_completed')}/{result.get('todos_total')} todos"
+                if result.get('abandoned'):
+                    detail += f", {result['abandoned']} abandoned"
+                print(f"[{status}] {result['id']:<20} {result.get('seconds', 0):>7.1f}s  {detail}")
+    finally:
+        for server in servers:
+            stop_process(server)
+
+    succeeded = sum(1 for result in results if result['success'])
+    print(f"\n{succeeded}/{len(results)} jobs succeeded; results in {results_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""End-to-end offline benchmark of TaskerAgent runs with each script's observer.
+
+Runs the real agent loop against the stand-ins in offline.py: recorded or
+synthetic frames, a no-op action handler and replayed model responses.
+For every observer (and the dynamic guidance flow, with submissions pushed
+over its socket) it reports steps per second and traced memory. Runs
+without a display, FreeCAD or API access.
+
+Usage:
+    python bench_agent.py [--steps 3000] [--todos 10]
+    python bench_agent.py --log freecad_execution_log.jsonl --frames freecad_execution_log.jsonl
+    python bench_agent.py --pipeline "scale=0.75" --prefetch
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import io
+import json
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+
+from oagi import TaskerAgent
+
+from async_console import AsyncConsole
+from auto_guided_hello import AutoGuidedObserver
+from bench_observers import open_devnull
+from dynamic_guided_hello import DynamicGuidanceObserver
+from image_pipeline import PreprocessingImageProvider, parse_stages
+from interactive_hello import InteractiveObserver
+from monitored_hello import MonitoringObserver
+from offline import NullActionHandler, RecordedScreen, ScriptedModel
+from prefetch import PrefetchingImageProvider
+from streaming_export import StreamingExporter
+
+
+async def push_guidance(path, model, count, every):
+    """Submit guidance to a DynamicGuidanceObserver the way send_guidance.py does.
+
+    One submission goes out each time the model has served another
+    ``every`` steps, so all of them land while the agent is running. The
+    caller cancels it if the agent finishes first.
+    """
+    applied = 0
+    for i in range(count):
+        while model.steps < (i + 1) * every:
+            await asyncio.sleep(0.01)
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+        except OSError:
+            continue
+        guidance = {'todos': [f"Benchmark guidance todo {i + 1}"], 'message': "benchmark"}
+        writer.write((json.dumps(guidance) + "\n").encode())
+        await writer.drain()
+        ack = json.loads(await reader.readline())
+        applied += ack.get('applied', 0)
+        writer.close()
+        await writer.wait_closed()
+    return applied
+
+
+class Case:
+    """One benchmark configuration: builds an observer and runs the agent once."""
+
+    def __init__(self, name, factory, export=False, guidance=0):
+        self.name = name
+        self.factory = factory
+        self.export = export
+        self.guidance = guidance
+
+    async def run(self, args, screen, workdir):
+        """Run the agent to completion; return (steps, seconds, observer events)."""
+        model = make_model(args)
+        todos = model.todos or [f"Benchmark todo {i + 1}: set value {i}" for i in range(args.todos)]
+        agent = TaskerAgent(model="lux-thinker-1", planner=model.planner, step_delay=0.0,
+                            max_steps=args.steps_per_todo + 10)
+        agent.set_task(task="Offline benchmark", todos=todos)
+
+        exporter = None
+        if self.export:
+            exporter = StreamingExporter(os.path.join(workdir, f"{self.name}.md"),
+                                         os.path.join(workdir, f"{self.name}_images"))
+        observer = self.factory(agent, exporter, workdir) if self.factory else None
+        agent.step_observer = observer
+
+        provider = screen
+        if args.pipeline:
+            provider = PreprocessingImageProvider(screen, parse_stages(args.pipeline), verbose=False)
+        handler = NullActionHandler()
+        if args.prefetch:
+            provider = PrefetchingImageProvider(provider)
+            handler = provider.bind(handler)
+
+        pusher = None
+        if isinstance(observer, DynamicGuidanceObserver):
+            await observer.start()
+            # No more submissions than there are steps to space them over
+            count = min(self.guidance, args.steps // max(1, args.guidance_every))
+            pusher = asyncio.ensure_future(
+                push_guidance(observer.server.path, model, count, args.guidance_every))
+
+        start = time.perf_counter()
+        try:
+            with model.installed():
+                await agent.execute("Offline benchmark", handler, provider)
+        finally:
+            # Submissions still waiting for steps will never be sent once the agent is done
+            if pusher:
+                pusher.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await pusher
+            if isinstance(observer, DynamicGuidanceObserver):
+                await observer.stop()
+            if exporter:
+                exporter.close()
+        elapsed = time.perf_counter() - start
+        return model.steps, elapsed, getattr(observer, 'step_count', 0)
+
+
+def make_model(args):
+    if args.log:
+        return ScriptedModel.from_jsonl(args.log, steps_per_todo=args.steps_per_todo)
+    return ScriptedModel(steps_per_todo=args.steps_per_todo)
+
+
+def build_cases(args):
+    socket_path = os.path.join(tempfile.gettempdir(), f"bench_guidance_{os.getpid()}.sock")
+    return [
+        Case('no_observer', None),
+        Case('monitored', lambda agent, exporter, workdir: MonitoringObserver(agent)),
+        Case('auto_guided', lambda agent, exporter, workdir: AutoGuidedObserver(agent, exporter=exporter),
+             export=args.export),
+        Case('interactive', lambda agent, exporter, workdir: InteractiveObserver(
+            agent, console=AsyncConsole(io.StringIO('')))),
+        Case('dynamic_guided', lambda agent, exporter, workdir: DynamicGuidanceObserver(
+            agent, socket_path=socket_path, exporter=exporter),
+             export=args.export, guidance=args.guidance),
+    ]
+
+
+async def measure(case, args, screen):
+    """Time one run, then repeat it under tracemalloc for peak memory."""
+    with tempfile.TemporaryDirectory() as workdir, \
+            open_devnull() as devnull, contextlib.redirect_stdout(devnull):
+        gc.collect()
+        steps, elapsed, events = await case.run(args, screen, workdir)
+
+    with tempfile.TemporaryDirectory() as workdir, \
+            open_devnull() as devnull, contextlib.redirect_stdout(devnull):
+        gc.collect()
+        tracemalloc.start()
+        await case.run(args, screen, workdir)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return steps, elapsed, events, peak
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--steps', type=int, default=3000, help="approximate model steps per run")
+    parser.add_argument('--todos', type=int, default=10, help="todos in the synthetic task")
+    parser.add_argument('--log', help="streamed JSONL log to replay model responses from")
+    parser.add_argument('--frames', help="streamed JSONL log or directory of recorded screenshots "
+                                         "(synthetic if omitted)")
+    parser.add_argument('--pipeline', help="image pipeline spec, as for FREECAD_AGENT_IMAGE_PIPELINE")
+    parser.add_argument('--prefetch', action='store_true', help="prefetch each screenshot after its action batch")
+    parser.add_argument('--no-export', dest='export', action='store_false',
+                        help="do not stream logs for the observers that normally do")
+    parser.add_argument('--guidance', type=int, default=5, help="guidance submissions in the dynamic run")
+    parser.add_argument('--guidance-every', type=int, default=100, help="model steps between submissions")
+    args = parser.parse_args()
+
+    # The agent logs every step at INFO; keep the timing about our own code
+    logging.getLogger('oagi').setLevel(logging.WARNING)
+
+    args.steps_per_todo = None
+    todo_count = len(make_model(args).todos) if args.log else args.todos
+    args.steps_per_todo = max(1, args.steps // max(1, todo_count))
+    if not args.frames:
+        screen = RecordedScreen.synthetic()
+    elif args.frames.endswith('.jsonl'):
+        screen = RecordedScreen.from_log(args.frames)
+    else:
+        screen = RecordedScreen.from_directory(args.frames)
+
+    print(f"{len(screen.frames)} frames, {todo_count} todos, {args.steps_per_todo} steps per todo")
+    print(f"{'run':<16}{'steps':>7}{'events':>8}{'seconds':>9}{'steps/s':>9}{'peak MB':>9}")
+    print('-' * 58)
+    for case in build_cases(args):
+        steps, elapsed, events, peak = await measure(case, args, screen)
+        print(f"{case.name:<16}{steps:>7}{events:>8}{elapsed:>9.2f}{steps / elapsed:>9.0f}{peak / 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Micro-benchmark of per-event observer overhead, before and after ObserverBase.
+
+Feeds the same synthetic event stream (todo splits, plans, steps with
+screenshots, actions) to a replica of the original per-script hot path and
+to each script's observer with different sinks. Screenshots are passed as
+URLs, as remote image providers do, so spilling them to disk is not
+part of the measurement. Runs without a display, FreeCAD or API access.
+
+Usage:
+    python bench_observers.py [--events 4000]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import time
+
+from oagi.agent.tasker.memory import PlannerMemory
+from oagi.types import Action, ActionEvent, ActionType, PlanEvent, SplitEvent, Step, StepEvent
+
+from async_console import AsyncConsole
+from auto_guided_hello import AutoGuidedObserver
+from dynamic_guided_hello import DynamicGuidanceObserver
+from interactive_hello import InteractiveObserver
+from monitored_hello import MonitoringObserver
+from observer_base import DETAIL, INFO, ConsoleSink, NullSink
+from step_store import SpillingAgentObserver
+
+
+class BenchAgent:
+    """Just enough of TaskerAgent for the observers."""
+
+    def __init__(self, todo_count=12):
+        self.memory = PlannerMemory()
+        self.memory.set_task("Benchmark task", [f"Todo number {i}: do something specific" for i in range(todo_count)])
+        self.current_todo_index = 0
+
+    def get_memory(self):
+        return self.memory
+
+    def append_todo(self, description):
+        self.memory.append_todo(description)
+
+
+class LegacyObserver(SpillingAgentObserver):
+    """Replica of the hot path every script's observer ran before ObserverBase.
+
+    It records events through the same spilling base as the new observers,
+    so the difference between the two is rendering only.
+    """
+
+    def __init__(self, agent):
+        super().__init__()
+        self.agent = agent
+        self.step_count = 0
+
+    async def on_event(self, event):
+        await super().on_event(event)
+
+        self.step_count += 1
+
+        print(f"\n{'='*60}")
+        print(f"STEP {self.step_count}")
+        print(f"{'='*60}")
+
+        if hasattr(self.agent, 'current_todo_index'):
+            current_idx = self.agent.current_todo_index
+            try:
+                memory = self.agent.get_memory()
+                if 'todos' in memory and current_idx < len(memory['todos']):
+                    current_todo = memory['todos'][current_idx]
+                    print(f"Current todo [{current_idx+1}/{len(memory['todos'])}]: {current_todo}")
+            except:
+                pass
+
+        event_type = type(event).__name__
+        print(f"Event type: {event_type}")
+
+        if hasattr(event, '__dict__'):
+            for key, value in event.__dict__.items():
+                if key in ['screenshot', 'image', 'raw_image']:
+                    print(f"{key}: [Image data - {type(value).__name__}]")
+                elif isinstance(value, str) and len(value) > 200:
+                    print(f"{key}: {value[:200]}...")
+                elif not key.startswith('_'):
+                    print(f"{key}: {value}")
+
+        print(f"{'='*60}\n")
+
+
+def make_events(count):
+    """Build a repeating todo/plan/step/action event stream."""
+    image = "https://example.invalid/screenshots/3f2a9c0e-5b1d-4c7e-9a61-2d8f0b7e4c55.jpg"
+    reason = "The dialog shows the constraint value field; I will click it and type 20. " * 8
+    actions = [
+        Action(type=ActionType.CLICK, argument="512, 384"),
+        Action(type=ActionType.TYPE, argument="20"),
+    ]
+    cycle = [
+        SplitEvent(label="Start of todo 1: Set horizontal size"),
+        PlanEvent(phase="initial", image=image, reasoning=reason, result="Click the top edge"),
+        StepEvent(step_num=1, image=image, step=Step(reason=reason, actions=actions), task_id="bench"),
+        ActionEvent(step_num=1, actions=actions),
+        StepEvent(step_num=2, image=image, step=Step(reason=reason, actions=actions[:1]), task_id="bench"),
+        ActionEvent(step_num=2, actions=actions[:1]),
+    ]
+    return [cycle[i % len(cycle)] for i in range(count)]
+
+
+def open_devnull():
+    """Line-buffered null stream, so writes cost what they would on a terminal."""
+    return open(os.devnull, 'w', buffering=1)
+
+
+async def time_observer(observer, events):
+    """Return mean microseconds per event with stdout discarded."""
+    with open_devnull() as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        for event in events:
+            await observer.on_event(event)
+        elapsed = time.perf_counter() - start
+    return elapsed / len(events) * 1e6
+
+
+def build_cases(agent):
+    """Observer factories keyed by (script, configuration)."""
+    devnull = open_devnull()
+
+    def sinks(kind):
+        if kind == 'console':
+            return [ConsoleSink(DETAIL, devnull)]
+        if kind == 'info':
+            return [ConsoleSink(INFO, devnull)]
+        return [NullSink()]
+
+    cases = [
+        ('record only', '(no rendering)', lambda: SpillingAgentObserver()),
+        ('baseline (all scripts)', 'legacy print path', lambda: LegacyObserver(agent)),
+    ]
+    for kind in ('console', 'info', 'null'):
+        cases += [
+            ('monitored_hello.py', kind, lambda k=kind: MonitoringObserver(agent, sinks=sinks(k))),
+            ('auto_guided_hello.py', kind, lambda k=kind: AutoGuidedObserver(agent, sinks=sinks(k))),
+            ('dynamic_guided_hello.py', kind, lambda k=kind: DynamicGuidanceObserver(agent, sinks=sinks(k))),
+            ('interactive_hello.py', kind, lambda k=kind: InteractiveObserver(
+                agent, console=AsyncConsole(io.StringIO('')), sinks=sinks(k))),
+        ]
+    return cases
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=4000, help="events per observer")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per observer (best is reported)")
+    args = parser.parse_args()
+
+    agent = BenchAgent()
+    events = make_events(args.events)
+
+    # 'render' subtracts the cost of recording events, which every
+    # observer pays before it renders anything
+    print(f"{'script':<26}{'sink':<20}{'total us':>10}{'render us':>11}")
+    print('-' * 67)
+    floor = None
+    for script, kind, factory in build_cases(agent):
+        # Warm up, then keep the best of several fresh observers
+        await time_observer(factory(), events[:200])
+        per_event = min([await time_observer(factory(), events) for _ in range(args.repeat)])
+        if floor is None:
+            floor = per_event
+        print(f"{script:<26}{kind:<20}{per_event:>10.1f}{per_event - floor:>11.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Cold-start time of each freecad_agent.py subcommand.
+
+Every measurement starts a fresh interpreter.
+
+Agent subcommands are timed up to the first step of a real run: import
+the script, build the agent with its task and every wrapper, then exit
+(``--check``). The same work is timed twice, once through the CLI and
+once the way the scripts start on their own (script imported first), so
+the difference is what the CLI itself adds. Without a display, pyautogui
+cannot be imported; both paths then use the offline action handler and
+screen in its place (see freecad_agent.check), and the table says so.
+
+The commands that never start the agent (--help, --dry-run, tasks,
+send-guidance --help) have no script equivalent; they are listed with
+their own times.
+
+Usage:
+    python bench_startup.py [--repeat 7]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+AGENT_CASES = (
+    ('run', 'hello'),
+    ('monitor', 'monitored_hello'),
+    ('interactive', 'interactive_hello'),
+    ('guided', 'auto_guided_hello'),
+    ('dynamic', 'dynamic_guided_hello'),
+)
+
+LAZY_CASES = (
+    ('--help', ['--help']),
+    ('run --dry-run', ['run', '--dry-run']),
+    ('dynamic --dry-run', ['dynamic', '--dry-run']),
+    ('tasks', ['tasks']),
+    ('send-guidance --help', ['send-guidance', '--help']),
+)
+
+
+def time_command(command, repeat):
+    """Median and best wall time of a command, in milliseconds, or None if it fails."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        completed = subprocess.run(command, cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if completed.returncode:
+            return None
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), min(times)
+
+
+def _cell(timing):
+    return f"{timing[0]:>9.0f}{timing[1]:>7.0f}" if timing else f"{'failed':>9}{'':>7}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=7, help="runs per measurement")
+    args = parser.parse_args()
+
+    python = [sys.executable]
+    interpreter, _ = time_command(python + ['-c', 'pass'], args.repeat)
+    print(f"Interpreter startup: {interpreter:.0f}ms (included below)")
+
+    headless = sys.platform.startswith('linux') and not os.environ.get('DISPLAY')
+    print("\nReal run up to the first step: import, agent, task and wrappers (--check)"
+          + ("\n(no display: offline stand-ins replace the pyautogui handler and screenshot maker on both paths)"
+             if headless else ""))
+    print(f"{'subcommand':<22}{'cli ms':>9}{'best':>7}{'script ms':>11}{'best':>7}{'cli - script':>14}")
+    print('-' * 70)
+    for name, module in AGENT_CASES:
+        cli = time_command(python + ['freecad_agent.py', name, '--check'], args.repeat)
+        # The scripts import everything at the top before doing anything else
+        script = time_command(python + ['-c', f"import {module}, freecad_agent; "
+                                              f"raise SystemExit(freecad_agent.main(['{name}', '--check']))"],
+                              args.repeat)
+        line = f"{name:<22}{_cell(cli)}  {_cell(script)}"
+        if cli and script:
+            line += f"{cli[0] - script[0]:>12.0f}"
+        print(line)
+
+    print("\nCommands that never start the agent (oagi, pyautogui and PIL are not imported)")
+    print(f"{'command':<22}{'cli ms':>9}{'best':>7}")
+    print('-' * 38)
+    for name, cli_args in LAZY_CASES:
+        print(f"{name:<22}{_cell(time_command(python + ['freecad_agent.py'] + cli_args, args.repeat))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Checkpoint a TaskerAgent's progress at todo boundaries and resume from it."""
+
+import json
+import os
+import sys
+
+from oagi.agent.tasker.models import Todo, TodoHistory, TodoStatus
+
+from observer_base import ObserverWrapper
+
+# Checkpoint file to use instead of <script>.checkpoint.json
+CHECKPOINT_ENV = "FREECAD_AGENT_CHECKPOINT"
+
+CHECKPOINT_VERSION = 1
+
+UNFINISHED = (TodoStatus.PENDING, TodoStatus.IN_PROGRESS)
+
+
+def default_path():
+    """<script name>.checkpoint.json, or FREECAD_AGENT_CHECKPOINT."""
+    script = os.path.splitext(os.path.basename(sys.argv[0]))[0] or 'agent'
+    return os.environ.get(CHECKPOINT_ENV) or f"{script}.checkpoint.json"
+
+
+def snapshot(agent):
+    """The agent's memory and position as a JSON-serializable dict."""
+    memory = agent.get_memory()
+    index = getattr(agent, 'current_todo_index', -1)
+    return {
+        'version': CHECKPOINT_VERSION,
+        'task': memory.task_description,
+        'current_todo_index': -1 if index is None else index,
+        'todos': [todo.model_dump(mode='json') for todo in memory.todos],
+        'pending': [i for i, todo in enumerate(memory.todos) if todo.status in UNFINISHED],
+        'history': [history.model_dump(mode='json') for history in memory.history],
+        'task_execution_summary': memory.task_execution_summary,
+        'todo_execution_summaries': {str(i): s for i, s in memory.todo_execution_summaries.items()},
+    }
+
+
+def restore(agent, data):
+    """Load a snapshot into the agent's memory.
+
+    A todo that was in progress when the checkpoint was written goes back
+    to pending, so the agent starts it over.
+
+    Returns:
+        Index of the first unfinished todo, or -1 if everything is done
+    """
+    if data.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version: {data.get('version')}")
+    memory = agent.get_memory()
+    memory.task_description = data['task']
+    memory.todos = [Todo.model_validate(todo) for todo in data['todos']]
+    for todo in memory.todos:
+        if todo.status == TodoStatus.IN_PROGRESS:
+            todo.status = TodoStatus.PENDING
+    memory.history = [TodoHistory.model_validate(history) for history in data['history']]
+    memory.task_execution_summary = data['task_execution_summary']
+    memory.todo_execution_summaries = {int(i): s for i, s in data['todo_execution_summaries'].items()}
+    agent.current_todo_index = data['current_todo_index']
+    return memory.get_current_todo()[1]
+
+
+class Checkpoint(ObserverWrapper):
+    """step_observer wrapper that saves progress at every SplitEvent.
+
+    The file is rewritten (atomically) at the start and end of each todo,
+    after the wrapped observer has seen the event, so todos inserted or
+    abandoned by other observers are included.
+    """
+
+    def __init__(self, agent, path=None, verbose=True):
+        """Wrap the agent's step_observer.
+
+        Args:
+            agent: TaskerAgent with its task set (call after set_task)
+            path: Checkpoint file (defaults to default_path())
+            verbose: Print what was resumed
+        """
+        self.agent = agent
+        self.path = path or default_path()
+        self.verbose = verbose
+        self.wrap(agent)
+        self.saves = 0
+
+    async def on_event(self, event):
+        await self.forward(event)
+        if type(event).__name__ == 'SplitEvent':
+            self.save()
+
+    def save(self):
+        """Write the current state."""
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(snapshot(self.agent), f, indent=1)
+        os.replace(tmp, self.path)
+        self.saves += 1
+
+    def resume(self):
+        """Restore the saved state if the checkpoint is for the same task.
+
+        Returns:
+            True if progress was restored
+        """
+        if not os.path.exists(self.path):
+            self._log(f"No checkpoint at {self.path}; starting from the first todo")
+            return False
+        with open(self.path) as f:
+            data = json.load(f)
+        task = self.agent.get_memory().task_description
+        if data.get('task') != task:
+            self._log(f"Checkpoint {self.path} is for a different task; starting from the first todo")
+            return False
+
+        index = restore(self.agent, data)
+        todos = self.agent.get_memory().todos
+        done = sum(1 for todo in todos if todo.status not in UNFINISHED)
+        if index < 0:
+            self._log(f"Checkpoint {self.path}: all {len(todos)} todos are already finished")
+        else:
+            self._log(f"Resuming from {self.path}: {done}/{len(todos)} todos finished, "
+                      f"continuing with todo {index + 1}: {todos[index].description}")
+        return True
+
+    def print_hint(self):
+        """Tell the user how to continue after an interruption."""
+        if self.saves:
+            print(f"Progress saved to {self.path}; rerun with --resume to continue from the unfinished todo.")
+
+    def _log(self, message):
+        if self.verbose:
+            print(message)
+
+
+def attach_checkpoint(agent, path=None, resume=None, **kwargs):
+    """Attach a Checkpoint and restore from it when --resume was given.
+
+    Args:
+        agent: TaskerAgent with its task set
+        path: Checkpoint file (defaults to default_path())
+        resume: Restore saved progress (defaults to '--resume' in sys.argv)
+
+    Returns:
+        The Checkpoint
+    """
+    saver = Checkpoint(agent, path, **kwargs)
+    if resume is None:
+        resume = '--resume' in sys.argv[1:]
+    if resume:
+        saver.resume()
+    return saver
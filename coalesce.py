@@ -0,0 +1,277 @@
+"""Run consecutive keyboard and click actions of a batch with short waits."""
+
+import asyncio
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from oagi.handler.utils import parse_hotkey
+
+from env_flags import env_flag
+from todo_ops import current_index
+
+# Set to 1 to coalesce runs of input actions in each batch
+COALESCE_ENV = "FREECAD_AGENT_COALESCE"
+
+KEYBOARD = ('type', 'hotkey')
+CLICKS = ('click', 'left_double', 'left_triple', 'right_single')
+
+
+def _single_key(action):
+    """The key of a one-key hotkey that can be pressed repeatedly, else None."""
+    keys = parse_hotkey(action.argument or '', validate=False)
+    if len(keys) == 1 and keys[0] != 'capslock':
+        return keys[0]
+    return None
+
+
+def input_events(action, merged=False):
+    """Input events pyautogui sends for an action (a click is a move plus a click).
+
+    With ``merged``, a repeated single key is one event (pressed with
+    ``presses=count``).
+    """
+    kind = action.type.value
+    count = action.count or 1
+    if kind in CLICKS:
+        return 2 * count
+    if merged and kind == 'hotkey' and _single_key(action):
+        return 1
+    return count
+
+
+def merge_run(actions):
+    """Merge adjacent typing into one action and repeats of one key into one.
+
+    Order is kept, so a caps lock toggle between two typed strings still
+    applies to the second.
+    """
+    merged = []
+    for action in actions:
+        previous = merged[-1] if merged else None
+        count = action.count or 1
+        if previous is not None and action.type.value == previous.type.value == 'type':
+            text = (previous.argument or '') * (previous.count or 1) + (action.argument or '') * count
+            merged[-1] = previous.model_copy(update={'argument': text, 'count': 1})
+        elif (previous is not None and action.type.value == previous.type.value == 'hotkey'
+              and action.argument == previous.argument and _single_key(action)):
+            merged[-1] = previous.model_copy(update={'count': (previous.count or 1) + count})
+        elif action.type.value == 'type' and count > 1:
+            merged.append(action.model_copy(update={'argument': (action.argument or '') * count, 'count': 1}))
+        else:
+            merged.append(action)
+    return merged
+
+
+def plan_batch(actions, max_clicks=3):
+    """Split a batch into runs of input actions and the actions between them.
+
+    A run is a maximal sequence of typing, key presses, hotkeys and at most
+    ``max_clicks`` clicks. Drags, scrolls, waits and finish/fail end a run.
+
+    Returns:
+        List of (actions to execute, original actions, coalesced)
+    """
+    runs = []
+    current = []
+    clicks = 0
+
+    def flush():
+        if current:
+            if sum(action.count or 1 for action in current) > 1:
+                runs.append((merge_run(current), list(current), True))
+            else:
+                runs.append((list(current), list(current), False))
+            current.clear()
+
+    for action in actions:
+        kind = action.type.value
+        if kind in CLICKS:
+            if clicks == max_clicks:
+                flush()
+                clicks = 0
+            clicks += 1
+            current.append(action)
+        elif kind in KEYBOARD:
+            current.append(action)
+        else:
+            flush()
+            clicks = 0
+            runs.append(([action], [action], False))
+    flush()
+    return runs
+
+
+def fixed_waits(actions, pause, click_delay, key_interval, merged=False):
+    """Seconds pyautogui spends sleeping around the input events of actions.
+
+    Every event is followed by ``pause`` (pyautogui.PAUSE), a click waits
+    ``click_delay`` after moving, and a hotkey waits ``key_interval`` after
+    each key goes down and up.
+    """
+    total = 0.0
+    for action in actions:
+        kind = action.type.value
+        count = action.count or 1
+        if kind in CLICKS:
+            total += count * (2 * pause + click_delay)
+        elif kind == 'hotkey':
+            if merged and _single_key(action):
+                total += pause + count * key_interval
+            else:
+                keys = len(parse_hotkey(action.argument or '', validate=False))
+                total += count * (pause + 2 * keys * key_interval)
+        elif kind == 'type':
+            total += count * pause
+    return total
+
+
+class CoalescingActionHandler:
+    """Action handler wrapper that runs input actions back to back.
+
+    The model returns a batch of actions per step, and the pyautogui
+    handler waits a fixed ``action_pause`` after every input event, plus
+    ``click_pre_delay`` before each click and ``hotkey_interval`` between
+    hotkey keys. A step that types "20", presses Enter and clicks OK pays
+    all of them. Runs of typing, key presses, hotkeys and short click
+    sequences within a batch are executed together with the shorter
+    waits below; adjacent typing becomes one typewrite and a key pressed
+    several times one press. Other actions, and runs of a single action,
+    execute exactly as before.
+
+    Only AsyncPyautoguiActionHandler (anything with a ``sync_handler``) is
+    coalesced; other handlers are called unchanged.
+    """
+
+    def __init__(self, handler, agent=None, pause=0.02, click_delay=0.05, key_interval=0.02,
+                 max_clicks=3, verbose=False):
+        """Wrap an action handler.
+
+        Args:
+            handler: The action handler to wrap (AsyncPyautoguiActionHandler)
+            agent: TaskerAgent, to attribute savings to todos
+            pause: Seconds after each input event inside a run
+            click_delay: Seconds between moving to a click target and clicking, inside a run
+            key_interval: Seconds between the keys of a hotkey and repeated presses, inside a run
+            max_clicks: Most clicks in one run
+            verbose: Print a line for every batch that was coalesced
+        """
+        self.handler = handler
+        self.agent = agent
+        self.pause = pause
+        self.click_delay = click_delay
+        self.key_interval = key_interval
+        self.max_clicks = max_clicks
+        self.verbose = verbose
+
+        self.batches = 0
+        self.todos = defaultdict(lambda: {'actions': 0, 'runs': 0, 'removed': 0, 'shortened': 0, 'seconds': 0.0})
+
+    def __getattr__(self, name):
+        return getattr(self.handler, name)
+
+    async def __call__(self, actions):
+        self.batches += 1
+        sync = getattr(self.handler, 'sync_handler', None)
+        runs = plan_batch(actions, self.max_clicks) if sync is not None else []
+        if not any(coalesced for _, _, coalesced in runs):
+            await self.handler(actions)
+        else:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._execute, sync, runs)
+        if sync is not None:
+            self._count(sync.config, actions, runs)
+
+    def _execute(self, sync, runs):
+        """Execute the runs in order, then wait post_batch_delay as the wrapped handler does."""
+        for merged, _, coalesced in runs:
+            if coalesced:
+                with self._tuned(sync):
+                    for action in merged:
+                        self._execute_action(sync, action, fast=True)
+            else:
+                for action in merged:
+                    self._execute_action(sync, action)
+        if sync.config.post_batch_delay > 0:
+            time.sleep(sync.config.post_batch_delay)
+
+    def _execute_action(self, sync, action, fast=False):
+        import pyautogui
+
+        try:
+            key = _single_key(action) if fast and action.type.value == 'hotkey' else None
+            if key is not None:
+                pyautogui.press(key, presses=action.count or 1, interval=self.key_interval)
+            else:
+                sync._execute_action(action)
+        except Exception as e:
+            print(f"Error executing action {action.type}: {e}")
+            raise
+
+    @contextmanager
+    def _tuned(self, sync):
+        """Shorten pyautogui's fixed waits for the duration of a run."""
+        import pyautogui
+
+        config = sync.config
+        saved = pyautogui.PAUSE, config.click_pre_delay, config.hotkey_interval
+        pyautogui.PAUSE, config.click_pre_delay, config.hotkey_interval = (
+            self.pause, self.click_delay, self.key_interval)
+        try:
+            yield
+        finally:
+            pyautogui.PAUSE, config.click_pre_delay, config.hotkey_interval = saved
+
+    def _count(self, config, actions, runs):
+        stats = self.todos[current_index(self.agent) + 1 if self.agent is not None else 0]
+        stats['actions'] += len(actions)
+        removed = shortened = 0
+        seconds = 0.0
+        for merged, original, coalesced in runs:
+            if not coalesced:
+                continue
+            before = sum(input_events(action) for action in original)
+            after = sum(input_events(action, merged=True) for action in merged)
+            removed += before - after
+            shortened += after
+            seconds += (fixed_waits(original, config.action_pause, config.click_pre_delay, config.hotkey_interval)
+                        - fixed_waits(merged, self.pause, self.click_delay, self.key_interval, merged=True))
+            stats['runs'] += 1
+        stats['removed'] += removed
+        stats['shortened'] += shortened
+        stats['seconds'] += seconds
+        if self.verbose and removed + shortened:
+            print(f"[COALESCE] {len(actions)} actions: {removed} round trips removed, "
+                  f"{shortened} waits shortened, ~{seconds:.2f}s saved")
+
+    def print_summary(self):
+        """Print the round trips removed and time saved, per todo."""
+        if hasattr(self.handler, 'print_summary'):
+            self.handler.print_summary()
+        if not self.todos:
+            return
+        totals = {key: sum(stats[key] for stats in self.todos.values())
+                  for key in ('actions', 'runs', 'removed', 'shortened', 'seconds')}
+        print(f"Coalescing: {totals['runs']} runs in {self.batches} batches, "
+              f"{totals['removed']} round trips removed, {totals['shortened']} waits shortened, "
+              f"~{totals['seconds']:.1f}s of fixed waits saved")
+        for todo, stats in sorted(self.todos.items()):
+            if todo:
+                print(f"  todo {todo}: {stats['actions']} actions, {stats['runs']} runs, "
+                      f"{stats['removed']} round trips removed, ~{stats['seconds']:.1f}s saved")
+
+
+def maybe_coalesce(handler, agent=None, **kwargs):
+    """Wrap handler in a CoalescingActionHandler when FREECAD_AGENT_COALESCE is set.
+
+    Args:
+        handler: The pyautogui action handler (before maybe_settle)
+        agent: TaskerAgent, to report savings per todo
+        **kwargs: Extra CoalescingActionHandler options
+
+    Returns:
+        The wrapped handler, or the original one when coalescing is off
+    """
+    if env_flag(COALESCE_ENV):
+        return CoalescingActionHandler(handler, agent, **kwargs)
+    return handler
@@ -0,0 +1,11 @@
+"""On/off switches read from FREECAD_AGENT_* environment variables."""
+
+import os
+
+# Values that turn a switch on (case-insensitive)
+TRUE_VALUES = ("1", "true", "yes", "on")
+
+
+def env_flag(name):
+    """Whether the environment variable name is set to one of TRUE_VALUES."""
+    return os.environ.get(name, "").strip().lower() in TRUE_VALUES
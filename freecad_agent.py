@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Single entry point for the FreeCAD agent scripts.
+
+Usage:
+    python freecad_agent.py run                       # hello.py
+    python freecad_agent.py monitor --task partdesign_cube_guided
+    python freecad_agent.py interactive --resume
+    python freecad_agent.py interactive --auto-continue 30
+    python freecad_agent.py guided
+    python freecad_agent.py dynamic
+    python freecad_agent.py send-guidance "todo 1" "todo 2"
+    python freecad_agent.py guided --dry-run          # show the task and settings, run nothing
+    python freecad_agent.py run --check               # build the agent and its wrappers, run nothing
+
+Only the subcommand that runs is imported, and only once the arguments
+are parsed, so --help, --dry-run and send-guidance never load oagi,
+pyautogui or PIL. Task definitions live in tasks/*.json.
+"""
+
+import argparse
+import os
+import sys
+
+# Subcommand -> (script module, what it does)
+AGENT_COMMANDS = {
+    'run': ('hello', "run the agent with no observer"),
+    'monitor': ('monitored_hello', "run with console progress logging"),
+    'interactive': ('interactive_hello', "run with pause/step/add commands on stdin"),
+    'guided': ('auto_guided_hello', "run with rule-based automatic guidance"),
+    'dynamic': ('dynamic_guided_hello', "run and accept guidance from send-guidance"),
+}
+
+# Default task per script; kept here so --dry-run does not import the script
+DEFAULT_TASKS = {
+    'hello': 'cube_with_hole',
+    'monitored_hello': 'partdesign_cube',
+    'interactive_hello': 'partdesign_cube',
+    'auto_guided_hello': 'partdesign_cube_guided',
+    'dynamic_guided_hello': 'corner_prism',
+}
+
+
+def seconds(text):
+    """argparse type for a non-negative number of seconds."""
+    try:
+        value = float(text)
+    except ValueError:
+        value = -1
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"expected a number of seconds, got {text!r}")
+    return value
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='freecad_agent.py',
+        description="Drive FreeCAD with an OpenAGI TaskerAgent.",
+        epilog="Optional features are enabled with FREECAD_AGENT_* environment variables (see README).",
+    )
+    commands = parser.add_subparsers(dest='command', required=True, metavar='command')
+    for name, (module, help_text) in AGENT_COMMANDS.items():
+        command = commands.add_parser(name, help=help_text, description=f"{help_text} ({module}.py)")
+        command.add_argument('--task', default=DEFAULT_TASKS[module],
+                             help=f"task name in tasks/ or a JSON file (default: {DEFAULT_TASKS[module]})")
+        command.add_argument('--resume', action='store_true', help="continue from the last checkpoint")
+        command.add_argument('--dry-run', action='store_true', help="print the task and settings, then exit")
+        command.add_argument('--check', action='store_true',
+                             help="import the script and build the agent and its wrappers, then exit")
+        if name == 'interactive':
+            command.add_argument('--auto-continue', type=seconds, metavar='SECONDS',
+                                 help="resume a paused session after SECONDS without input "
+                                      "(default: FREECAD_AGENT_AUTO_CONTINUE, else wait)")
+        command.set_defaults(module=module)
+
+    guidance = commands.add_parser('send-guidance', help="add todos to a running 'dynamic' agent",
+                                   description="Add todos to a running 'dynamic' agent.")
+    guidance.add_argument('todos', nargs='+', help="todo text, one argument per todo")
+    guidance.add_argument('--message', help="message shown by the agent")
+    commands.add_parser('tasks', help="list the task definitions in tasks/")
+    return parser
+
+
+def dry_run(args, task):
+    """Show what the subcommand would run."""
+    print(f"{args.command}: {args.module}.py, task '{task['name']}'")
+    print(f"  Task: {task['task']}")
+    print(f"  Instruction: {task['instruction']}")
+    for i, todo in enumerate(task['todos'], 1):
+        budget = task['budgets'].get(todo)
+        limits = [f"{budget[key]}{unit}" for key, unit in (('steps', ' steps'), ('seconds', 's')) if budget and key in budget]
+        print(f"  {i:>2}. {todo}" + (f" [budget: {', '.join(limits)}]" if limits else ""))
+    settings = {key: value for key, value in sorted(os.environ.items()) if key.startswith('FREECAD_AGENT_')}
+    for key, value in settings.items():
+        print(f"  {key}={value}")
+    if args.resume:
+        print("  Resuming from the last checkpoint")
+
+
+def check(args, module, task):
+    """Build what a run builds before the agent starts, without starting it.
+
+    The script's observers are not created, but everything they import is,
+    so this is the fixed startup cost of a real run (bench_startup.py).
+    pyautogui cannot be imported without a display; the offline action
+    handler and screen then stand in for it and the screenshot maker.
+    """
+    from oagi import TaskerAgent
+
+    from agent_pipeline import build_pipeline
+    from task_defs import apply_task
+
+    agent = TaskerAgent(model="lux-thinker-1")
+    apply_task(agent, task)
+    stand_ins = {}
+    if sys.platform.startswith('linux') and not os.environ.get('DISPLAY'):
+        from offline import NullActionHandler, RecordedScreen
+
+        stand_ins = {'action_handler': NullActionHandler(), 'image_provider': RecordedScreen.synthetic(1)}
+    build_pipeline(agent, task, verbose=False, **stand_ins).close()
+    print(f"{args.command}: {module.__name__}.py and its agent are ready"
+          + (" (no display: offline handler and screen)" if stand_ins else ""))
+    return 0
+
+
+def run_agent(args):
+    from task_defs import load_task
+
+    try:
+        task = load_task(args.task)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    if args.dry_run:
+        dry_run(args, task)
+        return 0
+
+    import asyncio
+    import importlib
+
+    module = importlib.import_module(args.module)
+    if args.check:
+        return check(args, module, task)
+    # The scripts name their checkpoint after argv[0] and read --resume from argv
+    sys.argv = [module.__file__] + (['--resume'] if args.resume else [])
+    options = {'auto_continue': args.auto_continue} if getattr(args, 'auto_continue', None) is not None else {}
+    asyncio.run(module.main(task=args.task, **options))
+    return 0
+
+
+def send(args):
+    import socket
+
+    from guidance_channel import GUIDANCE_SOCKET
+    from send_guidance import send_guidance
+
+    try:
+        ack = send_guidance(todos=args.todos, message=args.message or f"Added {len(args.todos)} new todo(s)")
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"No running agent is listening on {GUIDANCE_SOCKET}")
+        return 1
+    except socket.timeout:
+        print("Timed out waiting for the agent to acknowledge the guidance")
+        return 1
+    return 0 if ack.get('status') == 'ok' else 1
+
+
+def list_tasks():
+    from task_defs import load_task, task_names
+
+    for name in task_names():
+        task = load_task(name)
+        print(f"{name:<26}{len(task['todos']):>3} todos  {task['task']}")
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'send-guidance':
+        return send(args)
+    if args.command == 'tasks':
+        return list_tasks()
+    return run_agent(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
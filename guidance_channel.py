@@ -0,0 +1,94 @@
+"""Local socket channel for pushing guidance into a running agent."""
+
+import asyncio
+import json
+import os
+
+# Shared socket for dynamic guidance
+GUIDANCE_SOCKET = "/tmp/freecad_agent_guidance.sock"
+
+
+class SocketInUse(RuntimeError):
+    """Another running agent is already listening on the guidance socket."""
+
+
+class GuidanceServer:
+    """Unix-domain socket server that hands guidance to a callback as it arrives.
+
+    Clients send one JSON object per line, e.g.
+    {"todos": ["todo 1", "todo 2"], "message": "optional message"}, and get one
+    JSON acknowledgement line back per submission. Submissions are applied in
+    the order they are read, so several senders never overwrite each other.
+    """
+
+    def __init__(self, on_guidance, path=GUIDANCE_SOCKET):
+        """Create the server.
+
+        Args:
+            on_guidance: Callable taking the guidance dict and returning the
+                number of todos it applied
+            path: Filesystem path of the Unix socket
+        """
+        self.on_guidance = on_guidance
+        self.path = path
+        self.received = 0
+        self._server = None
+
+    async def start(self):
+        """Start listening, replacing any stale socket left by a previous run.
+
+        Raises:
+            SocketInUse: Something still answers on the socket
+        """
+        if os.path.exists(self.path):
+            try:
+                _, writer = await asyncio.open_unix_connection(self.path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Nobody listening: left behind by a run that did not stop cleanly
+                if os.path.exists(self.path):
+                    os.unlink(self.path)
+            else:
+                writer.close()
+                raise SocketInUse(f"Another agent is already listening on {self.path}")
+        self._server = await asyncio.start_unix_server(self._handle_client, path=self.path)
+
+    async def stop(self):
+        """Stop listening and remove the socket file (only if this server created it)."""
+        if self._server is None:
+            return
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def _handle_client(self, reader, writer):
+        """Read guidance lines from one client and acknowledge each of them."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+
+                try:
+                    guidance = json.loads(line)
+                    if not isinstance(guidance, dict):
+                        raise ValueError("guidance must be a JSON object")
+                    todos = guidance.get('todos', [])
+                    if not isinstance(todos, list) or not all(isinstance(todo, str) for todo in todos):
+                        raise ValueError("'todos' must be a list of strings")
+                    applied = self.on_guidance(guidance)
+                    # Only guidance that was applied gets an id
+                    self.received += 1
+                    ack = {'status': 'ok', 'id': self.received, 'applied': applied}
+                except Exception as e:
+                    ack = {'status': 'error', 'error': str(e)}
+
+                writer.write((json.dumps(ack) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
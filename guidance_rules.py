@@ -0,0 +1,185 @@
+"""Declarative guidance rules compiled into a per-event dispatch table."""
+
+import json
+import os
+import re
+
+from todo_ops import insert_next, prioritize
+
+# Rules file to load instead of guidance_rules.json
+RULES_ENV = "FREECAD_AGENT_GUIDANCE_RULES"
+
+DEFAULT_RULES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "guidance_rules.json")
+
+ANY = '*'
+
+RULE_KEYS = {
+    'name', 'event', 'action', 'match', 'guidance', 'counter',
+    'insert_todos', 'append_todos', 'prioritize', 'max_fires', 'priority',
+}
+
+
+def _compile(name, pattern):
+    """Compile a pattern that is matched against lower-cased text."""
+    # Letters after a backslash are escapes (\S, \W, ...), not literals
+    if any(c.isupper() for c in re.sub(r'\\.', '', pattern)):
+        raise ValueError(f"Guidance rule '{name}': write patterns in lower case: {pattern!r}")
+    try:
+        return re.compile(pattern)
+    except re.error as e:
+        raise ValueError(f"Guidance rule '{name}': bad pattern: {e}") from None
+
+
+def _event_text(event, field, agent):
+    """Text of one matchable field of an event ('' when absent)."""
+    values = vars(event)
+    if field == 'reason':
+        step = values.get('step')
+        return (step.reason or '') if step is not None else ''
+    if field == 'arguments':
+        return ' '.join(action.argument or '' for action in _actions(event))
+    if field == 'todo':
+        index = getattr(agent, 'current_todo_index', -1)
+        todos = agent.get_memory().todos
+        return todos[index].description if 0 <= index < len(todos) else ''
+    value = values.get(field)
+    return '' if value is None else str(value)
+
+
+def _actions(event):
+    values = vars(event)
+    step = values.get('step')
+    if step is not None:
+        return step.actions
+    return values.get('actions') or ()
+
+
+class Rule:
+    """One compiled rule: conditions, patterns and effects."""
+
+    __slots__ = ('name', 'events', 'actions', 'patterns', 'guidance', 'counter',
+                 'insert_todos', 'append_todos', 'prioritize', 'max_fires', 'priority', 'fires')
+
+    def __init__(self, spec, position):
+        unknown = set(spec) - RULE_KEYS
+        name = spec.get('name', f"rule {position + 1}")
+        if unknown:
+            raise ValueError(f"Guidance rule '{name}': unknown keys {sorted(unknown)}")
+
+        self.name = name
+        self.events = self._names(spec.get('event', ANY))
+        self.actions = self._names(spec.get('action', ANY))
+        self.patterns = tuple((field, _compile(name, pattern)) for field, pattern in spec.get('match', {}).items())
+        # Only run when the rule fires, so plain case-insensitive matching is fine
+        try:
+            self.prioritize = re.compile(spec['prioritize'], re.IGNORECASE) if 'prioritize' in spec else None
+        except re.error as e:
+            raise ValueError(f"Guidance rule '{name}': bad pattern: {e}") from None
+        self.guidance = spec.get('guidance')
+        self.counter = spec.get('counter')
+        self.insert_todos = tuple(spec.get('insert_todos', ()))
+        self.append_todos = tuple(spec.get('append_todos', ()))
+        changes_todos = self.insert_todos or self.append_todos or self.prioritize
+        # Rules that edit the todo list fire once unless told otherwise
+        self.max_fires = spec.get('max_fires', 1 if changes_todos else None)
+        self.priority = spec.get('priority', 0)
+        self.fires = 0
+
+    @staticmethod
+    def _names(value):
+        if value == ANY:
+            return ANY
+        return frozenset([value] if isinstance(value, str) else value)
+
+    def applies_to(self, event_type, action_types):
+        """Whether the rule can fire for an event type carrying these action types."""
+        if self.events is not ANY and event_type not in self.events:
+            return False
+        return self.actions is ANY or not self.actions.isdisjoint(action_types)
+
+
+class GuidanceRules:
+    """Rule set compiled into a table keyed by event type and action types.
+
+    Each key's rule list is built the first time that key is seen and
+    reused afterwards, so an event only ever evaluates the rules that can
+    apply to it. Patterns are compiled once at load time and matched
+    against lower-cased field text, which is much cheaper than
+    case-insensitive matching; each field is lower-cased once per event.
+    """
+
+    def __init__(self, specs):
+        """Compile a rule set.
+
+        Args:
+            specs: List of rule dicts (see guidance_rules.json)
+        """
+        rules = [Rule(spec, i) for i, spec in enumerate(specs)]
+        # Higher priority first, file order otherwise
+        self.rules = sorted(rules, key=lambda rule: -rule.priority)
+        self.table = {}
+        self.counters = {}
+
+    @classmethod
+    def load(cls, path=None):
+        """Load rules from path, FREECAD_AGENT_GUIDANCE_RULES or guidance_rules.json."""
+        path = path or os.environ.get(RULES_ENV) or DEFAULT_RULES
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data['rules'] if isinstance(data, dict) else data)
+
+    def candidates(self, event):
+        """Rules that can apply to an event, in priority order."""
+        key = (type(event).__name__, frozenset(action.type.value for action in _actions(event)))
+        rules = self.table.get(key)
+        if rules is None:
+            event_type, action_types = key
+            rules = self.table[key] = tuple(rule for rule in self.rules if rule.applies_to(event_type, action_types))
+        return rules
+
+    def apply(self, event, agent):
+        """Fire every matching rule for an event.
+
+        Returns:
+            Guidance texts from the rules that fired
+        """
+        notes = []
+        texts = {}
+        for rule in self.candidates(event):
+            if rule.max_fires is not None and rule.fires >= rule.max_fires:
+                continue
+            match = None
+            for field, pattern in rule.patterns:
+                text = texts.get(field)
+                if text is None:
+                    text = texts[field] = _event_text(event, field, agent).lower()
+                match = pattern.search(text)
+                if match is None:
+                    break
+            else:
+                notes.extend(self._fire(rule, match, event, agent))
+        return notes
+
+    def _fire(self, rule, match, event, agent):
+        rule.fires += 1
+        if rule.counter:
+            self.counters[rule.counter] = self.counters.get(rule.counter, 0) + 1
+
+        # Insert in reverse so the todos run in the order they are listed
+        for description in reversed(rule.insert_todos):
+            insert_next(agent, description)
+        for description in rule.append_todos:
+            agent.append_todo(description)
+        moved = prioritize(agent, rule.prioritize) if rule.prioritize else 0
+
+        notes = []
+        if rule.guidance:
+            values = dict(self.counters, count=rule.fires, match=match.group(0) if match else '')
+            notes.append(rule.guidance.format_map(values))
+        if rule.insert_todos:
+            notes.append(f"Inserted {len(rule.insert_todos)} todo(s) next: {'; '.join(rule.insert_todos)}")
+        if rule.append_todos:
+            notes.append(f"Appended {len(rule.append_todos)} todo(s): {'; '.join(rule.append_todos)}")
+        if moved:
+            notes.append(f"Moved {moved} pending todo(s) to the front ({rule.name})")
+        return notes
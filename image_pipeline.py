@@ -0,0 +1,303 @@
+"""Screenshot preprocessing pipeline that shrinks what is uploaded to the model."""
+
+import asyncio
+import io
+import os
+import time
+
+from PIL import Image as PILImageLib
+
+# Pipeline spec, e.g. "crop=0,0.05,1,1;scale=0.75;gray;encode=jpeg:60"
+PIPELINE_ENV = "FREECAD_AGENT_IMAGE_PIPELINE"
+
+
+def _raw_size(image):
+    """Uncompressed size of a PIL image in bytes."""
+    return image.width * image.height * len(image.getbands())
+
+
+class Crop:
+    """Crop to a region of interest given as fractions of the frame."""
+
+    name = 'crop'
+
+    def __init__(self, left=0.0, top=0.0, right=1.0, bottom=1.0):
+        """Create the stage.
+
+        Args:
+            left, top, right, bottom: Region bounds as fractions (0-1) of the frame
+        """
+        if not (0 <= left < right <= 1 and 0 <= top < bottom <= 1):
+            raise ValueError(f"Invalid crop box: {(left, top, right, bottom)}")
+        self.box = (left, top, right, bottom)
+
+    def __call__(self, image):
+        left, top, right, bottom = self.box
+        return image.crop((
+            round(left * image.width), round(top * image.height),
+            round(right * image.width), round(bottom * image.height),
+        ))
+
+
+class Downscale:
+    """Shrink the frame by a scale factor and/or to a maximum width."""
+
+    name = 'scale'
+
+    def __init__(self, scale=1.0, max_width=None, resample="BILINEAR"):
+        """Create the stage.
+
+        Args:
+            scale: Factor applied to both dimensions
+            max_width: Optional upper bound on the output width
+            resample: PIL resampling filter name
+        """
+        self.scale = scale
+        self.max_width = max_width
+        self.resample = getattr(PILImageLib.Resampling, resample)
+
+    def __call__(self, image):
+        factor = self.scale
+        if self.max_width and image.width * factor > self.max_width:
+            factor = self.max_width / image.width
+        if factor >= 1.0:
+            return image
+        size = (max(1, round(image.width * factor)), max(1, round(image.height * factor)))
+        return image.resize(size, self.resample)
+
+
+class Grayscale:
+    """Drop colour channels."""
+
+    name = 'gray'
+
+    def __call__(self, image):
+        return image.convert('L')
+
+
+class Encode:
+    """Encode the frame as JPEG, WebP or PNG.
+
+    WebP is usually the smallest at a given quality, but check that the
+    model endpoint accepts it before relying on it.
+    """
+
+    name = 'encode'
+
+    FORMATS = {'jpeg': 'JPEG', 'jpg': 'JPEG', 'webp': 'WEBP', 'png': 'PNG'}
+
+    def __init__(self, format="jpeg", quality=75):
+        """Create the stage.
+
+        Args:
+            format: One of jpeg, webp or png
+            quality: Encoder quality (1-100, ignored for PNG)
+        """
+        if format.lower() not in self.FORMATS:
+            raise ValueError(f"Unsupported image format: {format}")
+        self.format = self.FORMATS[format.lower()]
+        self.quality = quality
+
+    def __call__(self, image):
+        buffer = io.BytesIO()
+        if self.format == 'PNG':
+            image.save(buffer, format='PNG')
+        else:
+            if image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+            image.save(buffer, format=self.format, quality=self.quality)
+        return buffer.getvalue()
+
+
+class ProcessedImage:
+    """Encoded screenshot that implements the oagi Image protocol."""
+
+    def __init__(self, data, image):
+        self.data = data
+        self.image = image
+
+    def read(self):
+        """Return the encoded bytes."""
+        return self.data
+
+
+class StageStats:
+    """Running totals for one pipeline stage."""
+
+    __slots__ = ('name', 'calls', 'seconds', 'bytes_out', 'last_seconds', 'last_bytes')
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.bytes_out = 0
+        self.last_seconds = 0.0
+        self.last_bytes = 0
+
+    def record(self, seconds, nbytes):
+        self.calls += 1
+        self.seconds += seconds
+        self.bytes_out += nbytes
+        self.last_seconds = seconds
+        self.last_bytes = nbytes
+
+
+class PreprocessingImageProvider:
+    """Image provider wrapper that runs screenshots through configurable stages.
+
+    Drop-in replacement for the ``image_provider=`` argument of
+    ``TaskerAgent.execute``. Stages run in order in a worker thread; an
+    Encode stage is appended automatically when the list does not end with
+    one. Each stage records its own timing and the bytes it produced (raw
+    pixel bytes for image stages, encoded bytes for Encode).
+    """
+
+    def __init__(self, provider, stages, verbose=False):
+        """Wrap an image provider.
+
+        Args:
+            provider: The wrapped provider (e.g. AsyncScreenshotMaker)
+            stages: List of stage objects (Crop, Downscale, Grayscale, Encode)
+            verbose: Print per-stage timing and sizes after every capture
+        """
+        self.provider = provider
+        self.stages = list(stages)
+        if not self.stages or not isinstance(self.stages[-1], Encode):
+            self.stages.append(Encode())
+        self.verbose = verbose
+
+        self.input_stats = StageStats('input')
+        self.stats = [StageStats(stage.name) for stage in self.stages]
+        self._last = None
+
+    @property
+    def roi(self):
+        """Fractional crop box, or None when the pipeline does not crop."""
+        for stage in self.stages:
+            if isinstance(stage, Crop):
+                return stage.box
+        return None
+
+    def bind_action_handler(self, handler, screen_size=None):
+        """Point the action handler at the cropped region of the screen.
+
+        The model returns coordinates relative to the image it was shown, so
+        when the pipeline crops, clicks must be mapped into the same region.
+
+        Args:
+            handler: Action handler with a set_target_screen method
+            screen_size: (width, height) of the full screen; queried from pyautogui if omitted
+        """
+        if self.roi is None:
+            return
+        from oagi.handler.screen_manager import Screen
+
+        if screen_size is None:
+            import pyautogui
+            screen_size = pyautogui.size()
+        width, height = screen_size
+        left, top, right, bottom = self.roi
+        handler.set_target_screen(Screen(
+            name="roi",
+            x=round(left * width),
+            y=round(top * height),
+            width=round((right - left) * width),
+            height=round((bottom - top) * height),
+        ))
+
+    async def __call__(self):
+        """Capture a screenshot and run it through the pipeline."""
+        captured = await self.provider()
+        loop = asyncio.get_running_loop()
+        self._last = await loop.run_in_executor(None, self._process, captured)
+        return self._last
+
+    async def last_image(self):
+        """Return the last processed screenshot."""
+        if self._last is None:
+            return await self()
+        return self._last
+
+    def _process(self, captured):
+        """Run all stages on one captured image."""
+        start = time.perf_counter()
+        image = captured.image if hasattr(captured, 'image') else PILImageLib.open(io.BytesIO(captured.read()))
+        image.load()
+        self.input_stats.record(time.perf_counter() - start, _raw_size(image))
+
+        data = None
+        for stage, stats in zip(self.stages, self.stats):
+            start = time.perf_counter()
+            if isinstance(stage, Encode):
+                data = stage(image)
+                stats.record(time.perf_counter() - start, len(data))
+            else:
+                image = stage(image)
+                stats.record(time.perf_counter() - start, _raw_size(image))
+
+        if self.verbose:
+            parts = [f"{s.name} {s.last_seconds * 1000:.1f}ms {s.last_bytes / 1024:.0f}KB" for s in self.stats]
+            print(f"[IMAGE] {' | '.join(parts)}")
+
+        return ProcessedImage(data, image)
+
+    def print_summary(self):
+        """Print average timing and output size for every stage."""
+        if not self.input_stats.calls:
+            return
+        print(f"Image pipeline ({self.input_stats.calls} frames, input {self.input_stats.bytes_out / self.input_stats.calls / 1024:.0f}KB raw):")
+        for s in self.stats:
+            print(f"  {s.name:<7} avg {s.seconds / s.calls * 1000:6.1f}ms  avg out {s.bytes_out / s.calls / 1024:8.1f}KB")
+
+
+def parse_stages(spec):
+    """Build stages from a spec string.
+
+    Stages are separated by ';' and run in the given order:
+    ``crop=L,T,R,B`` (fractions), ``scale=F`` or ``width=PX``, ``gray``,
+    ``encode=FORMAT[:QUALITY]``.
+
+    Args:
+        spec: Pipeline spec, e.g. "crop=0,0.05,1,1;scale=0.75;encode=webp:60"
+
+    Returns:
+        List of stage objects
+    """
+    stages = []
+    for part in filter(None, (p.strip() for p in spec.split(';'))):
+        name, _, value = part.partition('=')
+        name = name.strip().lower()
+        if name == 'crop':
+            stages.append(Crop(*(float(v) for v in value.split(','))))
+        elif name == 'scale':
+            stages.append(Downscale(scale=float(value)))
+        elif name == 'width':
+            stages.append(Downscale(max_width=int(value)))
+        elif name in ('gray', 'grey', 'grayscale'):
+            stages.append(Grayscale())
+        elif name == 'encode':
+            fmt, _, quality = value.partition(':')
+            stages.append(Encode(fmt, int(quality) if quality else 75))
+        else:
+            raise ValueError(f"Unknown pipeline stage: {part}")
+    return stages
+
+
+def maybe_preprocess(provider, action_handler=None, **kwargs):
+    """Wrap provider in a preprocessing pipeline when FREECAD_AGENT_IMAGE_PIPELINE is set.
+
+    Args:
+        provider: The image provider to wrap
+        action_handler: Handler to bind to the cropped region, if the pipeline crops
+        **kwargs: Extra PreprocessingImageProvider options
+
+    Returns:
+        The wrapped provider, or the original one when no pipeline is configured
+    """
+    spec = os.environ.get(PIPELINE_ENV, "").strip()
+    if not spec:
+        return provider
+    pipeline = PreprocessingImageProvider(provider, parse_stages(spec), **kwargs)
+    if action_handler is not None:
+        pipeline.bind_action_handler(action_handler)
+    return pipeline
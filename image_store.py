@@ -0,0 +1,137 @@
+"""Content-addressed screenshot store shared by the exporters."""
+
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
+# Set to "webp" to store screenshots as lossless WebP
+IMAGE_STORE_ENV = "FREECAD_AGENT_IMAGE_STORE"
+
+CODECS = ('original', 'webp')
+
+
+def image_digest(data):
+    """SHA-256 hex digest of encoded image bytes (the same digest agent_trace.py uses)."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def image_suffix(data):
+    """Pick a file extension from the image magic bytes."""
+    if data[:3] == b'\xff\xd8\xff':
+        return '.jpg'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return '.webp'
+    return '.png'
+
+
+def to_webp(data):
+    """Re-encode image bytes as lossless WebP (same pixels, usually smaller than PNG)."""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        buffer = io.BytesIO()
+        image.save(buffer, format='WEBP', lossless=True, method=4)
+    return buffer.getvalue()
+
+
+class ContentStore:
+    """Writes each distinct screenshot once, named by its digest.
+
+    A screen that does not change between steps (a dialog waiting, the
+    agent retrying) produces identical bytes, so a long run stores far
+    fewer files than it has screenshots, and every log line that shows the
+    same screen points at the same file. Files already in the directory
+    from an earlier run are reused as well.
+
+    Hashing happens on the caller's thread; re-encoding and writing run on
+    a thread pool. Files are written under a temporary name and renamed,
+    so a file that exists is always complete.
+    """
+
+    def __init__(self, directory, codec=None, max_workers=None):
+        """Open the store.
+
+        Args:
+            directory: Directory to write images to
+            codec: 'original' to keep the captured bytes or 'webp' for lossless
+                WebP (defaults to FREECAD_AGENT_IMAGE_STORE, else 'original')
+            max_workers: Threads for encoding and writing
+        """
+        if codec is None:
+            codec = os.environ.get(IMAGE_STORE_ENV, "").strip().lower() or 'original'
+        if codec not in CODECS:
+            raise ValueError(f"Unknown image codec: {codec} (expected one of {', '.join(CODECS)})")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.codec = codec
+        self._names = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or min(4, os.cpu_count() or 1),
+                                        thread_name_prefix="image-store")
+
+        self.images = 0
+        self.stored = 0
+        self.duplicates = 0
+        self.bytes_in = 0
+        self.bytes_written = 0
+        self.errors = 0
+
+    def put(self, data):
+        """Store image bytes unless they are stored already.
+
+        Returns:
+            File name of the image, relative to the store directory
+        """
+        self.images += 1
+        self.bytes_in += len(data)
+        digest = image_digest(data)
+        with self._lock:
+            name = self._names.get(digest)
+            if name is not None:
+                self.duplicates += 1
+                return name
+            suffix = '.webp' if self.codec == 'webp' else image_suffix(data)
+            name = self._names[digest] = f"{digest}{suffix}"
+
+        target = self.directory / name
+        if target.exists():
+            self.duplicates += 1
+        else:
+            self.stored += 1
+            self._pool.submit(self._write, data, target).add_done_callback(partial(self._check_write, digest))
+        return name
+
+    def path(self, name):
+        return self.directory / name
+
+    def _write(self, data, target):
+        if self.codec == 'webp' and image_suffix(data) != '.webp':
+            data = to_webp(data)
+        tmp = target.with_name(target.name + '.tmp')
+        tmp.write_bytes(data)
+        os.replace(tmp, target)
+        with self._lock:
+            self.bytes_written += len(data)
+
+    def _check_write(self, digest, future):
+        """Report a failed background write and forget its name, so the image is written again next time."""
+        if future.exception() is not None:
+            with self._lock:
+                self._names.pop(digest, None)
+                self.errors += 1
+            print(f"Error writing screenshot: {future.exception()}")
+
+    def close(self):
+        """Wait for queued writes."""
+        self._pool.shutdown(wait=True)
+
+    def summary(self):
+        """One line on how much deduplication and encoding saved."""
+        if not self.images:
+            return "no screenshots"
+        return (f"{self.images} screenshots, {self.stored} files written ({self.duplicates} duplicates), "
+                f"{self.bytes_in / 1e6:.1f} MB in, {self.bytes_written / 1e6:.1f} MB written ({self.codec})")
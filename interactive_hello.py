@@ -1,98 +1,168 @@
 import asyncio
-from oagi import AsyncScreenshotMaker, AsyncPyautoguiActionHandler, TaskerAgent, AsyncAgentObserver
-
-class InteractiveObserver(AsyncAgentObserver):
-    """Observer that provides feedback and allows for dynamic guidance."""
-
-    def __init__(self, agent):
-        super().__init__()
-        self.agent = agent
-        self.step_count = 0
-
-    async def on_event(self, event):
+import os
+from oagi import TaskerAgent
+from observer_base import ObserverBase
+from async_console import AsyncConsole
+from agent_pipeline import build_pipeline
+from task_defs import apply_task, load_task
+
+DEFAULT_TASK = "partdesign_cube"
+
+# Seconds after which a paused session resumes by itself (unset or 0 waits for a command)
+AUTO_CONTINUE_ENV = "FREECAD_AGENT_AUTO_CONTINUE"
+
+
+def auto_continue_seconds(value=None):
+    """Auto-continue timeout from value, else FREECAD_AGENT_AUTO_CONTINUE.
+
+    Returns:
+        Seconds, or None to wait for a command however long it takes
+    """
+    if value is None:
+        value = os.environ.get(AUTO_CONTINUE_ENV, "").strip().lower()
+        if value in ('', 'off'):
+            return None
+        try:
+            value = float(value)
+        except ValueError:
+            raise ValueError(f"{AUTO_CONTINUE_ENV} must be a number of seconds, not {value!r}") from None
+    if value < 0:
+        raise ValueError(f"Auto-continue timeout must not be negative: {value:g}")
+    return value or None
+
+class InteractiveObserver(ObserverBase):
+    """Observer that provides feedback and allows for dynamic guidance.
+
+    Commands are read from stdin without blocking the event loop, so the
+    agent runs at full speed until the operator types 'pause'. Commands
+    typed at any time are applied before the next step.
+    """
+
+    def __init__(self, agent, console=None, auto_continue=None, start_paused=False, sinks=None):
+        """Create the observer.
+
+        Args:
+            agent: The TaskerAgent being observed
+            console: AsyncConsole to read commands from (one on stdin by default)
+            auto_continue: Seconds after which a paused session resumes by itself (None waits)
+            start_paused: Pause before the first step
+            sinks: Render sinks (defaults to a DETAIL ConsoleSink)
+        """
+        super().__init__(agent, sinks=sinks)
+        self.console = console or AsyncConsole()
+        self.auto_continue = auto_continue
+        self.paused = start_paused
+        self.single_step = False
+
+    async def on_event(self, event, fast=None):
         """Called when an event occurs during agent execution."""
-        # Store the event
-        await super().on_event(event)
-
-        self.step_count += 1
-
-        print(f"\n{'='*60}")
-        print(f"STEP {self.step_count}")
-        print(f"{'='*60}")
-
-        # Display current todo if available
-        if hasattr(self.agent, 'current_todo_index'):
-            print(f"Current todo index: {self.agent.current_todo_index}")
-
-        # Display event information
-        print(f"Event type: {type(event).__name__}")
-
-        # Show relevant event details
-        if hasattr(event, '__dict__'):
-            for key, value in event.__dict__.items():
-                if key in ['screenshot', 'image', 'raw_image']:
-                    print(f"{key}: [Image data - {type(value).__name__}]")
-                elif isinstance(value, str) and len(value) > 200:
-                    print(f"{key}: {value[:200]}...")
-                elif not key.startswith('_'):
-                    print(f"{key}: {value}")
-
-        # Interactive prompt
-        print(f"\n{'='*60}")
-        user_input = input("Enter command (continue/stop/add [instruction]/help): ").strip().lower()
-
-        if user_input == 'stop':
+        # Store and display the event
+        stored = await super().on_event(event, fast)
+
+        # Apply commands typed since the last step
+        self.console.start()
+        for command in self.console.pending():
+            self._handle_command(command)
+
+        if self.single_step:
+            self.single_step = False
+            self.paused = True
+
+        # Only block when the operator asked to pause
+        while self.paused:
+            print(f"\n{'='*60}")
+            if self.auto_continue:
+                print(f"Paused. Enter command (continue/step/stop/add [instruction]/help), "
+                      f"auto-continue in {self.auto_continue:g}s:")
+            else:
+                print("Paused. Enter command (continue/step/stop/add [instruction]/help):")
+            command = await self.console.read(self.auto_continue)
+            if command is None:
+                print("Resuming execution...")
+                self.paused = False
+                break
+            self._handle_command(command)
+
+        return stored
+
+    def _handle_command(self, command):
+        """Apply one operator command."""
+        command = command.strip()
+        keyword = command.split(' ', 1)[0].lower()
+
+        if keyword == 'stop':
             print("Stopping execution...")
             raise KeyboardInterrupt("User requested stop")
-        elif user_input.startswith('add '):
-            instruction = user_input[4:].strip()
+        elif keyword == 'pause':
+            self.paused = True
+            print("Pausing after this step...")
+        elif keyword == 'continue':
+            self.paused = False
+        elif keyword == 'step':
+            self.paused = False
+            self.single_step = True
+        elif keyword == 'add':
+            instruction = command[4:].strip()
             if instruction:
                 self.agent.append_todo(instruction)
                 print(f"Added new todo: {instruction}")
-        elif user_input == 'help':
+        elif keyword == 'help':
             print("\nAvailable commands:")
-            print("  continue - Continue to next step")
+            print("  pause - Pause before the next step")
+            print("  continue - Resume running")
+            print("  step - Run one more step, then pause again")
             print("  stop - Stop execution")
             print("  add [instruction] - Add a new todo to the list")
             print("  help - Show this help message")
+        elif keyword:
+            print(f"Unknown command: {command} (type 'help')")
 
-async def main():
+async def main(task=DEFAULT_TASK, auto_continue=None):
     agent = TaskerAgent(model="lux-thinker-1")
 
-    # Set up the observer
-    observer = InteractiveObserver(agent)
+    # Set up the observer; auto_continue (or FREECAD_AGENT_AUTO_CONTINUE) resumes a pause by itself
+    observer = InteractiveObserver(agent, auto_continue=auto_continue_seconds(auto_continue))
     agent.step_observer = observer
 
-    agent.set_task(
-        task="Use FreeCAD to make a part with PartDesign workbench",
-        todos=[
-            "Ensure you are in the PartDesign workbench. Look at the workbench dropdown at the top toolbar to verify.",
-            "Create a new Body if one doesn't exist: Click 'Create Body' button in the PartDesign toolbar or menu.",
-            "Create a new sketch: Click the 'Create Sketch' button (looks like a pencil/sheet icon) in the PartDesign toolbar.",
-            "Select the XY plane: In the dialog that appears, click on 'XY_Plane' option and click OK button.",
-            "Draw a rectangle: Use the rectangle tool (polyline or rectangle icon in sketch toolbar) to draw a square roughly centered on the origin.",
-            "Set rectangle dimensions: Select the rectangle, then use the constraint tools to set horizontal and vertical distances to 20mm. Make sure all 4 sides are constrained.",
-            "Center the rectangle: Add symmetric or coincident constraints to center the rectangle on the origin (0,0). The rectangle corners should be equidistant from the origin.",
-            "Draw a circle: Use the circle tool to draw a circle at the center (origin) of the rectangle.",
-            "Constrain circle diameter: Select the circle, then use the radius/diameter constraint to set it to 10mm diameter (5mm radius).",
-            "Verify the sketch is fully constrained: The sketch should turn green when fully constrained. All elements should have no degrees of freedom remaining.",
-            "Close the sketch: Click the 'Close' button in the sketch toolbar, or press Escape key to exit sketch mode.",
-            "Apply Pad feature: With the sketch selected in the tree view, click the 'Pad' button (first icon in PartDesign toolbar showing an extruded shape). In the Pad dialog, set the length to 20mm and click OK.",
-        ]
-    )
+    # Task and todos come from tasks/<name>.json
+    definition = load_task(task)
+    instruction = apply_task(agent, definition)
 
-    print("Starting interactive session with OpenAGI agent...")
-    print("You will be prompted after each step to continue, stop, or add new instructions.\n")
+    # Checkpoints plus the optional FREECAD_AGENT_* features (see agent_pipeline.py)
+    pipeline = build_pipeline(agent, definition)
 
-    result = await agent.execute(
-        instruction="Use FreeCAD to make a part with PartDesign workbench",
-        action_handler=AsyncPyautoguiActionHandler(),
-        image_provider=AsyncScreenshotMaker(),
-    )
+    print("Starting interactive session with OpenAGI agent...")
+    print("The agent runs freely; type a command and press Enter at any time.")
+    print("Commands: pause, continue, step, stop, add [instruction], help")
+    if observer.auto_continue:
+        print(f"A pause resumes by itself after {observer.auto_continue:g}s without input.")
+    print()
+
+    try:
+        result = await agent.execute(
+            instruction=instruction,
+            action_handler=pipeline.action_handler,
+            image_provider=pipeline.image_provider,
+        )
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        # 'stop' raises KeyboardInterrupt; Ctrl+C arrives as a cancellation
+        print("\n\nExecution stopped by user.")
+        print(f"Completed {observer.step_count} steps before stopping.")
+        pipeline.print_hint()
+        return
+    except Exception as e:
+        print(f"\n\nExecution error: {e}")
+        print(f"Completed {observer.step_count} steps before error.")
+        pipeline.print_hint()
+        raise
+    finally:
+        pipeline.close()
 
     print(f"\n{'='*60}")
-    print(f"Execution completed: {result}")
+    print(f"Execution result: {pipeline.outcome(result)}")
     print(f"Total steps: {observer.step_count}")
+    observer.progress.print_summary()
+    pipeline.print_summary()
     print(f"{'='*60}")
 
 if __name__ == "__main__":
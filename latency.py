@@ -0,0 +1,242 @@
+"""Per-step latency instrumentation for TaskerAgent runs."""
+
+import math
+import os
+import time
+from collections import defaultdict
+
+from observer_base import ObserverWrapper
+from todo_ops import TODO_START
+
+# Write a Prometheus text-format file here at the end of a run
+PROMETHEUS_ENV = "FREECAD_AGENT_PROMETHEUS"
+
+PHASES = ('capture', 'planning', 'inference', 'action', 'delay', 'observer')
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.01, 0.03, 0.1, 0.3, 1.0, 3.0, 10.0, math.inf)
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class TimedImageProvider:
+    """Image provider wrapper that records capture time."""
+
+    def __init__(self, provider, recorder):
+        self.provider = provider
+        self.recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self.provider, name)
+
+    async def __call__(self):
+        start = time.perf_counter()
+        image = await self.provider()
+        end = time.perf_counter()
+        self.recorder.record('capture', end - start)
+        self.recorder.last_capture_end = end
+        return image
+
+
+class TimedActionHandler:
+    """Action handler wrapper that splits execution time into action and delay.
+
+    The delay is what the wrapped handler reports as ``last_delay`` (settle
+    mode), otherwise its configured ``post_batch_delay``.
+    """
+
+    def __init__(self, handler, recorder):
+        self.handler = handler
+        self.recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self.handler, name)
+
+    async def __call__(self, actions):
+        start = time.perf_counter()
+        try:
+            await self.handler(actions)
+        finally:
+            total = time.perf_counter() - start
+            if hasattr(self.handler, 'last_delay'):
+                delay = self.handler.last_delay
+            else:
+                config = getattr(self.handler, 'config', None)
+                delay = getattr(config, 'post_batch_delay', 0.0)
+            delay = min(delay, total)
+            self.recorder.record('action', total - delay)
+            self.recorder.record('delay', delay)
+
+
+class TimedObserver(ObserverWrapper):
+    """step_observer wrapper that times the wrapped observer and marks model phases.
+
+    Screenshot-to-StepEvent time is counted as inference (upload plus
+    model call); screenshot-to-PlanEvent time for initial planning and
+    reflection is counted as planning.
+    """
+
+    def __init__(self, observer, recorder):
+        super().__init__(observer)
+        self.recorder = recorder
+
+    async def on_event(self, event):
+        recorder = self.recorder
+        now = time.perf_counter()
+        event_type = type(event).__name__
+
+        if event_type == 'SplitEvent':
+            match = TODO_START.match(event.label or '')
+            if match:
+                recorder.current_todo = int(match.group(1))
+        elif recorder.last_capture_end is not None:
+            if event_type == 'StepEvent':
+                recorder.record('inference', now - recorder.last_capture_end)
+                recorder.last_capture_end = None
+            elif event_type == 'PlanEvent' and event.phase in ('initial', 'reflection'):
+                recorder.record('planning', now - recorder.last_capture_end)
+                recorder.last_capture_end = None
+
+        if self.observer is None:
+            return
+        start = time.perf_counter()
+        try:
+            await self.observer.on_event(event)
+        finally:
+            recorder.record('observer', time.perf_counter() - start)
+
+
+class LatencyRecorder:
+    """Collects per-phase timings and reports p50/p95/p99 per phase and per todo.
+
+    Usage::
+
+        latency = LatencyRecorder(agent)           # wraps agent.step_observer
+        action_handler, image_provider = latency.instrument(action_handler, image_provider)
+        await agent.execute(..., action_handler=action_handler, image_provider=image_provider)
+        latency.print_report()
+    """
+
+    def __init__(self, agent=None):
+        """Create the recorder.
+
+        Args:
+            agent: TaskerAgent whose step_observer is wrapped (set the observer first)
+        """
+        self.samples = defaultdict(list)
+        self.todo_samples = defaultdict(lambda: defaultdict(list))
+        self.current_todo = None
+        self.last_capture_end = None
+        if agent is not None:
+            agent.step_observer = TimedObserver(agent.step_observer, self)
+
+    def instrument(self, action_handler, image_provider):
+        """Return timing wrappers for an action handler and image provider."""
+        return self.wrap_action_handler(action_handler), self.wrap_image_provider(image_provider)
+
+    def wrap_action_handler(self, handler):
+        return TimedActionHandler(handler, self)
+
+    def wrap_image_provider(self, provider):
+        return TimedImageProvider(provider, self)
+
+    def record(self, phase, seconds):
+        """Add one timing sample for phase (and for the current todo)."""
+        self.samples[phase].append(seconds)
+        if self.current_todo is not None:
+            self.todo_samples[self.current_todo][phase].append(seconds)
+
+    def print_report(self):
+        """Print per-phase histograms and per-todo percentiles."""
+        if not self.samples:
+            return
+
+        print(f"\n{'='*60}")
+        print("LATENCY BY PHASE (ms)")
+        print(f"{'='*60}")
+        print(f"{'phase':<10}{'count':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}{'total s':>9}")
+        for phase in PHASES:
+            values = sorted(self.samples.get(phase, ()))
+            if not values:
+                continue
+            print(f"{phase:<10}{len(values):>6}"
+                  f"{percentile(values, 50) * 1000:>9.1f}{percentile(values, 95) * 1000:>9.1f}"
+                  f"{percentile(values, 99) * 1000:>9.1f}{values[-1] * 1000:>9.1f}{sum(values):>9.1f}")
+
+        print("\nHistogram (count per bucket):")
+        labels = ['<=10ms', '<=30ms', '<=100ms', '<=300ms', '<=1s', '<=3s', '<=10s', '>10s']
+        print(f"{'phase':<10}" + ''.join(f"{label:>8}" for label in labels))
+        for phase in PHASES:
+            values = self.samples.get(phase)
+            if values:
+                print(f"{phase:<10}" + ''.join(f"{count:>8}" for count in self._bucket_counts(values)))
+
+        if self.todo_samples:
+            print("\nPer todo p50/p95/p99 (ms):")
+            for todo in sorted(self.todo_samples):
+                parts = []
+                for phase in PHASES:
+                    values = sorted(self.todo_samples[todo].get(phase, ()))
+                    if values:
+                        parts.append(f"{phase} {percentile(values, 50) * 1000:.0f}/"
+                                     f"{percentile(values, 95) * 1000:.0f}/{percentile(values, 99) * 1000:.0f}")
+                print(f"  todo {todo}: " + ', '.join(parts))
+        print(f"{'='*60}")
+
+        path = os.environ.get(PROMETHEUS_ENV)
+        if path:
+            self.write_prometheus(path)
+            print(f"Latency metrics written to: {path}")
+
+    @staticmethod
+    def _bucket_counts(values):
+        counts = [0] * len(BUCKETS)
+        for value in values:
+            for i, bound in enumerate(BUCKETS):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+        return counts
+
+    def write_prometheus(self, path):
+        """Write phase histograms and per-todo quantiles in Prometheus text format."""
+        lines = [
+            "# HELP freecad_agent_phase_seconds Time spent in each agent step phase.",
+            "# TYPE freecad_agent_phase_seconds histogram",
+        ]
+        for phase in PHASES:
+            values = self.samples.get(phase)
+            if not values:
+                continue
+            cumulative = 0
+            for bound, count in zip(BUCKETS, self._bucket_counts(values)):
+                cumulative += count
+                le = '+Inf' if bound == math.inf else f"{bound:g}"
+                lines.append(f'freecad_agent_phase_seconds_bucket{{phase="{phase}",le="{le}"}} {cumulative}')
+            lines.append(f'freecad_agent_phase_seconds_sum{{phase="{phase}"}} {sum(values):.6f}')
+            lines.append(f'freecad_agent_phase_seconds_count{{phase="{phase}"}} {len(values)}')
+
+        lines += [
+            "# HELP freecad_agent_todo_phase_seconds Per-todo phase latency quantiles.",
+            "# TYPE freecad_agent_todo_phase_seconds summary",
+        ]
+        for todo in sorted(self.todo_samples):
+            for phase in PHASES:
+                values = sorted(self.todo_samples[todo].get(phase, ()))
+                if not values:
+                    continue
+                labels = f'todo="{todo}",phase="{phase}"'
+                for q in (0.5, 0.95, 0.99):
+                    lines.append(f'freecad_agent_todo_phase_seconds{{{labels},quantile="{q}"}} '
+                                 f'{percentile(values, q * 100):.6f}')
+                lines.append(f'freecad_agent_todo_phase_seconds_sum{{{labels}}} {sum(values):.6f}')
+                lines.append(f'freecad_agent_todo_phase_seconds_count{{{labels}}} {len(values)}')
+
+        with open(path, 'w') as f:
+            f.write("\n".join(lines) + "\n")
@@ -0,0 +1,217 @@
+"""Shared observer base with lazy, level-controlled rendering to pluggable sinks."""
+
+import json
+import sys
+
+from progress import ProgressTracker
+from step_store import SpillingAgentObserver
+
+# Render levels: a sink emits everything at or below its level
+QUIET = -1   # nothing
+INFO = 1     # step banner, current todo, event type, notes such as guidance
+DETAIL = 2   # plus every public event field
+
+IMAGE_FIELDS = ('screenshot', 'image', 'raw_image')
+
+
+class ObserverWrapper:
+    """Base for step_observer wrappers (checkpoints, traces, stuck detection, budgets, ...).
+
+    Holds the wrapped observer, which may be None, passes events on to it
+    with ``forward(event)`` and everything else by attribute lookup, so the
+    wrapped observer's own attributes stay reachable through the wrapper.
+    """
+
+    observer = None
+
+    def __init__(self, observer=None):
+        self.observer = observer
+
+    def wrap(self, agent):
+        """Take the place of the agent's step_observer, wrapping the current one."""
+        self.observer = agent.step_observer
+        agent.step_observer = self
+
+    def __getattr__(self, name):
+        return getattr(self.observer, name)
+
+    async def forward(self, event):
+        """Pass an event on to the wrapped observer."""
+        if self.observer is not None:
+            await self.observer.on_event(event)
+
+
+class EventView:
+    """One observed event as seen by the sinks.
+
+    Field formatting is deferred until a sink asks for it and then done
+    once, however many sinks read it.
+    """
+
+    __slots__ = ('step', 'event', 'event_type', 'todo', 'notes', '_fields')
+
+    def __init__(self, step, event, todo=None, notes=None):
+        self.step = step
+        self.event = event
+        self.event_type = type(event).__name__
+        self.todo = todo
+        self.notes = notes or []
+        self._fields = None
+
+    def fields(self, limit=200):
+        """Public event fields as (key, text) pairs, images summarised."""
+        if self._fields is None:
+            fields = []
+            for key, value in vars(self.event).items():
+                if key in IMAGE_FIELDS:
+                    fields.append((key, f"[Image data - {type(value).__name__}]"))
+                elif isinstance(value, str) and len(value) > limit:
+                    fields.append((key, f"{value[:limit]}..."))
+                elif not key.startswith('_'):
+                    fields.append((key, str(value)))
+            self._fields = fields
+        return self._fields
+
+
+class NullSink:
+    """Sink that never emits; observers skip rendering entirely."""
+
+    level = QUIET
+
+    def emit(self, view):
+        pass
+
+    def close(self):
+        pass
+
+
+class ConsoleSink:
+    """Writes the familiar step banners to a text stream in one write per event."""
+
+    def __init__(self, level=DETAIL, stream=None):
+        """Create the sink.
+
+        Args:
+            level: INFO for banners and notes only, DETAIL to add event fields
+            stream: Text stream to write to (defaults to sys.stdout)
+        """
+        self.level = level
+        self.stream = stream
+
+    def emit(self, view):
+        bar = '=' * 60
+        parts = [f"\n{bar}\nSTEP {view.step}\n{bar}\n"]
+        if view.todo is not None:
+            index, total, text = view.todo
+            parts.append(f"Current todo [{index + 1}/{total}]: {text}\n")
+        parts.append(f"Event type: {view.event_type}\n")
+        for label, text in view.notes:
+            parts.append(f"\n[{label}] {text}\n")
+        if self.level >= DETAIL:
+            for key, text in view.fields():
+                parts.append(f"{key}: {text}\n")
+        parts.append(f"{bar}\n\n")
+        (self.stream or sys.stdout).write(''.join(parts))
+
+    def close(self):
+        pass
+
+
+class JsonlSink:
+    """Writes one JSON object per rendered event."""
+
+    def __init__(self, path, level=INFO):
+        """Create the sink.
+
+        Args:
+            path: Output file path
+            level: INFO for step/type/todo/notes, DETAIL to add event fields
+        """
+        self.level = level
+        self._file = open(path, 'w')
+
+    def emit(self, view):
+        record = {'step': view.step, 'type': view.event_type}
+        if view.todo is not None:
+            record['todo_index'], record['todo_total'], record['todo'] = view.todo
+        if view.notes:
+            record['notes'] = [{'label': label, 'text': text} for label, text in view.notes]
+        if self.level >= DETAIL:
+            record['fields'] = dict(view.fields())
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ObserverBase(SpillingAgentObserver):
+    """Common observer: records events, streams exports and renders to sinks.
+
+    Subclasses override ``process(event)`` to react to an event and return
+    notes, as (label, text) pairs, to show with it. Nothing is formatted
+    when no sink wants it. Reactions that must take effect before the
+    agent continues (such as editing the todo list) belong in
+    ``fast_path(event)`` instead, which observer_queue.QueuedObserver
+    runs inline while the rest of on_event runs in the background.
+    """
+
+    def __init__(self, agent, sinks=None, exporter=None, spill_dir=None):
+        """Create the observer.
+
+        Args:
+            agent: The TaskerAgent being observed
+            sinks: Render sinks (defaults to a DETAIL ConsoleSink)
+            exporter: Optional StreamingExporter fed with every event
+            spill_dir: Directory for spilled screenshots; temporary if omitted
+        """
+        super().__init__(spill_dir)
+        self.agent = agent
+        self.progress = ProgressTracker(agent)
+        self.step_count = 0
+        self.exporter = exporter
+        self.sinks = list(sinks) if sinks is not None else [ConsoleSink()]
+        self.level = max((sink.level for sink in self.sinks), default=QUIET)
+
+    async def on_event(self, event, fast=None):
+        """Called when an event occurs during agent execution.
+
+        Args:
+            event: The event
+            fast: Notes from fast_path(event) when the caller already ran it
+        """
+        stored = await super().on_event(event)
+        if self.exporter:
+            self.exporter.write(event)
+
+        self.step_count += 1
+        self.progress.update(event)
+        if fast is None:
+            fast = self.fast_path(event)
+        notes = self.process(event)
+        if fast:
+            notes = fast + (notes or [])
+
+        if self.level >= INFO:
+            view = EventView(self.step_count, event, self.current_todo(), notes)
+            for sink in self.sinks:
+                if sink.level >= INFO:
+                    sink.emit(view)
+        return stored
+
+    def fast_path(self, event):
+        """React to an event before the agent continues; return notes."""
+        return None
+
+    def process(self, event):
+        """React to an event; return (label, text) notes to render with it."""
+        return None
+
+    def current_todo(self):
+        """Return (index, total, text) for the todo being executed, or None."""
+        return self.progress.current()
+
+    def close_sinks(self):
+        """Close all sinks (files are flushed per event, so this is optional)."""
+        for sink in self.sinks:
+            sink.close()
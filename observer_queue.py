@@ -0,0 +1,206 @@
+"""Run a step observer on a background task behind a bounded queue."""
+
+import asyncio
+import os
+import time
+import traceback
+from collections import deque
+
+from env_flags import TRUE_VALUES
+from observer_base import ObserverWrapper
+
+# Queue the observer's events: block, drop or coalesce, optionally ":SIZE"
+QUEUE_ENV = "FREECAD_AGENT_OBSERVER_QUEUE"
+
+POLICIES = ('block', 'drop', 'coalesce')
+
+# Todo boundaries are never dropped or coalesced; ProgressTracker relies on them
+KEEP = frozenset({'SplitEvent'})
+
+
+class QueuedObserver(ObserverWrapper):
+    """step_observer wrapper that returns to the agent as soon as an event is queued.
+
+    The wrapped observer's ``on_event`` runs on a background task, so
+    rendering, exporting and file I/O overlap with the model call and the
+    actions instead of delaying them. Work that has to happen before the
+    agent moves on is marked by defining ``fast_path(event)`` on the
+    observer. It runs inline, and its result (a list of notes) is handed to
+    ``on_event(event, fast)`` when the event is processed, as ObserverBase
+    does.
+
+    When the queue is full the policy decides:
+        block:    wait for space (nothing is lost)
+        drop:     discard the new event
+        coalesce: the new event replaces the newest queued event of its
+                  type, keeping the fast-path notes of both
+    SplitEvents always wait for space.
+
+    Do not queue an observer that is meant to hold up the agent, such as
+    InteractiveObserver's pause.
+    """
+
+    def __init__(self, observer, maxsize=256, policy='block'):
+        """Wrap an observer.
+
+        Args:
+            observer: The step observer to run in the background
+            maxsize: Queue capacity in events
+            policy: 'block', 'drop' or 'coalesce'
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown queue policy: {policy} (expected one of {', '.join(POLICIES)})")
+        super().__init__(observer)
+        self.maxsize = maxsize
+        self.policy = policy
+        self.fast_path = getattr(observer, 'fast_path', None)
+
+        self.items = deque()
+        self.worker = None
+        self.failure = None
+        self._ready = asyncio.Event()
+        self._space = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+        self.enqueued = 0
+        self.processed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.depth_total = 0
+        self.blocked_seconds = 0.0
+
+    @property
+    def depth(self):
+        """Events waiting to be processed."""
+        return len(self.items)
+
+    async def on_event(self, event):
+        if self.failure is not None:
+            failure, self.failure = self.failure, None
+            raise failure
+        fast = self.fast_path(event) if self.fast_path is not None else None
+        if self.worker is None:
+            self.worker = asyncio.ensure_future(self._drain())
+
+        if len(self.items) >= self.maxsize and await self._make_room(event, fast):
+            return
+        self._put(event, fast)
+
+    def _put(self, event, fast):
+        self.items.append((event, fast))
+        self.enqueued += 1
+        depth = len(self.items)
+        self.depth_total += depth
+        if depth > self.max_depth:
+            self.max_depth = depth
+        self._idle.clear()
+        self._ready.set()
+
+    async def _make_room(self, event, fast):
+        """Apply the policy to a full queue.
+
+        Returns:
+            True if the event was dropped or merged, False once there is space
+        """
+        event_type = type(event).__name__
+        if event_type not in KEEP:
+            if self.policy == 'drop':
+                self.dropped += 1
+                return True
+            if self.policy == 'coalesce':
+                for i in range(len(self.items) - 1, -1, -1):
+                    queued, queued_fast = self.items[i]
+                    if type(queued).__name__ == event_type:
+                        del self.items[i]
+                        if queued_fast:
+                            fast = queued_fast + (fast or [])
+                        self.coalesced += 1
+                        self._put(event, fast)
+                        return True
+
+        start = time.perf_counter()
+        while len(self.items) >= self.maxsize:
+            self._space.clear()
+            await self._space.wait()
+        self.blocked_seconds += time.perf_counter() - start
+        return False
+
+    async def _drain(self):
+        """Process queued events in order until cancelled."""
+        while True:
+            if not self.items:
+                self._idle.set()
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+            event, fast = self.items.popleft()
+            self._space.set()
+            try:
+                if self.fast_path is not None:
+                    await self.observer.on_event(event, fast)
+                else:
+                    await self.observer.on_event(event)
+            except Exception:
+                self.errors += 1
+                print(f"\n[OBSERVER] error while processing {type(event).__name__}:")
+                traceback.print_exc()
+            except BaseException as e:
+                # KeyboardInterrupt and the like surface on the next event
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+                self.failure = e
+            self.processed += 1
+
+    async def close(self):
+        """Process everything still queued, then stop the background task."""
+        if self.worker is None:
+            return
+        await self._idle.wait()
+        self.worker.cancel()
+        try:
+            await self.worker
+        except asyncio.CancelledError:
+            pass
+        self.worker = None
+        if self.failure is not None:
+            failure, self.failure = self.failure, None
+            raise failure
+
+    def print_summary(self):
+        """Print queue depth and what the policy had to drop or merge."""
+        if hasattr(self.observer, 'print_summary'):
+            self.observer.print_summary()
+        if not self.enqueued:
+            return
+        print(f"Observer queue ({self.policy}, size {self.maxsize}): {self.processed} events processed, "
+              f"mean depth {self.depth_total / self.enqueued:.1f}, max depth {self.max_depth}")
+        if self.dropped or self.coalesced or self.blocked_seconds or self.errors:
+            print(f"  dropped {self.dropped}, coalesced {self.coalesced}, "
+                  f"blocked {self.blocked_seconds:.2f}s, observer errors {self.errors}")
+
+
+def maybe_queue(observer):
+    """Queue the observer's events when FREECAD_AGENT_OBSERVER_QUEUE is set.
+
+    The value is the policy, optionally followed by the size, e.g.
+    "coalesce:64".
+
+    Returns:
+        A QueuedObserver, or the observer itself when queueing is off
+    """
+    spec = os.environ.get(QUEUE_ENV, "").strip().lower()
+    if not spec or spec in ("0", "off"):
+        return observer
+    policy, _, size = spec.partition(':')
+    if policy in TRUE_VALUES:
+        policy = 'block'
+    return QueuedObserver(observer, maxsize=int(size) if size else 256, policy=policy)
+
+
+async def drain(observer):
+    """Flush a QueuedObserver (no-op for anything else)."""
+    if isinstance(observer, QueuedObserver):
+        await observer.close()
@@ -0,0 +1,329 @@
+"""Offline stand-ins for the screen, the input devices and the model.
+
+These let a TaskerAgent run end to end without a display, FreeCAD or API
+access:
+- ``RecordedScreen`` serves recorded (or synthetic) frames in place of AsyncScreenshotMaker
+- ``NullActionHandler`` accepts actions in place of AsyncPyautoguiActionHandler
+- ``ScriptedModel`` replays model responses, from a streamed JSONL log or a synthetic script
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+from types import SimpleNamespace
+
+from PIL import Image, ImageDraw
+
+from oagi.agent.tasker.models import PlannerOutput, ReflectionOutput
+from oagi.types import Action, ActionType, Step
+
+from image_pipeline import ProcessedImage
+from todo_ops import TODO_START
+
+FRAME_SUFFIXES = ('.png', '.jpg', '.jpeg', '.webp')
+
+
+class RecordedScreen:
+    """Image provider that serves a fixed sequence of frames, looping at the end."""
+
+    def __init__(self, frames):
+        """Create the screen.
+
+        Args:
+            frames: List of (encoded bytes, PIL image) pairs
+        """
+        if not frames:
+            raise ValueError("RecordedScreen needs at least one frame")
+        self.frames = frames
+        self.captures = 0
+        self._last = None
+
+    @classmethod
+    def from_directory(cls, directory, limit=None):
+        """Load every screenshot in a directory, in file name order.
+
+        Exports name screenshots by digest, so this is not capture order;
+        use from_log to replay a run's frames in sequence.
+        """
+        names = sorted(name for name in os.listdir(directory) if name.lower().endswith(FRAME_SUFFIXES))
+        return cls([cls._load_frame(os.path.join(directory, name)) for name in names[:limit]])
+
+    @classmethod
+    def from_log(cls, path, limit=None):
+        """Load the screenshots of a streamed JSONL log in capture order.
+
+        A screen that repeated in the run repeats here too; each file is
+        decoded once.
+        """
+        base = os.path.dirname(os.path.abspath(path))
+        loaded = {}
+        frames = []
+        with open(path) as f:
+            for line in f:
+                ref = json.loads(line).get('image')
+                if not ref or '://' in ref:
+                    continue
+                if ref not in loaded:
+                    loaded[ref] = cls._load_frame(os.path.join(base, ref))
+                frames.append(loaded[ref])
+                if limit and len(frames) >= limit:
+                    break
+        return cls(frames)
+
+    @staticmethod
+    def _load_frame(path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        image = Image.open(io.BytesIO(data))
+        image.load()
+        return data, image
+
+    @classmethod
+    def synthetic(cls, count=8, size=(1260, 700), quality=85):
+        """Generate frames the size of a default screenshot, each slightly different."""
+        frames = []
+        for i in range(count):
+            image = Image.new('RGB', size, (48, 52, 60))
+            draw = ImageDraw.Draw(image)
+            draw.rectangle((0, 0, size[0], 28), fill=(220, 220, 220))
+            draw.rectangle((size[0] - 300, 28, size[0], size[1]), fill=(235, 235, 235))
+            offset = 40 + i * 30
+            draw.rectangle((offset, 120, offset + 200, 320), outline=(90, 200, 255), width=3)
+            draw.text((20, 6), f"Frame {i + 1}", fill=(0, 0, 0))
+            buffer = io.BytesIO()
+            image.save(buffer, format='JPEG', quality=quality)
+            frames.append((buffer.getvalue(), image))
+        return cls(frames)
+
+    async def __call__(self):
+        await asyncio.sleep(0)
+        data, image = self.frames[self.captures % len(self.frames)]
+        self.captures += 1
+        self._last = ProcessedImage(data, image)
+        return self._last
+
+    async def last_image(self):
+        return self._last if self._last is not None else await self()
+
+    def set_target_screen(self, screen):
+        pass
+
+
+class NullActionHandler:
+    """Action handler that records actions instead of performing them.
+
+    The agent's step_delay is accepted through ``config.post_batch_delay``
+    like the real handler, but never slept.
+    """
+
+    def __init__(self, latency=0.0):
+        """Create the handler.
+
+        Args:
+            latency: Seconds to wait per batch, to simulate input time
+        """
+        self.config = SimpleNamespace(post_batch_delay=0.0)
+        self.latency = latency
+        self.batches = 0
+        self.actions = 0
+
+    async def __call__(self, actions):
+        self.batches += 1
+        self.actions += len(actions)
+        await asyncio.sleep(self.latency)
+
+    def reset(self):
+        pass
+
+    def set_target_screen(self, screen):
+        pass
+
+
+class ScriptedActor:
+    """AsyncActor replacement that takes its steps from a ScriptedModel."""
+
+    def __init__(self, source, **kwargs):
+        self.source = source
+        self.task_id = None
+
+    async def init_task(self, instruction, max_steps=None):
+        self.source.tasks += 1
+        self.task_id = f"offline-{self.source.tasks}"
+
+    async def step(self, screenshot, instruction=None):
+        # Always yield, as a network call would, so other tasks get to run
+        await asyncio.sleep(self.source.inference_delay)
+        return self.source.next_step()
+
+    async def close(self):
+        pass
+
+
+class ScriptedClient:
+    """Stands in for the planner's API client; uploads just read the image."""
+
+    def __init__(self):
+        self.uploads = 0
+
+    async def put_s3_presigned_url(self, screenshot):
+        screenshot.read()
+        self.uploads += 1
+        uuid = f"00000000-0000-4000-8000-{self.uploads:012d}"
+        return SimpleNamespace(uuid=uuid, download_url=f"https://offline.invalid/{uuid}.jpg")
+
+    async def close(self):
+        pass
+
+
+class ScriptedPlanner:
+    """Planner replacement: plans from the script, reflects on script progress."""
+
+    def __init__(self, model):
+        self.model = model
+        self.client = ScriptedClient()
+
+    def _ensure_client(self):
+        return self.client
+
+    async def initial_plan(self, todo, context, screenshot, memory=None, todo_index=None, **kwargs):
+        self.model.start_todo(todo_index, todo)
+        instruction = self.model.plans.get(todo_index) or todo
+        return PlannerOutput(instruction=instruction, reasoning="Replayed plan"), None
+
+    async def reflect(self, actions, context, screenshot, **kwargs):
+        done = self.model.todo_done()
+        return ReflectionOutput(
+            continue_current=not done,
+            reasoning="Replayed reflection",
+            success_assessment=done,
+        ), None
+
+    async def summarize(self, actions, context, memory=None, todo_index=None, **kwargs):
+        return self.model.summaries.get(todo_index, "Replayed todo"), None
+
+    async def close(self):
+        pass
+
+
+class ScriptedModel:
+    """Replays model responses todo by todo.
+
+    Each todo serves its recorded steps in order (cycled when
+    ``steps_per_todo`` asks for more than were recorded); the last one
+    carries ``stop`` and reflection then reports success. Todos with no
+    recording, such as ones appended at runtime, get a synthetic script.
+
+    Usage::
+
+        model = ScriptedModel.from_jsonl('freecad_execution_log.jsonl')
+        agent = TaskerAgent(planner=model.planner)
+        with model.installed():
+            await agent.execute(...)
+    """
+
+    def __init__(self, scripts=None, steps_per_todo=None, inference_delay=0.0):
+        """Create the model.
+
+        Args:
+            scripts: Dict of todo index to list of Step responses
+            steps_per_todo: Steps to serve per todo (defaults to the recorded length)
+            inference_delay: Seconds to wait per step, to simulate model latency
+        """
+        self.scripts = scripts or {}
+        self.steps_per_todo = steps_per_todo
+        self.inference_delay = inference_delay
+        self.plans = {}
+        self.summaries = {}
+        self.todos = []
+        self.planner = ScriptedPlanner(self)
+        self.tasks = 0
+        self.steps = 0
+        self._script = None
+        self._served = 0
+        self._length = 0
+
+    @classmethod
+    def from_jsonl(cls, path, **kwargs):
+        """Load the step, plan and summary responses from a streamed JSONL log."""
+        model = cls(**kwargs)
+        todo_index = None
+        with open(path) as f:
+            for line in f:
+                record = json.loads(line)
+                kind = record.get('type')
+                if kind == 'SplitEvent':
+                    match = TODO_START.match(record.get('label', ''))
+                    if match:
+                        todo_index = int(match.group(1)) - 1
+                        while len(model.todos) <= todo_index:
+                            model.todos.append(None)
+                        model.todos[todo_index] = match.group(2)
+                elif todo_index is None:
+                    continue
+                elif kind == 'StepEvent':
+                    actions = [
+                        Action(type=ActionType(a['type']), argument=a.get('argument', ''), count=a.get('count') or 1)
+                        for a in record.get('actions', [])
+                    ]
+                    step = Step(reason=record.get('reason'), actions=actions, stop=record.get('stop', False))
+                    model.scripts.setdefault(todo_index, []).append(step)
+                elif kind == 'PlanEvent' and record.get('phase') == 'initial':
+                    model.plans.setdefault(todo_index, record.get('result'))
+                elif kind == 'PlanEvent' and record.get('phase') == 'summary':
+                    model.summaries[todo_index] = record.get('reasoning')
+        model.todos = [todo or f"Recorded todo {i + 1}" for i, todo in enumerate(model.todos)]
+        return model
+
+    @staticmethod
+    def synthetic_script(todo):
+        """A short click-type-confirm script for one todo."""
+        return [
+            Step(reason=f"Open the control for: {todo[:60]}",
+                 actions=[Action(type=ActionType.CLICK, argument="512, 384")]),
+            Step(reason="Enter the value",
+                 actions=[Action(type=ActionType.TYPE, argument="20"),
+                          Action(type=ActionType.HOTKEY, argument="enter")]),
+            Step(reason="Confirm the dialog",
+                 actions=[Action(type=ActionType.CLICK, argument="900, 620")]),
+        ]
+
+    def actor(self, **kwargs):
+        """Factory with AsyncActor's signature."""
+        return ScriptedActor(self, **kwargs)
+
+    @contextlib.contextmanager
+    def installed(self):
+        """Route TaskeeAgent's AsyncActor to this model while the block runs."""
+        from oagi.agent.tasker import taskee_agent
+
+        original = taskee_agent.AsyncActor
+        taskee_agent.AsyncActor = self.actor
+        try:
+            yield self
+        finally:
+            taskee_agent.AsyncActor = original
+
+    def start_todo(self, todo_index, todo):
+        """Select the script for the todo the planner was asked about."""
+        script = self.scripts.get(todo_index)
+        if not script:
+            script = self.scripts[todo_index] = self.synthetic_script(todo)
+        self._script = script
+        self._served = 0
+        self._length = self.steps_per_todo or len(script)
+
+    def todo_done(self):
+        return self._served >= self._length
+
+    def next_step(self):
+        """Return the next response for the current todo; the last one stops."""
+        script = self._script or self.synthetic_script("")
+        step = script[self._served % len(script)]
+        self._served += 1
+        self.steps += 1
+        stop = self._served >= self._length
+        if step.stop != stop:
+            step = step.model_copy(update={'stop': stop})
+        return step
@@ -0,0 +1,133 @@
+"""Capture and encode the next screenshot while the rest of the step finishes."""
+
+import asyncio
+import time
+
+from env_flags import env_flag
+
+# Set to 1 to prefetch screenshots as soon as an action batch has settled
+PREFETCH_ENV = "FREECAD_AGENT_PREFETCH"
+
+
+class PrefetchTrigger:
+    """Action handler wrapper that starts the next capture when a batch returns.
+
+    The wrapped handler returns only after its post-action wait (the fixed
+    step_delay or settle detection), so the screen is ready to be captured
+    at that point even though the agent still has to run the observer
+    before it asks for the next screenshot.
+    """
+
+    def __init__(self, handler, provider):
+        self.handler = handler
+        self.provider = provider
+
+    def __getattr__(self, name):
+        return getattr(self.handler, name)
+
+    async def __call__(self, actions):
+        await self.handler(actions)
+        self.provider.prefetch()
+        # Let the capture reach its worker thread before the observer runs
+        await asyncio.sleep(0)
+
+
+class PrefetchingImageProvider:
+    """Image provider wrapper that serves a frame captured ahead of time.
+
+    ``prefetch()`` starts capturing in the background, and the frame is
+    encoded in a worker thread rather than lazily on the event loop during
+    upload. The next call returns that frame (waiting for whatever is
+    left of the capture) unless it is older than ``max_age`` seconds. An
+    old frame is dropped and a fresh one captured, e.g. after a pause in
+    interactive_hello.py.
+    """
+
+    def __init__(self, provider, max_age=1.0, verbose=False):
+        """Wrap an image provider.
+
+        Args:
+            provider: The wrapped provider (e.g. AsyncScreenshotMaker)
+            max_age: Oldest prefetched frame, in seconds, that is still used
+            verbose: Print how much of each capture was overlapped
+        """
+        self.provider = provider
+        self.max_age = max_age
+        self.verbose = verbose
+        self._pending = None
+
+        self.hits = 0
+        self.stale = 0
+        self.misses = 0
+        self.overlapped = 0.0
+
+    def __getattr__(self, name):
+        return getattr(self.provider, name)
+
+    def bind(self, handler):
+        """Wrap an action handler so each finished batch triggers a prefetch."""
+        return PrefetchTrigger(handler, self)
+
+    def prefetch(self):
+        """Start capturing the next frame unless a capture is already pending."""
+        if self._pending is None:
+            self._pending = asyncio.ensure_future(self._capture(time.perf_counter()))
+
+    async def _capture(self, started):
+        """Capture and encode one frame; return (image, started, finished)."""
+        image = await self.provider()
+        loop = asyncio.get_running_loop()
+        # Encoded bytes are cached by the image, so upload reuses them
+        await loop.run_in_executor(None, image.read)
+        return image, started, time.perf_counter()
+
+    async def __call__(self):
+        """Return the prefetched frame if it is recent, else capture one now."""
+        pending, self._pending = self._pending, None
+        if pending is None:
+            self.misses += 1
+        else:
+            called = time.perf_counter()
+            try:
+                image, started, finished = await pending
+            except Exception:
+                finished = None
+            if finished is not None and time.perf_counter() - finished <= self.max_age:
+                self.hits += 1
+                overlapped = min(called, finished) - started
+                self.overlapped += overlapped
+                if self.verbose:
+                    print(f"[PREFETCH] frame ready {overlapped * 1000:.0f}ms before it was needed"
+                          f" (capture {(finished - started) * 1000:.0f}ms)")
+                return image
+            self.stale += 1
+        image, _, _ = await self._capture(time.perf_counter())
+        return image
+
+    def print_summary(self):
+        """Print how often a prefetched frame was used and the time it saved."""
+        if hasattr(self.provider, 'print_summary'):
+            self.provider.print_summary()
+        total = self.hits + self.stale + self.misses
+        if not total:
+            return
+        print(f"Prefetch: {self.hits}/{total} frames prefetched ({self.stale} stale, {self.misses} not prefetched), "
+              f"{self.overlapped:.1f}s of capture and encoding overlapped "
+              f"({self.overlapped / max(self.hits, 1) * 1000:.0f}ms/frame)")
+
+
+def maybe_prefetch(action_handler, image_provider, **kwargs):
+    """Pipeline screenshot capture with actions when FREECAD_AGENT_PREFETCH is set.
+
+    Args:
+        action_handler: The action handler (after maybe_settle)
+        image_provider: The image provider to wrap
+        **kwargs: Extra PrefetchingImageProvider options
+
+    Returns:
+        (action_handler, image_provider), wrapped or unchanged
+    """
+    if env_flag(PREFETCH_ENV):
+        provider = PrefetchingImageProvider(image_provider, **kwargs)
+        return provider.bind(action_handler), provider
+    return action_handler, image_provider
@@ -0,0 +1,65 @@
+"""Cached view of a TaskerAgent's todo progress, refreshed only when it changes."""
+
+from todo_ops import todo_number
+
+
+class ProgressTracker:
+    """Current todo and per-todo step counts without touching memory per event.
+
+    The todo index only moves at todo boundaries, so the (index, total,
+    description) tuple is rebuilt at each SplitEvent and served as is in
+    between. Todos added mid-todo (``append_todo``, ``todo_ops.insert_next``)
+    change the list length, which is checked in O(1) on every lookup and
+    triggers a rebuild. The index is taken from the SplitEvent label, so
+    an observer that processes events late (see observer_queue.py) still
+    shows the todo each event belongs to.
+    """
+
+    def __init__(self, agent):
+        """Track the given TaskerAgent (or anything with current_todo_index and get_memory)."""
+        self.agent = agent
+        self.index = -1
+        self.total = 0
+        self.step_counts = {}
+        self._todos = None
+        self._current = None
+
+    def update(self, event):
+        """Feed one observed event."""
+        event_type = type(event).__name__
+        if event_type == 'StepEvent':
+            self.step_counts[self.index] = self.step_counts.get(self.index, 0) + 1
+        elif event_type == 'SplitEvent':
+            number = todo_number(event.label)
+            self.refresh(number - 1 if number is not None else None)
+
+    def refresh(self, index=None):
+        """Re-read the todo list, and the current index unless given, from the agent."""
+        if index is None:
+            index = getattr(self.agent, 'current_todo_index', -1)
+        self.index = -1 if index is None else index
+        try:
+            self._todos = self.agent.get_memory().todos
+        except Exception:
+            self._todos = None
+        self.total = len(self._todos) if self._todos is not None else 0
+        if 0 <= self.index < self.total:
+            self._current = (self.index, self.total, self._todos[self.index].description)
+        else:
+            self._current = None
+
+    def current(self):
+        """(index, total, description) of the todo being executed, or None."""
+        if self._todos is None or len(self._todos) != self.total:
+            self.refresh(self.index if self._todos is not None else None)
+        return self._current
+
+    def steps(self, index=None):
+        """StepEvents seen for a todo (the current one by default)."""
+        return self.step_counts.get(self.index if index is None else index, 0)
+
+    def print_summary(self):
+        """Print the number of steps each todo took."""
+        counts = [(i, n) for i, n in sorted(self.step_counts.items()) if i >= 0]
+        if counts:
+            print("Steps per todo: " + ", ".join(f"{i + 1}: {n}" for i, n in counts))
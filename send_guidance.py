@@ -2,16 +2,22 @@
 """Helper script to send dynamic guidance to the running agent."""
 
 import json
+import socket
 import sys
 
-GUIDANCE_FILE = "/tmp/freecad_agent_guidance.json"
+from guidance_channel import GUIDANCE_SOCKET
 
-def send_guidance(todos=None, message=None):
-    """Send guidance to the running agent.
+def send_guidance(todos=None, message=None, path=GUIDANCE_SOCKET, timeout=5.0):
+    """Send guidance to the running agent and wait for its acknowledgement.
 
     Args:
         todos: List of todo strings to add
         message: Optional message to display
+        path: Socket the running agent listens on
+        timeout: Seconds to wait for the agent to acknowledge
+
+    Returns:
+        The acknowledgement dict sent back by the agent
     """
     guidance = {}
 
@@ -21,10 +27,24 @@ def send_guidance(todos=None, message=None):
     if message:
         guidance['message'] = message
 
-    with open(GUIDANCE_FILE, 'w') as f:
-        json.dump(guidance, f, indent=2)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall((json.dumps(guidance) + "\n").encode())
+
+        reply = b""
+        while not reply.endswith(b"\n"):
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            reply += chunk
 
-    print(f"✓ Guidance sent: {guidance}")
+    ack = json.loads(reply) if reply else {'status': 'error', 'error': 'no acknowledgement'}
+    if ack.get('status') == 'ok':
+        print(f"✓ Guidance #{ack['id']} applied ({ack['applied']} todo(s)): {guidance}")
+    else:
+        print(f"✗ Guidance rejected: {ack.get('error')}")
+    return ack
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
@@ -34,4 +54,12 @@ if __name__ == "__main__":
         sys.exit(1)
 
     todos = sys.argv[1:]
-    send_guidance(todos=todos, message=f"Added {len(todos)} new todo(s)")
+    try:
+        ack = send_guidance(todos=todos, message=f"Added {len(todos)} new todo(s)")
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"No running agent is listening on {GUIDANCE_SOCKET}")
+        sys.exit(1)
+    except socket.timeout:
+        print("Timed out waiting for the agent to acknowledge the guidance")
+        sys.exit(1)
+    sys.exit(0 if ack.get('status') == 'ok' else 1)
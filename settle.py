@@ -0,0 +1,177 @@
+"""Adaptive settle detection to replace the fixed post-action step delay."""
+
+import asyncio
+import time
+
+from PIL import ImageChops, ImageStat
+from oagi import AsyncScreenshotMaker, ImageConfig
+
+from env_flags import env_flag
+
+# Set to 1 to wrap the action handler in settle mode
+SETTLE_ENV = "FREECAD_AGENT_SETTLE"
+
+
+class SettleConfig:
+    """Handler config whose post_batch_delay acts as the settle ceiling.
+
+    The agent writes its step_delay into ``handler.config.post_batch_delay``
+    before each todo, so exposing that attribute here turns step_delay into
+    the upper bound on how long we wait for the screen to settle.
+    """
+
+    def __init__(self, post_batch_delay=1.0):
+        self.post_batch_delay = post_batch_delay
+
+
+class SettlingActionHandler:
+    """Action handler wrapper that waits for the screen to stop changing.
+
+    After the wrapped handler runs a batch of actions, cheap low-resolution
+    frames are grabbed every ``interval`` seconds. As soon as
+    ``stable_frames`` consecutive frames differ by less than ``threshold``
+    (mean absolute grey-level difference, 0-255) the next step may start.
+    The wait never exceeds the ceiling, which defaults to the agent's
+    step_delay.
+    """
+
+    def __init__(self, handler, screenshot_maker=None, ceiling=None, interval=0.1,
+                 stable_frames=2, threshold=0.5, min_delay=0.1, frame_size=(160, 90),
+                 verbose=True):
+        """Wrap an action handler.
+
+        Args:
+            handler: The action handler to wrap (e.g. AsyncPyautoguiActionHandler)
+            screenshot_maker: Frame source; defaults to a low-resolution AsyncScreenshotMaker
+            ceiling: Maximum settle wait in seconds; defaults to the agent's step_delay
+            interval: Seconds between settle frames
+            stable_frames: Number of consecutive unchanged frames that count as settled
+            threshold: Largest mean grey-level difference still treated as unchanged
+            min_delay: Seconds to wait before the first frame so redraws can start
+            frame_size: (width, height) of the settle frames
+            verbose: Print the saved delay after every step
+        """
+        self.handler = handler
+        self.screenshot_maker = screenshot_maker or AsyncScreenshotMaker(
+            ImageConfig(format="PNG", width=frame_size[0], height=frame_size[1], resample="NEAREST")
+        )
+        self.config = SettleConfig(ceiling if ceiling is not None else 1.0)
+        self._fixed_ceiling = ceiling
+        self.interval = interval
+        self.stable_frames = stable_frames
+        self.threshold = threshold
+        self.min_delay = min_delay
+        self.verbose = verbose
+
+        self.steps = 0
+        self.total_delay = 0.0
+        self.total_saved = 0.0
+        self.last_delay = 0.0
+        self.last_saved = 0.0
+
+    @property
+    def ceiling(self):
+        """Current upper bound on the settle wait in seconds."""
+        if self._fixed_ceiling is not None:
+            return self._fixed_ceiling
+        return self.config.post_batch_delay
+
+    def set_target_screen(self, screen):
+        """Forward the target screen to the wrapped handler and frame source."""
+        self.handler.set_target_screen(screen)
+        if hasattr(self.screenshot_maker, 'set_target_screen'):
+            self.screenshot_maker.set_target_screen(screen)
+
+    def reset(self):
+        """Reset the wrapped handler's state."""
+        if hasattr(self.handler, 'reset'):
+            self.handler.reset()
+
+    async def __call__(self, actions):
+        """Execute actions, then wait only as long as the screen keeps changing."""
+        # The fixed delay is replaced by settle detection below
+        if hasattr(self.handler, 'config') and hasattr(self.handler.config, 'post_batch_delay'):
+            self.handler.config.post_batch_delay = 0
+
+        await self.handler(actions)
+
+        ceiling = self.ceiling
+        waited = await self._wait_for_settle(ceiling)
+
+        self.steps += 1
+        self.last_delay = waited
+        self.last_saved = max(ceiling - waited, 0.0)
+        self.total_delay += waited
+        self.total_saved += self.last_saved
+
+        if self.verbose:
+            print(f"[SETTLE] settled in {waited:.2f}s (ceiling {ceiling:.2f}s, saved {self.last_saved:.2f}s)")
+
+    async def _wait_for_settle(self, ceiling):
+        """Wait until consecutive frames match or the ceiling is reached.
+
+        Returns:
+            Seconds spent waiting
+        """
+        if ceiling <= 0:
+            return 0.0
+
+        start = time.perf_counter()
+        deadline = start + ceiling
+        await asyncio.sleep(min(self.min_delay, ceiling))
+
+        previous = None
+        stable = 0
+        while time.perf_counter() < deadline:
+            frame = await self._grab_frame()
+            if previous is not None and self._frame_diff(previous, frame) <= self.threshold:
+                stable += 1
+                if stable >= self.stable_frames:
+                    break
+            else:
+                stable = 0
+            previous = frame
+
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(self.interval, remaining))
+
+        return time.perf_counter() - start
+
+    async def _grab_frame(self):
+        """Capture one small greyscale frame."""
+        shot = await self.screenshot_maker()
+        return shot.image.convert('L')
+
+    @staticmethod
+    def _frame_diff(a, b):
+        """Mean absolute grey-level difference between two frames."""
+        if a.size != b.size:
+            return float('inf')
+        return ImageStat.Stat(ImageChops.difference(a, b)).mean[0]
+
+    def print_summary(self):
+        """Print how much fixed delay settle detection avoided."""
+        if hasattr(self.handler, 'print_summary'):
+            self.handler.print_summary()
+        if not self.steps:
+            return
+        print(f"Settle detection: {self.steps} steps, "
+              f"avg wait {self.total_delay / self.steps:.2f}s, "
+              f"saved {self.total_saved:.1f}s total ({self.total_saved / self.steps:.2f}s/step)")
+
+
+def maybe_settle(handler, **kwargs):
+    """Wrap handler in settle mode when FREECAD_AGENT_SETTLE is set.
+
+    Args:
+        handler: The action handler to wrap
+        **kwargs: Extra SettlingActionHandler options
+
+    Returns:
+        The wrapped handler, or the original one when settle mode is off
+    """
+    if env_flag(SETTLE_ENV):
+        return SettlingActionHandler(handler, **kwargs)
+    return handler
@@ -0,0 +1,239 @@
+"""Bounded-memory step records with screenshots spilled to disk."""
+
+import os
+import tempfile
+from collections import deque
+from pathlib import Path
+
+from oagi import AsyncAgentObserver
+from oagi.agent.observer.agent_observer import ExportFormat
+from oagi.agent.observer.exporters import export_to_html, export_to_json
+
+from image_store import image_digest
+
+
+class SpilledImage:
+    """Placeholder left in an event after its image bytes moved to disk."""
+
+    __slots__ = ('store', 'key', 'size')
+
+    def __init__(self, store, key, size):
+        self.store = store
+        self.key = key
+        self.size = size
+
+    def load(self):
+        """Read the image bytes back from disk."""
+        return self.store.get(self.key)
+
+    def __repr__(self):
+        return f"<SpilledImage {self.key} {self.size} bytes>"
+
+
+class ImageSpillStore:
+    """Disk-backed store for screenshot payloads.
+
+    Images are written once and read back only when somebody asks for them,
+    so nothing but the key stays in memory. Keys are content digests, so a
+    screen that repeats is written only the first time. Without an explicit
+    directory a temporary one is used and removed when the store is garbage
+    collected.
+    """
+
+    def __init__(self, directory=None):
+        """Create the store.
+
+        Args:
+            directory: Where to keep images; a temporary directory if omitted
+        """
+        if directory is None:
+            self._tempdir = tempfile.TemporaryDirectory(prefix="freecad_agent_images_")
+            directory = self._tempdir.name
+        else:
+            self._tempdir = None
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.count = 0
+        self.duplicates = 0
+        self.bytes_written = 0
+        self._keys = set()
+
+    def put(self, data):
+        """Write image bytes unless identical bytes are stored already; return their key."""
+        self.count += 1
+        key = f"{image_digest(data)}.img"
+        if key in self._keys:
+            self.duplicates += 1
+            return key
+        (self.directory / key).write_bytes(data)
+        self._keys.add(key)
+        self.bytes_written += len(data)
+        return key
+
+    def get(self, key):
+        """Load image bytes by key."""
+        return (self.directory / key).read_bytes()
+
+    def spill(self, event):
+        """Return a copy of event whose image bytes live on disk.
+
+        Events without in-memory image bytes are returned unchanged.
+        """
+        image = vars(event).get('image')
+        if not isinstance(image, bytes):
+            return event
+        return event.model_copy(update={'image': SpilledImage(self, self.put(image), len(image))})
+
+    @staticmethod
+    def restore(event):
+        """Return a copy of event with spilled image bytes loaded back."""
+        image = vars(event).get('image')
+        if not isinstance(image, SpilledImage):
+            return event
+        return event.model_copy(update={'image': image.load()})
+
+
+class StepRecord:
+    """Compact metadata for one observed event; the image loads lazily."""
+
+    __slots__ = ('step', 'event_type', 'timestamp', 'step_num', 'todo_index', 'text', '_image')
+
+    def __init__(self, step, event_type, timestamp, step_num=None, todo_index=None, text=None, image=None):
+        self.step = step
+        self.event_type = event_type
+        self.timestamp = timestamp
+        self.step_num = step_num
+        self.todo_index = todo_index
+        self.text = text
+        self._image = image
+
+    @classmethod
+    def from_event(cls, step, event, todo_index=None, text_limit=200):
+        """Build a record from an (already spilled) event.
+
+        Args:
+            step: Observer step counter
+            event: The event, with any image replaced by a SpilledImage
+            todo_index: Index of the todo being executed
+            text_limit: Maximum length of the kept text summary
+        """
+        # Plain dict lookups: getattr on a missing pydantic field is slow
+        fields = vars(event)
+        text = None
+        for field in ('reasoning', 'message', 'label', 'error'):
+            value = fields.get(field)
+            if value:
+                text = value[:text_limit]
+                break
+        step_obj = fields.get('step')
+        if text is None and step_obj is not None:
+            text = (step_obj.reason or '')[:text_limit] or None
+
+        image = fields.get('image')
+        return cls(
+            step=step,
+            event_type=type(event).__name__,
+            timestamp=fields['timestamp'].timestamp(),
+            step_num=fields.get('step_num'),
+            todo_index=todo_index,
+            text=text,
+            image=image if isinstance(image, (SpilledImage, str)) else None,
+        )
+
+    @property
+    def has_image(self):
+        return self._image is not None
+
+    @property
+    def image(self):
+        """Image bytes (loaded from disk on access) or screenshot URL, if any."""
+        if isinstance(self._image, SpilledImage):
+            return self._image.load()
+        return self._image
+
+    def __repr__(self):
+        return f"<StepRecord step={self.step} {self.event_type} step_num={self.step_num}>"
+
+
+class StepLog:
+    """Ring buffer of StepRecords with a configurable cap."""
+
+    def __init__(self, max_records=1000):
+        """Create the log.
+
+        Args:
+            max_records: Records kept in memory; oldest are evicted first (None for no cap)
+        """
+        self.records = deque(maxlen=max_records)
+        self.total = 0
+
+    def append(self, record):
+        self.records.append(record)
+        self.total += 1
+
+    @property
+    def evicted(self):
+        """Number of records dropped by the cap."""
+        return self.total - len(self.records)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+
+class SpillingAgentObserver(AsyncAgentObserver):
+    """AsyncAgentObserver that keeps only image-less events in memory.
+
+    Screenshot bytes are spilled to an ImageSpillStore as events arrive and
+    loaded back one event at a time during export, so ``self.events`` grows
+    by metadata only.
+    """
+
+    def __init__(self, spill_dir=None):
+        """Create the observer.
+
+        Args:
+            spill_dir: Directory for spilled screenshots; temporary if omitted
+        """
+        super().__init__()
+        self.image_store = ImageSpillStore(spill_dir)
+
+    async def on_event(self, event):
+        """Record an event with its image moved to disk.
+
+        Returns:
+            The stored (spilled) event
+        """
+        stored = self.image_store.spill(event)
+        self.events.append(stored)
+        return stored
+
+    def export(self, format, path, images_dir=None):
+        """Export recorded events, loading spilled images as they are written.
+
+        Args:
+            format: Export format (markdown, html, json)
+            path: Path to the output file.
+            images_dir: Directory to save images (markdown only).
+        """
+        if isinstance(format, str):
+            format = ExportFormat(format.lower())
+
+        events = (self.image_store.restore(event) for event in self.events)
+        match format:
+            case ExportFormat.MARKDOWN:
+                # Same markdown as oagi's exporter, with screenshots deduplicated by digest
+                from streaming_export import StreamingExporter
+
+                with StreamingExporter(path, images_dir, jsonl_path=os.devnull) as exporter:
+                    for event in self.events:
+                        exporter.write(event)
+            case ExportFormat.HTML:
+                export_to_html(events, path)
+            case ExportFormat.JSON:
+                export_to_json(events, path)
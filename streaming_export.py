@@ -0,0 +1,184 @@
+"""Streaming markdown + JSONL export written as events arrive."""
+
+import json
+from pathlib import Path
+
+from image_store import ContentStore
+from step_store import SpilledImage
+
+
+def _image_bytes(image):
+    """Return in-memory image bytes for an event image, or None for URLs/missing."""
+    if isinstance(image, SpilledImage):
+        return image.load()
+    if isinstance(image, bytes):
+        return image
+    return None
+
+
+def render_markdown(event, image_ref=None):
+    """Render one event the way the oagi markdown exporter does.
+
+    Args:
+        event: The observer event
+        image_ref: Relative path of the event's saved screenshot, if any
+
+    Returns:
+        Markdown text for the event
+    """
+    timestamp = event.timestamp.strftime("%H:%M:%S")
+    event_type = type(event).__name__
+    lines = []
+
+    if event_type == 'StepEvent':
+        lines.append(f"\n## Step {event.step_num}\n")
+        lines.append(f"**Time:** {timestamp}\n")
+        if event.task_id:
+            lines.append(f"**Task ID:** `{event.task_id}`\n")
+        if image_ref:
+            lines.append(f"\n![Step {event.step_num}]({image_ref})\n")
+        elif isinstance(event.image, str):
+            lines.append(f"\n**Screenshot URL:** {event.image}\n")
+        if event.step.reason:
+            lines.append(f"\n**Reasoning:**\n> {event.step.reason}\n")
+        if event.step.actions:
+            lines.append("\n**Planned Actions:**\n")
+            for action in event.step.actions:
+                count_str = f" (x{action.count})" if action.count and action.count > 1 else ""
+                lines.append(f"- `{action.type.value}`: {action.argument}{count_str}\n")
+        if event.step.stop:
+            lines.append("\n**Status:** Task Complete\n")
+
+    elif event_type == 'ActionEvent':
+        lines.append(f"\n### Actions Executed ({timestamp})\n")
+        if event.error:
+            lines.append(f"\n**Error:** {event.error}\n")
+        else:
+            lines.append("\n**Result:** Success\n")
+
+    elif event_type == 'LogEvent':
+        lines.append(f"\n> **Log ({timestamp}):** {event.message}\n")
+
+    elif event_type == 'SplitEvent':
+        if event.label:
+            lines.append(f"\n---\n\n### {event.label}\n")
+        else:
+            lines.append("\n---\n")
+
+    elif event_type == 'PlanEvent':
+        phase_titles = {"initial": "Initial Planning", "reflection": "Reflection", "summary": "Summary"}
+        phase_title = phase_titles.get(event.phase, event.phase.capitalize())
+        lines.append(f"\n### {phase_title} ({timestamp})\n")
+        if event.request_id:
+            lines.append(f"**Request ID:** `{event.request_id}`\n")
+        if image_ref:
+            lines.append(f"\n![{phase_title}]({image_ref})\n")
+        elif isinstance(event.image, str):
+            lines.append(f"\n**Screenshot URL:** {event.image}\n")
+        if event.reasoning:
+            lines.append(f"\n**Reasoning:**\n> {event.reasoning}\n")
+        if event.result:
+            lines.append(f"\n**Result:** {event.result}\n")
+
+    return "".join(lines)
+
+
+def event_record(event, seq, image_ref=None):
+    """Build the JSON-serialisable record for one event."""
+    record = {
+        'seq': seq,
+        'type': type(event).__name__,
+        'time': event.timestamp.isoformat(),
+        'step_num': getattr(event, 'step_num', None),
+        'image': image_ref if image_ref else (event.image if isinstance(getattr(event, 'image', None), str) else None),
+    }
+    step = getattr(event, 'step', None)
+    if step is not None:
+        record['reason'] = step.reason
+        record['stop'] = step.stop
+        record['actions'] = [
+            {'type': a.type.value, 'argument': a.argument, 'count': a.count} for a in step.actions
+        ]
+    elif getattr(event, 'actions', None) is not None:
+        record['actions'] = [
+            {'type': a.type.value, 'argument': a.argument, 'count': a.count} for a in event.actions
+        ]
+    for field in ('error', 'message', 'label', 'phase', 'reasoning', 'result', 'task_id', 'request_id'):
+        value = getattr(event, field, None)
+        if value is not None:
+            record[field] = value
+    return {k: v for k, v in record.items() if v is not None}
+
+
+class StreamingExporter:
+    """Append every event to a markdown log and a JSONL sibling as it arrives.
+
+    The markdown file is readable at any point during the run, so a crash or
+    Ctrl-C keeps everything up to the last event. Screenshots go to a
+    ContentStore (image_store.py): each distinct screen is written once,
+    named by its digest, by a background thread pool that never blocks the
+    step loop.
+    """
+
+    def __init__(self, path="freecad_execution_log.md", images_dir="images", jsonl_path=None, max_workers=2,
+                 image_codec=None):
+        """Open the export files.
+
+        Args:
+            path: Markdown log path
+            images_dir: Directory for screenshots (None to skip images)
+            jsonl_path: Machine-readable log path; defaults to path with a .jsonl suffix
+            max_workers: Threads used for image encoding and writes
+            image_codec: 'original' or 'webp' (defaults to FREECAD_AGENT_IMAGE_STORE)
+        """
+        self.path = Path(path)
+        self.jsonl_path = Path(jsonl_path) if jsonl_path else self.path.with_suffix('.jsonl')
+        self.images_dir = Path(images_dir) if images_dir else None
+        self.count = 0
+        self.images_written = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.images = ContentStore(self.images_dir, image_codec, max_workers) if self.images_dir else None
+
+        self._md = open(self.path, 'w')
+        self._jsonl = open(self.jsonl_path, 'w')
+        self._md.write("# Agent Execution Report\n")
+        self._md.flush()
+
+    @property
+    def image_errors(self):
+        return self.images.errors if self.images else 0
+
+    def write(self, event):
+        """Append one event to both logs and queue its screenshot for writing."""
+        self.count += 1
+        image_ref = self._save_image(event)
+
+        self._md.write(render_markdown(event, image_ref))
+        self._md.flush()
+        self._jsonl.write(json.dumps(event_record(event, self.count, image_ref), default=str) + "\n")
+        self._jsonl.flush()
+
+    def _save_image(self, event):
+        """Store the event's screenshot and return its path relative to the log."""
+        if not self.images or type(event).__name__ not in ('StepEvent', 'PlanEvent'):
+            return None
+        data = _image_bytes(getattr(event, 'image', None))
+        if data is None:
+            return None
+
+        self.images_written += 1
+        return f"{self.images_dir.name}/{self.images.put(data)}"
+
+    def close(self):
+        """Wait for queued image writes and close both logs."""
+        if self.images:
+            self.images.close()
+        self._md.close()
+        self._jsonl.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
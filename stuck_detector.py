@@ -0,0 +1,209 @@
+"""Detect no-progress loops from screenshot hashes and repeated actions."""
+
+import asyncio
+import io
+import os
+import re
+import time
+from collections import deque
+
+from PIL import Image as PILImageLib
+
+from observer_base import ObserverWrapper
+from todo_ops import TODO_START, TodoAbandoned, insert_next, is_todo_end, mark_abandoned
+from trajectory_cache import dhash, hamming
+
+# Set to recover, skip or log to act when the agent is stuck (off by default)
+STUCK_ENV = "FREECAD_AGENT_STUCK"
+
+POLICIES = ('recover', 'skip', 'log')
+
+RECOVERY_TODO = (
+    "Recover from a stuck state: press Escape twice to close any open menu, dialog or active tool, "
+    "then click an empty area of the 3D view so nothing is selected."
+)
+
+_NUMBER = re.compile(r"\d+")
+
+
+def action_fingerprint(actions, grid=10):
+    """Actions as a hashable tuple, with coordinates snapped to a grid.
+
+    Clicks a few pixels apart on an unchanged screen count as the same
+    action.
+    """
+    return tuple(
+        (action.type.value, _NUMBER.sub(lambda m: str(int(m.group()) // grid), action.argument or ''))
+        for action in actions
+    )
+
+
+def screen_hash(data, size=(160, 90)):
+    """dHash of an encoded screenshot, decoding JPEGs at reduced size."""
+    image = PILImageLib.open(io.BytesIO(data))
+    image.draft('L', size)
+    return dhash(image)
+
+
+class StuckDetector(ObserverWrapper):
+    """step_observer wrapper that spots the agent repeating itself.
+
+    Every StepEvent adds (screen hash, action fingerprint) to a rolling
+    window. The agent is stuck when the same action is about to be taken
+    on the same screen ``repeats`` times within the window, or when the
+    screen has not changed for ``static_steps`` steps in a row.
+
+    Policies:
+        recover: abandon the todo, insert a recovery todo and one retry of it
+                 (a retry that gets stuck again is skipped)
+        skip:    abandon the todo and move on
+        log:     only report
+    """
+
+    def __init__(self, agent, policy='recover', window=8, repeats=3, static_steps=8,
+                 max_distance=2, verbose=True):
+        """Wrap the agent's step_observer.
+
+        Args:
+            agent: TaskerAgent whose step_observer is wrapped (set the observer first)
+            policy: 'recover', 'skip' or 'log'
+            window: Number of recent steps compared
+            repeats: Same screen and action this many times means stuck
+            static_steps: Unchanged screen for this many steps means stuck
+            max_distance: Largest hash distance (bits) treated as the same screen
+            verbose: Print a line for each intervention
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown stuck policy: {policy} (expected one of {', '.join(POLICIES)})")
+        self.agent = agent
+        self.wrap(agent)
+        self.policy = policy
+        self.repeats = repeats
+        self.static_steps = static_steps
+        self.max_distance = max_distance
+        self.verbose = verbose
+
+        self.history = deque(maxlen=max(window, static_steps))
+        self.window = window
+        self.todo_steps = 0
+        self.abandoning = None      # (todo index, reason) until its End SplitEvent
+        self.retried = set()
+
+        self.detections = 0
+        self.abandoned = []         # (todo number, description, reason)
+        self.steps_saved = 0
+        self.seconds_saved = 0.0
+        self._step_seconds = 0.0
+        self._steps = 0
+        self._last_step = None
+
+    async def on_event(self, event):
+        event_type = type(event).__name__
+        reason = None
+        if event_type == 'SplitEvent':
+            self._split(event.label or '')
+        elif event_type == 'StepEvent' and self.abandoning is None:
+            reason = await self._step(event)
+        await self.forward(event)
+        # Raised after the inner observer so it still sees the step that got stuck
+        if reason is not None:
+            raise TodoAbandoned(reason)
+
+    def _split(self, label):
+        if TODO_START.match(label):
+            self.history.clear()
+            self.todo_steps = 0
+            self._last_step = None
+        elif is_todo_end(label) and self.abandoning is not None:
+            index, reason = self.abandoning
+            mark_abandoned(self.agent, index, reason)
+            self.abandoning = None
+
+    async def _step(self, event):
+        """Check a step; returns the reason when its todo is abandoned."""
+        now = time.perf_counter()
+        if self._last_step is not None:
+            self._step_seconds += now - self._last_step
+            self._steps += 1
+        self._last_step = now
+        self.todo_steps += 1
+
+        image = vars(event).get('image')
+        if not isinstance(image, bytes):
+            return None
+        loop = asyncio.get_running_loop()
+        phash = await loop.run_in_executor(None, screen_hash, image)
+        fingerprint = action_fingerprint(event.step.actions)
+
+        recent = list(self.history)[-self.window:]
+        same = sum(1 for h, f in recent if f == fingerprint and hamming(h, phash) <= self.max_distance)
+        self.history.append((phash, fingerprint))
+
+        reason = None
+        if fingerprint and same + 1 >= self.repeats:
+            reason = f"same action on an unchanged screen {same + 1} times in {len(recent) + 1} steps"
+        elif len(self.history) >= self.static_steps and all(
+            hamming(h, phash) <= self.max_distance for h, _ in list(self.history)[-self.static_steps:]
+        ):
+            reason = f"screen unchanged for {self.static_steps} steps"
+        if reason:
+            return self._intervene(reason)
+        return None
+
+    def _intervene(self, reason):
+        self.detections += 1
+        index = getattr(self.agent, 'current_todo_index', -1)
+        todos = self.agent.get_memory().todos
+        if not 0 <= index < len(todos):
+            return None
+        description = todos[index].description
+
+        if self.policy == 'log':
+            self._log(f"todo {index + 1} looks stuck: {reason}")
+            self.history.clear()
+            return None
+
+        self.abandoning = (index, f"Abandoned: {reason}")
+        self.abandoned.append((index + 1, description, reason))
+
+        max_steps = getattr(self.agent, 'max_steps', 0)
+        saved = max(0, max_steps - self.todo_steps)
+        mean = self._step_seconds / self._steps if self._steps else 0.0
+        self.steps_saved += saved
+        self.seconds_saved += saved * mean
+
+        if self.policy == 'recover' and description not in self.retried:
+            self.retried.add(description)
+            # Inserted in reverse: recovery first, then the retry
+            insert_next(self.agent, description)
+            insert_next(self.agent, RECOVERY_TODO)
+            action = "abandoning it, then recovering and retrying"
+        else:
+            action = "skipping it"
+        self._log(f"todo {index + 1} is stuck ({reason}); {action}. "
+                  f"Saved up to {saved} steps (~{saved * mean:.0f}s)")
+        return self.abandoning[1]
+
+    def _log(self, message):
+        if self.verbose:
+            print(f"\n[STUCK] {message}")
+
+    def print_summary(self):
+        """Print detections and the steps and time the interventions saved."""
+        if not self.detections:
+            return
+        print(f"Stuck detection: {self.detections} detected, {len(self.abandoned)} todos abandoned")
+        if self.abandoned:
+            print(f"  Saved up to {self.steps_saved} steps (~{self.seconds_saved:.0f}s at the run's average step time)")
+
+
+def detect_stuck(agent, **kwargs):
+    """Attach a StuckDetector when FREECAD_AGENT_STUCK names a policy (unset or 'off' disables it).
+
+    Returns:
+        The detector, or None when disabled
+    """
+    policy = os.environ.get(STUCK_ENV, "").strip().lower()
+    if policy in ('', 'off'):
+        return None
+    return StuckDetector(agent, policy=policy, **kwargs)
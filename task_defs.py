@@ -0,0 +1,69 @@
+"""Task definitions (task, instruction and todo list) stored as JSON in tasks/."""
+
+import json
+import os
+
+TASKS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tasks')
+
+
+def task_names():
+    """Names of the definitions in tasks/, sorted."""
+    return sorted(name[:-5] for name in os.listdir(TASKS_DIR) if name.endswith('.json'))
+
+
+def task_path(name):
+    """Path of a task definition given its name in tasks/ or a file path."""
+    if name.endswith('.json') or os.sep in name:
+        return name
+    return os.path.join(TASKS_DIR, f"{name}.json")
+
+
+def load_task(name):
+    """Load a task definition.
+
+    Args:
+        name: Name of a file in tasks/ (without .json) or a path to one
+
+    A todo is either its description or an object with 'description' and
+    optional 'max_steps' and 'max_seconds' (see todo_budget.py).
+
+    Returns:
+        Dict with 'task', 'instruction', 'todos' (descriptions) and 'budgets'
+        (description -> {'steps': n, 'seconds': s} for the todos that set one)
+    """
+    path = task_path(name)
+    try:
+        with open(path) as f:
+            task = json.load(f)
+    except FileNotFoundError:
+        raise ValueError(f"Unknown task: {name} (available: {', '.join(task_names())})") from None
+    missing = [key for key in ('task', 'todos') if key not in task]
+    if missing:
+        raise ValueError(f"{path} is missing {', '.join(missing)}")
+    task.setdefault('instruction', task['task'])
+    todos, budgets = [], {}
+    for todo in task['todos']:
+        if isinstance(todo, str):
+            todos.append(todo)
+            continue
+        if 'description' not in todo:
+            raise ValueError(f"{path}: todo without a description: {todo}")
+        todos.append(todo['description'])
+        budget = {key: todo[field] for key, field in (('steps', 'max_steps'), ('seconds', 'max_seconds'))
+                  if todo.get(field)}
+        if budget:
+            budgets[todo['description']] = budget
+    task['todos'] = todos
+    task['budgets'] = budgets
+    task['name'] = os.path.splitext(os.path.basename(path))[0]
+    return task
+
+
+def apply_task(agent, task):
+    """Set the agent's task and todos from a definition.
+
+    Returns:
+        The instruction to pass to agent.execute()
+    """
+    agent.set_task(task=task['task'], todos=list(task['todos']))
+    return task['instruction']
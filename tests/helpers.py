@@ -0,0 +1,21 @@
+"""Shared builders for the tests."""
+
+import logging
+
+from oagi import TaskerAgent
+
+from offline import ScriptedModel
+
+logging.getLogger('oagi').setLevel(logging.WARNING)
+
+
+def make_agent(*todos, task="test task", current=-1):
+    """A TaskerAgent with its task set and no model behind it."""
+    agent = TaskerAgent(planner=ScriptedModel().planner)
+    agent.set_task(task, list(todos))
+    agent.current_todo_index = current
+    return agent
+
+
+def descriptions(agent):
+    return [todo.description for todo in agent.get_memory().todos]
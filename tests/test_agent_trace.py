@@ -0,0 +1,82 @@
+import pytest
+from oagi.types import Action, ActionEvent, ActionType, SplitEvent, Step, StepEvent
+
+from agent_trace import TraceReader, TraceWriter
+
+IMAGE = b'\xff\xd8fake jpeg\xff\xd9'
+
+
+def step_event(n, stop=False):
+    step = Step(reason=f"step {n}", actions=[Action(type=ActionType.CLICK, argument='1, 2')], stop=stop)
+    return StepEvent(step_num=n, image=IMAGE, step=step)
+
+
+def write_run(path, close=True):
+    writer = TraceWriter(path)
+    writer.write(SplitEvent(label="Start of todo 1: a"), 0)
+    writer.write(step_event(1), 0)
+    writer.write(ActionEvent(step_num=1, actions=[], error="missed"), 0)
+    writer.write(step_event(2, stop=True), 0)
+    writer.write(SplitEvent(label="Start of todo 2: b"), 1)
+    writer.write(step_event(1), 1)
+    if close:
+        writer.close()
+    else:
+        writer.flush()
+    return writer
+
+
+@pytest.mark.parametrize('close', [True, False])
+def test_round_trip(tmp_path, close):
+    path = str(tmp_path / 'run.trace')
+    writer = write_run(path, close)
+    assert writer.images_deduplicated == 2
+    with TraceReader(path) as reader:
+        records = list(reader)
+        assert [r.event_type for r in records] == [
+            'SplitEvent', 'StepEvent', 'ActionEvent', 'StepEvent', 'SplitEvent', 'StepEvent']
+        assert [r.todo_index for r in records] == [0, 0, 0, 0, 1, 1]
+        assert records[0].fields()['label'] == "Start of todo 1: a"
+        assert records[1].fields()['reason'] == "step 1"
+        assert records[1].step_num == 1 and not records[1].stop
+        assert records[3].stop
+        assert records[2].error
+        assert bytes(records[1].image()) == IMAGE
+        assert records[0].image() is None
+        assert reader.image_count == 1
+        assert reader.steps() == [1, 3, 5]
+        # Records are views into the mapping; drop them before it closes
+        del records
+    if not close:
+        writer.close()
+
+
+def test_append_continues_trace(tmp_path):
+    path = str(tmp_path / 'run.trace')
+    write_run(path)
+    with TraceWriter(path, append=True) as writer:
+        writer.write(step_event(2), 1)
+        assert writer.images_deduplicated == 1
+    with TraceReader(path) as reader:
+        assert len(reader) == 7
+        assert reader[6].seq == 7
+        assert reader.image_count == 1
+
+
+def test_step_lookup_by_todo(tmp_path):
+    path = str(tmp_path / 'run.trace')
+    write_run(path)
+    with TraceReader(path) as reader:
+        assert reader.step(2).seq == 4
+        assert reader.step(1, todo=2).todo_index == 1
+        with pytest.raises(ValueError, match="ambiguous"):
+            reader.step(1)
+        with pytest.raises(IndexError):
+            reader.step(2, todo=2)
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'not.trace'
+    path.write_bytes(b'x' * 64)
+    with pytest.raises(ValueError, match="not an agent trace"):
+        TraceReader(str(path))
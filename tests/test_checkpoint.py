@@ -0,0 +1,57 @@
+import json
+
+import pytest
+from oagi.agent.tasker.models import TodoHistory, TodoStatus
+
+from checkpoint import Checkpoint, restore, snapshot
+from helpers import descriptions, make_agent
+
+
+def progressed_agent():
+    agent = make_agent('a', 'b', 'c', current=1)
+    memory = agent.get_memory()
+    memory.todos[0].status = TodoStatus.COMPLETED
+    memory.todos[1].status = TodoStatus.IN_PROGRESS
+    memory.history = [TodoHistory(todo_index=0, todo='a', actions=[], summary='a done', completed=True)]
+    memory.todo_execution_summaries = {0: 'a done'}
+    return agent
+
+
+def test_snapshot_restore_round_trip():
+    data = json.loads(json.dumps(snapshot(progressed_agent())))
+    agent = make_agent('x')
+    assert restore(agent, data) == 1
+    memory = agent.get_memory()
+    assert memory.task_description == 'test task'
+    assert descriptions(agent) == ['a', 'b', 'c']
+    # The interrupted todo starts over
+    assert [todo.status for todo in memory.todos] == [TodoStatus.COMPLETED, TodoStatus.PENDING, TodoStatus.PENDING]
+    assert memory.todo_execution_summaries == {0: 'a done'}
+    assert memory.history[0].completed
+    assert agent.current_todo_index == 1
+
+
+def test_restore_rejects_other_versions():
+    data = snapshot(progressed_agent())
+    data['version'] = 99
+    with pytest.raises(ValueError, match="version"):
+        restore(make_agent('x'), data)
+
+
+def test_save_and_resume(tmp_path):
+    path = str(tmp_path / 'run.checkpoint.json')
+    Checkpoint(progressed_agent(), path=path, verbose=False).save()
+
+    agent = make_agent('a', 'b', 'c')
+    assert Checkpoint(agent, path=path, verbose=False).resume()
+    assert agent.get_memory().todos[0].status == TodoStatus.COMPLETED
+
+
+def test_resume_ignores_other_task(tmp_path):
+    path = str(tmp_path / 'run.checkpoint.json')
+    Checkpoint(progressed_agent(), path=path, verbose=False).save()
+
+    agent = make_agent('a', 'b', 'c', task="another task")
+    assert not Checkpoint(agent, path=path, verbose=False).resume()
+    assert all(todo.status == TodoStatus.PENDING for todo in agent.get_memory().todos)
+    assert not Checkpoint(make_agent('a'), path=str(tmp_path / 'missing.json'), verbose=False).resume()
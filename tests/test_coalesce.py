@@ -0,0 +1,58 @@
+from oagi.types import Action, ActionType
+
+from coalesce import merge_run, plan_batch
+
+
+def action(kind, argument='', count=None):
+    return Action(type=kind, argument=argument, count=count)
+
+
+def summary(actions):
+    return [(a.type.value, a.argument, a.count) for a in actions]
+
+
+def test_merge_run_joins_adjacent_typing():
+    merged = merge_run([action(ActionType.TYPE, 'ab'), action(ActionType.TYPE, 'c', 2)])
+    assert summary(merged) == [('type', 'abcc', 1)]
+
+
+def test_merge_run_repeats_single_key():
+    merged = merge_run([action(ActionType.HOTKEY, 'tab'), action(ActionType.HOTKEY, 'tab', 2)])
+    assert summary(merged) == [('hotkey', 'tab', 3)]
+
+
+def test_merge_run_keeps_combinations_and_order():
+    actions = [action(ActionType.TYPE, 'a'), action(ActionType.HOTKEY, 'capslock'),
+               action(ActionType.TYPE, 'b'), action(ActionType.HOTKEY, 'ctrl+s'), action(ActionType.HOTKEY, 'ctrl+s')]
+    assert summary(merge_run(actions)) == [
+        ('type', 'a', None), ('hotkey', 'capslock', None), ('type', 'b', None),
+        ('hotkey', 'ctrl+s', None), ('hotkey', 'ctrl+s', None),
+    ]
+
+
+def test_merge_run_tolerates_missing_argument():
+    empty = Action.model_construct(type=ActionType.TYPE, argument=None, count=2)
+    merged = merge_run([empty, action(ActionType.TYPE, 'x')])
+    assert summary(merged) == [('type', 'x', 1)]
+
+
+def test_plan_batch_splits_at_other_actions():
+    actions = [action(ActionType.CLICK, '1, 2'), action(ActionType.TYPE, '20'), action(ActionType.HOTKEY, 'enter'),
+               action(ActionType.SCROLL, '5, 5, down'), action(ActionType.TYPE, 'x')]
+    runs = plan_batch(actions)
+    assert [(len(run), len(original), coalesced) for run, original, coalesced in runs] == [
+        (3, 3, True), (1, 1, False), (1, 1, False),
+    ]
+    assert runs[1][0][0].type == ActionType.SCROLL
+
+
+def test_plan_batch_caps_clicks_per_run():
+    clicks = [action(ActionType.CLICK, f"{i}, {i}") for i in range(5)]
+    runs = plan_batch(clicks, max_clicks=3)
+    assert [len(original) for _, original, _ in runs] == [3, 2]
+
+
+def test_plan_batch_merges_typing_in_a_run():
+    runs = plan_batch([action(ActionType.TYPE, 'a'), action(ActionType.TYPE, 'b')])
+    assert summary(runs[0][0]) == [('type', 'ab', 1)]
+    assert len(runs[0][1]) == 2
@@ -0,0 +1,72 @@
+import pytest
+from oagi.types import Action, ActionEvent, ActionType, LogEvent, SplitEvent
+
+from guidance_rules import GuidanceRules
+from helpers import descriptions, make_agent
+
+
+def click_event(error=None):
+    return ActionEvent(step_num=1, actions=[Action(type=ActionType.CLICK, argument='1, 2')], error=error)
+
+
+def test_matches_event_type_and_lower_cased_text():
+    rules = GuidanceRules([{'name': 'err', 'event': 'LogEvent', 'match': {'message': 'error'}, 'guidance': 'seen'}])
+    agent = make_agent('a')
+    assert rules.apply(LogEvent(message="An ERROR happened"), agent) == ['seen']
+    assert rules.apply(LogEvent(message="all good"), agent) == []
+    assert rules.apply(SplitEvent(label="error"), agent) == []
+
+
+def test_action_filter():
+    rules = GuidanceRules([{'event': 'ActionEvent', 'action': 'type', 'guidance': 'typed'}])
+    agent = make_agent('a')
+    assert rules.apply(click_event(), agent) == []
+    typed = ActionEvent(step_num=1, actions=[Action(type=ActionType.TYPE, argument='x')])
+    assert rules.apply(typed, agent) == ['typed']
+
+
+def test_every_pattern_must_match():
+    rules = GuidanceRules([{'event': 'ActionEvent', 'match': {'error': 'timeout', 'arguments': '^1'}, 'guidance': 'hit'}])
+    agent = make_agent('a')
+    assert rules.apply(click_event(error='Timeout'), agent) == ['hit']
+    assert rules.apply(click_event(error='denied'), agent) == []
+    assert rules.apply(click_event(), agent) == []
+
+
+def test_counters_and_match_in_guidance():
+    rules = GuidanceRules([{'event': 'LogEvent', 'match': {'message': r'error \d+'}, 'counter': 'errors',
+                            'guidance': "#{errors} ({match})"}])
+    agent = make_agent('a')
+    assert rules.apply(LogEvent(message="error 7"), agent) == ['#1 (error 7)']
+    assert rules.apply(LogEvent(message="error 8"), agent) == ['#2 (error 8)']
+
+
+def test_priority_orders_rules():
+    rules = GuidanceRules([{'name': 'low', 'guidance': 'low'}, {'name': 'high', 'guidance': 'high', 'priority': 5}])
+    assert rules.apply(LogEvent(message="x"), make_agent('a')) == ['high', 'low']
+
+
+def test_todo_edits_fire_once():
+    rules = GuidanceRules([{'event': 'LogEvent', 'match': {'message': 'dialog'}, 'insert_todos': ['close it', 'retry']}])
+    agent = make_agent('a', 'b', current=0)
+    assert len(rules.apply(LogEvent(message="dialog open"), agent)) == 1
+    rules.apply(LogEvent(message="dialog open"), agent)
+    assert descriptions(agent) == ['a', 'close it', 'retry', 'b']
+
+
+def test_match_on_current_todo():
+    rules = GuidanceRules([{'match': {'todo': 'sketch'}, 'guidance': 'sketching'}])
+    assert rules.apply(LogEvent(message="x"), make_agent('open', 'Sketch', current=1)) == ['sketching']
+    assert rules.apply(LogEvent(message="x"), make_agent('open', 'Sketch', current=0)) == []
+
+
+def test_rejects_bad_rules():
+    with pytest.raises(ValueError, match="lower case"):
+        GuidanceRules([{'match': {'message': 'Error'}}])
+    with pytest.raises(ValueError, match="unknown keys"):
+        GuidanceRules([{'guidence': 'typo'}])
+
+
+def test_default_rules_load():
+    rules = GuidanceRules.load()
+    assert rules.apply(SplitEvent(label="Start of todo 1: a"), make_agent('a')) == ["Starting new todo task."]
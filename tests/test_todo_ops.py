@@ -0,0 +1,67 @@
+import re
+
+from oagi.agent.tasker.models import TodoHistory, TodoStatus
+
+from helpers import descriptions, make_agent
+from todo_ops import insert_next, is_todo_end, mark_abandoned, pending_indices, prioritize, todo_number
+
+
+def test_todo_labels():
+    assert todo_number("Start of todo 3: open the sketch") == 3
+    assert todo_number("End of todo 12: done") == 12
+    assert todo_number("Planning") is None
+    assert is_todo_end("End of todo 1: x")
+    assert not is_todo_end("Start of todo 1: x")
+
+
+def test_insert_next_runs_after_current():
+    agent = make_agent('a', 'b', 'c', current=0)
+    assert insert_next(agent, 'new') == 1
+    assert descriptions(agent) == ['a', 'new', 'b', 'c']
+
+
+def test_insert_next_before_first_todo():
+    agent = make_agent('a', 'b')
+    assert insert_next(agent, 'new') == 0
+    assert descriptions(agent) == ['new', 'a', 'b']
+
+
+def test_insert_next_shifts_summaries_and_history():
+    agent = make_agent('a', 'b', 'c', current=0)
+    memory = agent.get_memory()
+    memory.todo_execution_summaries = {0: 'a done', 1: 'b done'}
+    memory.history = [TodoHistory(todo_index=0, todo='a', actions=[]),
+                      TodoHistory(todo_index=1, todo='b', actions=[])]
+    insert_next(agent, 'new')
+    assert memory.todo_execution_summaries == {0: 'a done', 2: 'b done'}
+    assert [h.todo_index for h in memory.history] == [0, 2]
+
+
+def test_prioritize_moves_matching_pending_todos():
+    agent = make_agent('a', 'sketch one', 'b', 'sketch two', current=0)
+    assert prioritize(agent, re.compile('sketch')) == 2
+    assert descriptions(agent) == ['a', 'sketch one', 'sketch two', 'b']
+
+
+def test_prioritize_leaves_current_and_finished_todos():
+    agent = make_agent('sketch done', 'b', 'sketch now', 'c', 'sketch later', current=2)
+    agent.get_memory().todos[0].status = TodoStatus.COMPLETED
+    agent.get_memory().todos[3].status = TodoStatus.SKIPPED
+    assert pending_indices(agent) == [4]
+    assert prioritize(agent, re.compile('sketch')) == 0
+    assert descriptions(agent) == ['sketch done', 'b', 'sketch now', 'c', 'sketch later']
+
+
+def test_prioritize_returns_zero_when_already_first():
+    agent = make_agent('sketch', 'b')
+    assert prioritize(agent, re.compile('sketch')) == 0
+
+
+def test_mark_abandoned_records_skip():
+    agent = make_agent('a', 'b', current=0)
+    memory = agent.get_memory()
+    memory.history = [TodoHistory(todo_index=0, todo='a', actions=[], completed=True)]
+    mark_abandoned(agent, 0, 'stuck')
+    assert memory.todos[0].status == TodoStatus.SKIPPED
+    assert memory.history[0].completed is False
+    assert memory.history[0].summary == 'stuck'
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""Per-todo step and time budgets, set in task definitions or learned from past runs.
+
+Usage:
+    python todo_budget.py runs/                        # learned budgets from every *.trace below runs/
+    python todo_budget.py a.trace b.trace --json budgets.json
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+
+from agent_trace import TraceReader, trace_paths
+from latency import percentile
+from observer_base import ObserverWrapper
+from todo_ops import TODO_START, TodoAbandoned, insert_next, is_todo_end, mark_abandoned
+
+# Set to skip, guide, fail or log to act when a todo overruns its budget (off by default)
+BUDGET_ENV = "FREECAD_AGENT_BUDGET"
+# Traces, directories of traces or budget JSON files (os.pathsep-separated) to learn budgets from
+BUDGET_HISTORY_ENV = "FREECAD_AGENT_BUDGET_HISTORY"
+
+POLICIES = ('skip', 'guide', 'fail', 'log')
+
+GUIDED_TODO = (
+    "{description} A previous attempt at this took more than {steps} steps without finishing. "
+    "Take the most direct route: use the menu entry or toolbar button for it rather than exploring, "
+    "and stop as soon as it is done."
+)
+
+
+class TodoBudgetExceeded(Exception):
+    """Raised from the step observer under the 'fail' policy.
+
+    TaskerAgent treats it like any other error in a todo: the todo stays
+    in progress and the run stops, so --resume starts it again.
+    """
+
+
+def completed_attempts(path):
+    """(description, steps, seconds) of each completed todo in a trace."""
+    attempts = []
+    current = None
+    with TraceReader(path) as reader:
+        for record in reader:
+            event_type = record.event_type
+            if event_type == 'StepEvent':
+                if current is not None:
+                    current[1] += 1
+            elif event_type == 'SplitEvent':
+                label = record.fields().get('label') or ''
+                match = TODO_START.match(label)
+                if match:
+                    current = [match.group(2), 0, record.timestamp]
+                elif is_todo_end(label) and current is not None:
+                    # Converted markdown logs carry no status; their todos ended normally
+                    if record.fields().get('status', 'completed') == 'completed':
+                        attempts.append((current[0], current[1], record.timestamp - current[2]))
+                    current = None
+        # The last record holds a view into the mapping, which must go before it closes
+        record = None
+    return attempts
+
+
+def learn_budgets(paths, q=90, slack=2.0, min_samples=3, min_steps=5, min_seconds=30.0):
+    """Budgets from the completed attempts of each todo in past runs.
+
+    A todo's budget is its q-th percentile steps and duration times
+    ``slack``. Todos with fewer than ``min_samples`` completed attempts
+    get no budget. Budget JSON files (as written by ``--json``) are merged
+    in as they are, and later files win.
+
+    Returns:
+        Dict mapping todo description to {'steps': n, 'seconds': s, 'samples': k}
+    """
+    samples = {}
+    loaded = {}
+    for path in trace_paths(paths):
+        if path.endswith('.json'):
+            with open(path) as f:
+                loaded.update(json.load(f))
+            continue
+        for description, steps, seconds in completed_attempts(path):
+            samples.setdefault(description, []).append((steps, seconds))
+
+    budgets = {}
+    for description, attempts in samples.items():
+        if len(attempts) < min_samples:
+            continue
+        steps = sorted(s for s, _ in attempts)
+        seconds = sorted(t for _, t in attempts)
+        budgets[description] = {
+            'steps': max(min_steps, math.ceil(percentile(steps, q) * slack)),
+            'seconds': round(max(min_seconds, percentile(seconds, q) * slack), 1),
+            'samples': len(attempts),
+        }
+    budgets.update(loaded)
+    return budgets
+
+
+class TodoBudget(ObserverWrapper):
+    """step_observer wrapper that stops a todo once it overruns its budget.
+
+    A budget is a number of steps, a number of seconds, or both, looked up
+    by todo description when the todo starts. Steps and elapsed time are
+    checked at every StepEvent. Todos without a budget run up to the
+    agent's ``max_steps`` as before.
+
+    Policies:
+        skip:  abandon the todo and move on
+        guide: abandon the todo and retry it once with guidance to take the
+               direct route (a retry that overruns is skipped)
+        fail:  raise TodoBudgetExceeded, which stops the run
+        log:   only report
+    """
+
+    def __init__(self, agent, budgets, policy='skip', verbose=True):
+        """Wrap the agent's step_observer.
+
+        Args:
+            agent: TaskerAgent whose step_observer is wrapped (set the observer first)
+            budgets: Dict mapping todo description to {'steps': n, 'seconds': s}
+            policy: 'skip', 'guide', 'fail' or 'log'
+            verbose: Print a line for each overrun
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown budget policy: {policy} (expected one of {', '.join(POLICIES)})")
+        self.agent = agent
+        self.wrap(agent)
+        self.budgets = dict(budgets)
+        self.policy = policy
+        self.verbose = verbose
+
+        self.budget = None
+        self.todo_steps = 0
+        self.todo_start = None
+        self.abandoning = None      # (todo index, reason) until its End SplitEvent
+        self.retried = set()
+
+        self.budgeted = 0
+        self.overruns = []          # (todo number, description, reason)
+        self.abandoned = []         # the overruns that were skipped or retried
+        self.steps_saved = 0
+        self.seconds_saved = 0.0
+
+    async def on_event(self, event):
+        event_type = type(event).__name__
+        if event_type == 'SplitEvent':
+            self._split(event.label or '')
+        await self.forward(event)
+        # Checked after the inner observer so it still sees the step that overran
+        if event_type == 'StepEvent' and self.budget is not None and self.abandoning is None:
+            self._step(event)
+
+    def _split(self, label):
+        match = TODO_START.match(label)
+        if match:
+            self.budget = self.budgets.get(match.group(2))
+            self.budgeted += self.budget is not None
+            self.todo_steps = 0
+            self.todo_start = time.perf_counter()
+        elif is_todo_end(label):
+            if self.abandoning is not None:
+                index, reason = self.abandoning
+                mark_abandoned(self.agent, index, reason)
+                self.abandoning = None
+            self.budget = None
+
+    def _step(self, event):
+        self.todo_steps += 1
+        if getattr(event.step, 'stop', False):
+            return
+        elapsed = time.perf_counter() - self.todo_start
+        max_steps = self.budget.get('steps')
+        max_seconds = self.budget.get('seconds')
+        if max_steps and self.todo_steps >= max_steps:
+            self._overrun(f"{self.todo_steps} steps (budget {max_steps})", elapsed)
+        elif max_seconds and elapsed >= max_seconds:
+            self._overrun(f"{elapsed:.0f}s (budget {max_seconds:.0f}s)", elapsed)
+
+    def _overrun(self, reason, elapsed):
+        index = getattr(self.agent, 'current_todo_index', -1)
+        todos = self.agent.get_memory().todos
+        if not 0 <= index < len(todos):
+            return
+        description = todos[index].description
+        self.overruns.append((index + 1, description, reason))
+        budget, self.budget = self.budget, None
+
+        if self.policy == 'log':
+            self._log(f"todo {index + 1} overran its budget: {reason}")
+            return
+        if self.policy == 'fail':
+            self._log(f"todo {index + 1} overran its budget: {reason}; stopping the run")
+            raise TodoBudgetExceeded(f"Todo {index + 1} overran its budget: {reason}")
+
+        self.abandoning = (index, f"Abandoned: over budget after {reason}")
+        self.abandoned.append((index + 1, description, reason))
+
+        max_steps = getattr(self.agent, 'max_steps', 0)
+        saved = max(0, max_steps - self.todo_steps)
+        mean = elapsed / self.todo_steps
+        self.steps_saved += saved
+        self.seconds_saved += saved * mean
+
+        if self.policy == 'guide' and description not in self.retried:
+            guided = GUIDED_TODO.format(description=description, steps=self.todo_steps)
+            self.retried.update((description, guided))
+            self.budgets[guided] = budget
+            insert_next(self.agent, guided)
+            action = "retrying it once with guidance"
+        else:
+            action = "skipping it"
+        self._log(f"todo {index + 1} overran its budget ({reason}); {action}. "
+                  f"Saved up to {saved} steps (~{saved * mean:.0f}s)")
+        raise TodoAbandoned(self.abandoning[1])
+
+    def _log(self, message):
+        if self.verbose:
+            print(f"\n[BUDGET] {message}")
+
+    def print_summary(self):
+        """Print overruns and the steps and time stopping them saved."""
+        if not self.budgeted:
+            return
+        print(f"Todo budgets: {self.budgeted} todos budgeted, {len(self.overruns)} overran ({self.policy})")
+        for number, description, reason in self.overruns:
+            print(f"  todo {number}: {reason} - {description[:60]}")
+        if self.steps_saved:
+            print(f"  Saved up to {self.steps_saved} steps (~{self.seconds_saved:.0f}s at the overrun todos' step time)")
+
+
+def maybe_budget(agent, budgets=None, **kwargs):
+    """Attach a TodoBudget when FREECAD_AGENT_BUDGET names a policy (unset or 'off' disables it).
+
+    Budgets learned from FREECAD_AGENT_BUDGET_HISTORY are used for todos
+    that the task definition gives no budget.
+
+    Args:
+        agent: TaskerAgent whose step_observer is wrapped
+        budgets: Budgets from the task definition (task_defs.load_task()['budgets'])
+
+    Returns:
+        The TodoBudget, or None when disabled or no todo has a budget
+    """
+    policy = os.environ.get(BUDGET_ENV, "").strip().lower()
+    if policy in ('', 'off'):
+        return None
+    history = [path for path in os.environ.get(BUDGET_HISTORY_ENV, "").split(os.pathsep) if path]
+    merged = learn_budgets(history) if history else {}
+    merged.update(budgets or {})
+    if not merged:
+        return None
+    return TodoBudget(agent, merged, policy=policy, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('paths', nargs='+', help="trace files or directories of traces")
+    parser.add_argument('--percentile', type=float, default=90, help="percentile of completed attempts")
+    parser.add_argument('--slack', type=float, default=2.0, help="budget = percentile x slack")
+    parser.add_argument('--min-samples', type=int, default=3, help="completed attempts needed for a budget")
+    parser.add_argument('--json', help="write the budgets here (usable as FREECAD_AGENT_BUDGET_HISTORY)")
+    args = parser.parse_args()
+
+    budgets = learn_budgets(args.paths, q=args.percentile, slack=args.slack, min_samples=args.min_samples)
+    if not budgets:
+        print(f"No todo has {args.min_samples} completed attempts in these runs")
+        return
+    print(f"{'samples':>8}{'steps':>7}{'seconds':>9}  todo")
+    for description, budget in sorted(budgets.items(), key=lambda item: -item[1].get('steps', 0)):
+        print(f"{budget.get('samples', 0):>8}{budget.get('steps', 0):>7}{budget.get('seconds', 0):>9.0f}  {description[:70]}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(budgets, f, indent=2)
+        print(f"Budgets written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Helpers for editing a running TaskerAgent's todo list."""
+
+import re
+
+from oagi.agent.tasker.models import Todo, TodoStatus
+
+# TaskerAgent's SplitEvent labels around each todo: "Start of todo N: description"
+# and "End of todo N: description"
+TODO_START = re.compile(r"Start of todo (\d+): (.*)", re.DOTALL)
+TODO_END = re.compile(r"End of todo (\d+): (.*)", re.DOTALL)
+
+
+def current_index(agent):
+    """Index of the todo being executed, or -1 before the first one starts."""
+    index = getattr(agent, 'current_todo_index', -1)
+    return -1 if index is None else index
+
+
+def is_todo_end(label):
+    """Whether a SplitEvent label marks the end of a todo."""
+    return TODO_END.match(label or '') is not None
+
+
+def todo_number(label):
+    """Todo number (1-based) of a start or end of todo label, or None."""
+    match = TODO_START.match(label or '') or TODO_END.match(label or '')
+    return int(match.group(1)) if match else None
+
+
+def pending_indices(agent):
+    """Indices of the pending todos after the current one, in execution order."""
+    todos = agent.get_memory().todos
+    return [i for i in range(current_index(agent) + 1, len(todos)) if todos[i].status == TodoStatus.PENDING]
+
+
+def insert_next(agent, description):
+    """Insert a todo so it runs right after the current one.
+
+    Returns:
+        Index of the new todo
+    """
+    memory = agent.get_memory()
+    index = current_index(agent) + 1
+    memory.todos.insert(index, Todo(description=description))
+    # Summaries and history refer to todos by position; keep later ones with their todos
+    memory.todo_execution_summaries = {
+        (i + 1 if i >= index else i): summary for i, summary in memory.todo_execution_summaries.items()
+    }
+    for history in memory.history:
+        if history.todo_index >= index:
+            history.todo_index += 1
+    return index
+
+
+def prioritize(agent, pattern):
+    """Move pending todos whose description matches pattern to the front of the queue.
+
+    Args:
+        agent: The running TaskerAgent
+        pattern: Compiled regular expression searched in each description
+
+    Returns:
+        Number of todos moved
+    """
+    todos = agent.get_memory().todos
+    slots = pending_indices(agent)
+    matched = [i for i in slots if pattern.search(todos[i].description)]
+    if not matched or matched == slots[:len(matched)]:
+        return 0
+    order = matched + [i for i in slots if i not in matched]
+    reordered = [todos[i] for i in order]
+    for slot, todo in zip(slots, reordered):
+        todos[slot] = todo
+    return len(matched)
+
+
+class TodoAbandoned(Exception):
+    """Raised from the step observer to leave the running todo.
+
+    TaskeeAgent handles it like any error in a todo: the todo ends without
+    success, no "Completed todo" summary is written and agent.execute()
+    returns False. Call ``mark_abandoned`` at the todo's 'End of todo'
+    SplitEvent so TaskerAgent records it as skipped and moves on to the
+    next todo instead of stopping the run.
+    """
+
+
+def mark_abandoned(agent, index, reason):
+    """Record an abandoned todo as skipped, with reason as its summary."""
+    memory = agent.get_memory()
+    memory.update_todo(index, TodoStatus.SKIPPED, summary=reason)
+    for history in reversed(memory.history):
+        if history.todo_index == index:
+            history.completed = False
+            history.summary = reason
+            break
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""Cross-run analytics over agent traces (see agent_trace.py).
+
+Loads any number of traces into NumPy columns and reports, per todo
+phrasing, how many steps it takes, how often it fails or is retried, what
+injected guidance changes, and where the wall time goes. The phrasings
+are ranked by wasted steps: every step beyond the fastest completed
+attempt at the same todo, plus all steps of attempts that never completed.
+
+Usage:
+    python trace_analytics.py runs/                  # every *.trace in the directory
+    python trace_analytics.py a.trace b.trace --top 10 --json report.json
+
+Requires NumPy (pip install numpy).
+"""
+
+import argparse
+import json
+import sys
+
+from agent_trace import FLAG_ERROR, RECORD, TYPE_CODES, TraceReader, trace_paths
+from todo_ops import TODO_START, is_todo_end
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+STEP = TYPE_CODES['StepEvent']
+ACTION = TYPE_CODES['ActionEvent']
+PLAN = TYPE_CODES['PlanEvent']
+SPLIT = TYPE_CODES['SplitEvent']
+
+# Time since the previous event, attributed to the event that ends the wait
+PHASES = (('model', STEP), ('action', ACTION), ('planning', PLAN))
+
+OUTCOMES = ('completed', 'skipped', 'unfinished')
+
+if np is not None:
+    # Same layout as agent_trace.RECORD, minus the trailing text length
+    RECORD_DTYPE = np.dtype([
+        ('seq', '<u4'), ('type', 'u1'), ('flags', 'u1'), ('actions', '<u2'), ('time', '<f8'),
+        ('step', '<i4'), ('todo', '<i4'), ('digest', 'V32'), ('text_length', '<u4'),
+    ])
+    assert RECORD_DTYPE.itemsize == RECORD.size
+
+
+def _fixed_columns(reader):
+    """Gather every record's fixed part into one structured array.
+
+    One fancy-indexing pass over the mapped file; nothing is decoded per
+    record in Python.
+    """
+    offsets = np.array(reader.offsets, dtype=np.int64)
+    data = np.frombuffer(reader.buffer, dtype=np.uint8)
+    try:
+        rows = data[offsets[:, None] + np.arange(RECORD_DTYPE.itemsize)]
+    finally:
+        del data
+    return rows.view(RECORD_DTYPE).ravel()
+
+
+class RunSet:
+    """Columns for the records of many runs and the todo attempts in them.
+
+    Record columns (one entry per event): ``run``, ``type``, ``flags``,
+    ``time``, ``attempt``. Attempt columns (one entry per todo started):
+    ``attempt_run``, ``phrase``, ``steps``, ``errors``, ``seconds``,
+    ``outcome`` (index into OUTCOMES), ``added`` (todos added to the list
+    while it ran) and ``retry`` (the phrasing was already attempted in
+    that run). ``phrases`` maps phrase ids to todo text.
+    """
+
+    def __init__(self):
+        self.runs = []
+        self.phrases = []
+        self._phrase_ids = {}
+
+    def _phrase(self, text):
+        phrase = self._phrase_ids.get(text)
+        if phrase is None:
+            phrase = self._phrase_ids[text] = len(self.phrases)
+            self.phrases.append(text)
+        return phrase
+
+    @classmethod
+    def load(cls, paths):
+        """Read the traces at the given paths."""
+        runs = cls()
+        columns = []
+        attempts = []
+        for path in paths:
+            with TraceReader(path) as reader:
+                records = _fixed_columns(reader)
+                split_rows = np.flatnonzero(records['type'] == SPLIT)
+                splits = [reader[int(i)].fields() for i in split_rows]
+            run = len(runs.runs)
+            info = next((fields for fields in splits if 'task' in fields), {})
+            runs.runs.append({'path': path, 'task': info.get('task'), 'script': info.get('script')})
+            columns.append((run, records))
+            attempts.append(runs._attempts(run, split_rows, splits))
+        runs._build(columns, attempts)
+        return runs
+
+    def _attempts(self, run, split_rows, splits):
+        """Todo attempts of one run from its SplitEvents (a few per todo)."""
+        starts, phrases, outcomes, added = [], [], [], []
+        seen = set()
+        retries = []
+        for row, fields in zip(split_rows, splits):
+            label = fields.get('label') or ''
+            match = TODO_START.match(label)
+            if match:
+                phrase = self._phrase(match.group(2))
+                starts.append(row)
+                phrases.append(phrase)
+                outcomes.append(OUTCOMES.index('unfinished'))
+                added.append(-fields.get('todos', 0))
+                retries.append(phrase in seen)
+                seen.add(phrase)
+            elif is_todo_end(label) and starts:
+                # Converted markdown logs carry no status; their todos ended normally
+                status = fields.get('status', 'completed')
+                outcomes[-1] = OUTCOMES.index(status) if status in OUTCOMES else OUTCOMES.index('unfinished')
+                added[-1] = added[-1] + fields['todos'] if 'todos' in fields else 0
+        # An attempt without an End split never recorded its list length
+        added = [max(0, a) for a in added]
+        return starts, phrases, outcomes, added, retries
+
+    def _build(self, columns, attempts):
+        runs = [np.full(len(records), run, dtype=np.int32) for run, records in columns]
+        records = np.concatenate([records for _, records in columns]) if columns else np.zeros(0, RECORD_DTYPE)
+        self.run = np.concatenate(runs) if runs else np.zeros(0, np.int32)
+        self.type = records['type']
+        self.flags = records['flags']
+        self.time = records['time']
+
+        # Every record belongs to the latest todo started in its run (-1 before the first)
+        run_start = np.cumsum([0] + [len(r) for r in runs])
+        attempt_run, phrase, outcome, added, retry = [], [], [], [], []
+        attempt = np.full(len(self.run), -1, dtype=np.int64)
+        for run, (starts, phrases, outcomes, added_todos, retries) in enumerate(attempts):
+            if starts:
+                first = len(attempt_run)
+                begin, end = run_start[run], run_start[run + 1]
+                marks = np.zeros(end - begin, dtype=np.int64)
+                marks[np.asarray(starts)] = 1
+                attempt[begin:end] = np.cumsum(marks) - 1 + first
+                attempt[begin:begin + starts[0]] = -1
+            attempt_run.extend([run] * len(starts))
+            phrase.extend(phrases)
+            outcome.extend(outcomes)
+            added.extend(added_todos)
+            retry.extend(retries)
+        self.attempt = attempt
+
+        count = len(attempt_run)
+        self.attempt_run = np.asarray(attempt_run, dtype=np.int32)
+        self.phrase = np.asarray(phrase, dtype=np.int32)
+        self.outcome = np.asarray(outcome, dtype=np.int8)
+        self.added = np.asarray(added, dtype=np.int32)
+        self.retry = np.asarray(retry, dtype=bool)
+
+        owned = attempt >= 0
+        self.steps = np.bincount(attempt[owned & (self.type == STEP)], minlength=count)
+        failed_actions = owned & (self.type == ACTION) & ((self.flags & FLAG_ERROR) != 0)
+        self.errors = np.bincount(attempt[failed_actions], minlength=count)
+        first = np.full(count, np.inf)
+        last = np.full(count, -np.inf)
+        np.minimum.at(first, attempt[owned], self.time[owned])
+        np.maximum.at(last, attempt[owned], self.time[owned])
+        self.seconds = np.where(np.isfinite(first), last - first, 0.0)
+
+    def phase_durations(self):
+        """{phase: array of seconds} from consecutive events of the same run."""
+        gaps = np.diff(self.time)
+        same_run = self.run[1:] == self.run[:-1]
+        kind = self.type[1:]
+        return {name: gaps[same_run & (kind == code)] for name, code in PHASES}
+
+    def phrase_table(self):
+        """Per-phrasing aggregates as a dict of columns, ranked by wasted steps."""
+        phrases = len(self.phrases)
+        phrase = self.phrase
+        completed = self.outcome == OUTCOMES.index('completed')
+        guided = self.added > 0
+
+        def total(weights=None, mask=None):
+            if mask is None:
+                return np.bincount(phrase, weights, minlength=phrases)
+            return np.bincount(phrase[mask], None if weights is None else weights[mask], minlength=phrases)
+
+        attempts = total()
+        steps = total(self.steps)
+        best = np.full(phrases, np.inf)
+        np.minimum.at(best, phrase[completed], self.steps[completed])
+        # Attempts that never completed waste all their steps
+        baseline = np.where(completed, best[phrase], 0)
+        baseline = np.where(np.isfinite(baseline), baseline, 0)
+        wasted = total(self.steps - baseline)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            table = {
+                'phrase': np.arange(phrases),
+                'attempts': attempts.astype(int),
+                'runs': np.bincount(np.unique(phrase.astype(np.int64) * len(self.runs) + self.attempt_run)
+                                    // max(len(self.runs), 1), minlength=phrases),
+                'mean_steps': steps / attempts,
+                'best_steps': np.where(np.isfinite(best), best, np.nan),
+                'wasted_steps': wasted,
+                'failure_rate': total(mask=~completed) / attempts,
+                'retry_rate': total(mask=self.retry) / attempts,
+                'error_rate': total(self.errors) / steps,
+                'mean_seconds': total(self.seconds) / attempts,
+                'guided_attempts': total(mask=guided).astype(int),
+                'guided_mean_steps': total(self.steps, guided) / total(mask=guided),
+                'unguided_mean_steps': total(self.steps, ~guided) / total(mask=~guided),
+            }
+        order = np.argsort(-table['wasted_steps'], kind='stable')
+        return {name: column[order] for name, column in table.items()}
+
+    def script_table(self):
+        """Per-script totals: runs, steps, completion and time."""
+        scripts = [run['script'] or '?' for run in self.runs]
+        names = sorted(set(scripts))
+        script_of_run = np.array([names.index(s) for s in scripts], dtype=np.int32)
+        script = script_of_run[self.attempt_run]
+        completed = self.outcome == OUTCOMES.index('completed')
+        guided = np.bincount(self.attempt_run, self.added, minlength=len(self.runs)) > 0
+        count = len(names)
+        runs = np.bincount(script_of_run, minlength=count)
+        attempts = np.bincount(script, minlength=count)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return {
+                'script': names,
+                'runs': runs,
+                'steps_per_run': np.bincount(script, self.steps, minlength=count) / runs,
+                'completion_rate': np.bincount(script[completed], minlength=count) / attempts,
+                'guided_runs': np.bincount(script_of_run[guided], minlength=count),
+                'seconds_per_run': np.bincount(script, self.seconds, minlength=count) / runs,
+            }
+
+    def guidance_effect(self):
+        """Compare runs that had todos added during the run with runs that did not."""
+        per_run_added = np.bincount(self.attempt_run, self.added, minlength=len(self.runs))
+        per_run_steps = np.bincount(self.attempt_run, self.steps, minlength=len(self.runs))
+        completed = np.bincount(self.attempt_run, self.outcome == OUTCOMES.index('completed'),
+                                minlength=len(self.runs))
+        attempts = np.bincount(self.attempt_run, minlength=len(self.runs))
+        effect = {}
+        for name, mask in (('guided', per_run_added > 0), ('unguided', per_run_added == 0)):
+            if mask.any():
+                effect[name] = {
+                    'runs': int(mask.sum()),
+                    'todos_added': int(per_run_added[mask].sum()),
+                    'steps_per_run': float(per_run_steps[mask].mean()),
+                    'completion_rate': float(completed[mask].sum() / max(attempts[mask].sum(), 1)),
+                }
+        return effect
+
+
+def _fmt(value, digits=1):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return '-'
+    if isinstance(value, (float, np.floating)):
+        return f"{value:.{digits}f}"
+    return str(value)
+
+
+def _percent(rate):
+    return '-' if rate is None else f"{rate * 100:.0f}"
+
+
+def _shorten(text, width):
+    return text if len(text) <= width else text[:width - 3] + '...'
+
+
+def report(runs, top=15):
+    """Print the analysis; return it as a JSON-serializable dict."""
+    steps = int(runs.steps.sum())
+    print(f"{len(runs.runs)} runs, {len(runs.attempt_run)} todo attempts, {steps} steps, "
+          f"{len(runs.phrases)} distinct todos")
+
+    print(f"\nTodos ranked by wasted steps (top {top}):")
+    print(f"  {'wasted':>7} {'tries':>6} {'steps':>6} {'best':>5} {'fail%':>6} {'retry%':>7} "
+          f"{'err%':>5} {'secs':>6} {'guided':>13}  todo")
+    table = runs.phrase_table()
+    rows = []
+    for i in range(len(table['phrase'])):
+        # NaN (no attempts of that kind) becomes None, i.e. null in the JSON report
+        row = {name: None if column[i] != column[i] else column[i].item() for name, column in table.items()}
+        row['todo'] = runs.phrases[row.pop('phrase')]
+        rows.append(row)
+    for row in rows[:top]:
+        guided = (f"{_fmt(row['guided_mean_steps'])} vs {_fmt(row['unguided_mean_steps'])}"
+                  if row['guided_attempts'] else '-')
+        print(f"  {row['wasted_steps']:>7.0f} {row['attempts']:>6} {_fmt(row['mean_steps']):>6} "
+              f"{_fmt(row['best_steps'], 0):>5} {_percent(row['failure_rate']):>6} "
+              f"{_percent(row['retry_rate']):>7} {_percent(row['error_rate']):>5} "
+              f"{_fmt(row['mean_seconds']):>6} {guided:>13}  {_shorten(row['todo'], 60)}")
+    if rows and any(row['guided_attempts'] for row in rows):
+        print("  (guided: mean steps of attempts during which todos were added vs. the others)")
+
+    phases = {}
+    print("\nPhase latency (seconds between events):")
+    print(f"  {'phase':<10}{'count':>8}{'p50':>8}{'p95':>8}{'p99':>8}{'total':>10}")
+    for name, values in runs.phase_durations().items():
+        if not len(values):
+            continue
+        p50, p95, p99 = np.percentile(values, (50, 95, 99))
+        phases[name] = {'count': len(values), 'p50': p50, 'p95': p95, 'p99': p99, 'total': values.sum()}
+        print(f"  {name:<10}{len(values):>8}{p50:>8.2f}{p95:>8.2f}{p99:>8.2f}{values.sum():>10.1f}")
+
+    scripts = runs.script_table()
+    print("\nBy script:")
+    print(f"  {'script':<26}{'runs':>6}{'steps/run':>11}{'done%':>7}{'guided':>8}{'secs/run':>10}")
+    for i, name in enumerate(scripts['script']):
+        print(f"  {name:<26}{scripts['runs'][i]:>6}{_fmt(scripts['steps_per_run'][i]):>11}"
+              f"{_fmt(scripts['completion_rate'][i] * 100, 0):>7}{scripts['guided_runs'][i]:>8}"
+              f"{_fmt(scripts['seconds_per_run'][i]):>10}")
+
+    effect = runs.guidance_effect()
+    if 'guided' in effect:
+        print("\nGuidance (runs where guidance or stuck recovery added todos):")
+        for name, values in effect.items():
+            print(f"  {name:<9} {values['runs']:>5} runs, {values['todos_added']:>4} todos added, "
+                  f"{values['steps_per_run']:.1f} steps/run, {values['completion_rate'] * 100:.0f}% of todos completed")
+
+    return {
+        'runs': len(runs.runs),
+        'attempts': len(runs.attempt_run),
+        'steps': steps,
+        'todos': rows,
+        'phases': {name: {k: float(v) for k, v in values.items()} for name, values in phases.items()},
+        'scripts': [{name: (column[i] if name == 'script' else column[i].item()) for name, column in scripts.items()}
+                    for i in range(len(scripts['script']))],
+        'guidance': effect,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-run analytics over agent traces.")
+    parser.add_argument('traces', nargs='+', help="trace files or directories of *.trace files")
+    parser.add_argument('--top', type=int, default=15, help="todos to list (default: 15)")
+    parser.add_argument('--json', metavar='PATH', help="also write the full report as JSON")
+    args = parser.parse_args()
+
+    if np is None:
+        print("trace_analytics.py needs NumPy: pip install numpy", file=sys.stderr)
+        return 1
+    paths = trace_paths(args.traces)
+    if not paths:
+        print("No traces found", file=sys.stderr)
+        return 1
+
+    result = report(RunSet.load(paths), top=args.top)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=1)
+        print(f"\nReport written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+"""Trajectory replay cache that skips model calls on screens seen in successful runs."""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import time
+
+from PIL import Image as PILImageLib
+
+from oagi.agent.tasker.models import TodoStatus
+from oagi.types import Step
+
+from observer_base import ObserverWrapper
+from todo_ops import is_todo_end
+
+# Cache file path, e.g. FREECAD_AGENT_TRAJECTORY_CACHE=trajectory_cache.json
+CACHE_ENV = "FREECAD_AGENT_TRAJECTORY_CACHE"
+
+CACHE_VERSION = 1
+
+
+def dhash(image, size=8):
+    """64-bit difference hash of a PIL image.
+
+    Robust to small rendering differences and re-encoding, but changes
+    when dialogs open or geometry appears.
+    """
+    small = image.convert('L').resize((size + 1, size), PILImageLib.Resampling.BOX)
+    pixels = small.tobytes()
+    bits = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for col in range(size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return bits
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+class CacheEntry:
+    """One recorded model response for a (todo, screen) pair."""
+
+    __slots__ = ('phash', 'step', 'seconds', 'hits')
+
+    def __init__(self, phash, step, seconds=0.0, hits=0):
+        self.phash = phash
+        self.step = step
+        self.seconds = seconds   # model time it took to produce the step
+        self.hits = hits
+
+
+class CachingActor:
+    """AsyncActor wrapper that answers from the cache when the screen matches."""
+
+    def __init__(self, cache, actor):
+        self.cache = cache
+        self.actor = actor
+
+    def __getattr__(self, name):
+        return getattr(self.actor, name)
+
+    async def step(self, screenshot, instruction=None):
+        step = self.cache.lookup()
+        if step is not None:
+            return step
+        start = time.perf_counter()
+        step = await self.actor.step(screenshot, instruction=instruction)
+        self.cache.record(step, time.perf_counter() - start)
+        return step
+
+
+class CacheObserver(ObserverWrapper):
+    """step_observer wrapper that commits or evicts trajectories when a todo ends."""
+
+    def __init__(self, observer, cache):
+        super().__init__(observer)
+        self.cache = cache
+
+    async def on_event(self, event):
+        event_type = type(event).__name__
+        if event_type == 'SplitEvent' and is_todo_end(event.label):
+            self.cache.finish_todo()
+        elif event_type == 'StepEvent' and not self.cache.actors and not self.cache.bypassed:
+            self.cache.bypassed = True
+            print("[CACHE] Steps are not going through the cache: TaskeeAgent's AsyncActor was "
+                  "replaced after TrajectoryCache.installed() was entered, or it was never entered")
+        await self.forward(event)
+
+
+class TrajectoryCache:
+    """Image provider wrapper that replays known-good model responses.
+
+    Each capture is hashed (dHash); when the current todo already has a
+    recorded response for a screen within ``max_distance`` bits, the actor
+    returns it without calling the model. Responses from the model are
+    kept per todo and written to the cache only when that todo completes;
+    entries replayed in a todo that does not complete are evicted.
+
+    The model's own task history does not include replayed steps, so a
+    todo that mixes replayed and live steps gives the model less context
+    than a fully live one.
+    """
+
+    def __init__(self, provider, agent, path=None, max_distance=4, max_repeats=2, verbose=True):
+        """Wrap an image provider.
+
+        Args:
+            provider: The wrapped image provider
+            agent: TaskerAgent whose todos key the cache
+            path: JSON file to load the cache from and save it to (None keeps it in memory)
+            max_distance: Largest hash distance (bits) treated as the same screen
+            max_repeats: Consecutive replays of one entry before asking the model
+            verbose: Print a line for each replayed step
+        """
+        self.provider = provider
+        self.agent = agent
+        self.path = path
+        self.max_distance = max_distance
+        self.max_repeats = max_repeats
+        self.verbose = verbose
+
+        self.entries = {}        # todo text -> list of CacheEntry
+        self._phash = None       # hash of the latest capture
+        self._pending = []       # (phash, step, seconds) answered by the model in this todo
+        self._replayed = []      # entries replayed in this todo
+        self._last_entry = None
+        self._repeats = 0
+
+        self.actors = 0           # actors created while installed
+        self.bypassed = False
+        self._installed = False
+
+        self.lookups = 0
+        self.hits = 0
+        self.evictions = 0
+        self.saved_seconds = 0.0
+        self.model_steps = 0
+        self.model_seconds = 0.0
+
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __getattr__(self, name):
+        return getattr(self.provider, name)
+
+    @contextlib.contextmanager
+    def installed(self):
+        """Route TaskeeAgent's AsyncActor through the cache while the block runs.
+
+        The actor in place on entry is wrapped and put back on exit, so
+        enter this inside ``ScriptedModel.installed()`` when both are used.
+        Entering it again while installed does nothing.
+        """
+        if self._installed:
+            yield self
+            return
+        from oagi.agent.tasker import taskee_agent
+
+        original = taskee_agent.AsyncActor
+
+        def actor(**kwargs):
+            self.actors += 1
+            return CachingActor(self, original(**kwargs))
+
+        taskee_agent.AsyncActor = actor
+        self._installed = True
+        try:
+            yield self
+        finally:
+            taskee_agent.AsyncActor = original
+            self._installed = False
+
+    async def __call__(self):
+        captured = await self.provider()
+        image = getattr(captured, 'image', None)
+        if image is None and hasattr(captured, 'read'):
+            image = PILImageLib.open(io.BytesIO(captured.read()))
+        if image is None:
+            self._phash = None
+        else:
+            loop = asyncio.get_running_loop()
+            self._phash = await loop.run_in_executor(None, dhash, image)
+        return captured
+
+    def _todo(self):
+        index = getattr(self.agent, 'current_todo_index', -1)
+        todos = self.agent.get_memory().todos
+        if index is None or not 0 <= index < len(todos):
+            return None
+        return todos[index].description
+
+    def lookup(self):
+        """Return a cached Step for the current todo and screen, or None."""
+        todo = self._todo()
+        if todo is None or self._phash is None:
+            return None
+        self.lookups += 1
+        best = None
+        for entry in self.entries.get(todo, ()):
+            distance = hamming(entry.phash, self._phash)
+            if distance <= self.max_distance and (best is None or distance < best[0]):
+                best = (distance, entry)
+        if best is None:
+            self._last_entry = None
+            return None
+
+        entry = best[1]
+        if entry is self._last_entry:
+            self._repeats += 1
+            if self._repeats >= self.max_repeats:
+                # The screen is not changing; let the model look at it
+                self._last_entry = None
+                return None
+        else:
+            self._repeats = 0
+        self._last_entry = entry
+
+        entry.hits += 1
+        self.hits += 1
+        self.saved_seconds += entry.seconds
+        self._replayed.append(entry)
+        if self.verbose:
+            actions = ', '.join(f"{a.type.value} {a.argument}" for a in entry.step.actions)
+            print(f"[CACHE] Replaying ({best[0]} bits off): {actions}")
+        return entry.step
+
+    def record(self, step, seconds):
+        """Remember a model response until the todo's outcome is known."""
+        self.model_steps += 1
+        self.model_seconds += seconds
+        self._last_entry = None
+        if self._phash is not None:
+            self._pending.append((self._phash, step, seconds))
+
+    def finish_todo(self):
+        """Commit the todo's model responses on success, evict its replays on failure."""
+        todo = self._todo()
+        if todo is not None:
+            status = self.agent.get_memory().todos[self.agent.current_todo_index].status
+            if status == TodoStatus.COMPLETED:
+                entries = self.entries.setdefault(todo, [])
+                for phash, step, seconds in self._pending:
+                    if not any(hamming(entry.phash, phash) <= self.max_distance for entry in entries):
+                        entries.append(CacheEntry(phash, step, seconds))
+                if self._pending and self.path:
+                    self.save(self.path)
+            else:
+                self._evict(self._replayed)
+        self._pending = []
+        self._replayed = []
+        self._last_entry = None
+        self._repeats = 0
+
+    def _evict(self, evicted):
+        if not evicted:
+            return
+        evicted = {id(entry) for entry in evicted}
+        for todo, entries in self.entries.items():
+            kept = [entry for entry in entries if id(entry) not in evicted]
+            self.evictions += len(entries) - len(kept)
+            self.entries[todo] = kept
+        if self.path:
+            self.save(self.path)
+
+    def load(self, path):
+        """Load entries saved by a previous run."""
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('version') != CACHE_VERSION:
+            return
+        for todo, records in data.get('todos', {}).items():
+            self.entries[todo] = [
+                CacheEntry(int(r['hash'], 16), Step.model_validate(r['step']), r.get('seconds', 0.0), r.get('hits', 0))
+                for r in records
+            ]
+
+    def save(self, path):
+        """Write all entries as JSON."""
+        data = {
+            'version': CACHE_VERSION,
+            'todos': {
+                todo: [{'hash': f"{e.phash:016x}", 'step': e.step.model_dump(mode='json'),
+                         'seconds': round(e.seconds, 3), 'hits': e.hits}
+                       for e in entries]
+                for todo, entries in self.entries.items() if entries
+            },
+        }
+        # Batch workers can share one cache file
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def print_summary(self):
+        """Print hit rate and the model time the hits saved."""
+        if hasattr(self.provider, 'print_summary'):
+            self.provider.print_summary()
+        if not self.lookups:
+            return
+        mean = self.model_seconds / self.model_steps if self.model_steps else 0.0
+        size = sum(len(entries) for entries in self.entries.values())
+        print(f"Trajectory cache: {self.hits}/{self.lookups} hits ({self.hits / self.lookups:.0%}), "
+              f"{self.evictions} evicted, {size} entries")
+        print(f"  Model steps: {self.model_steps} (avg {mean:.2f}s), "
+              f"~{self.saved_seconds:.1f}s of inference saved")
+
+
+def maybe_cache(provider, agent, **kwargs):
+    """Wrap provider in a TrajectoryCache when FREECAD_AGENT_TRAJECTORY_CACHE is set.
+
+    Call after the agent's step_observer is set, and run the agent inside
+    ``cache.installed()`` (build_pipeline() does both).
+
+    Args:
+        provider: The image provider to wrap
+        agent: The TaskerAgent being run
+        **kwargs: Extra TrajectoryCache options
+
+    Returns:
+        The cache, or the original provider when caching is off
+    """
+    path = os.environ.get(CACHE_ENV, "").strip()
+    if not path:
+        return provider
+    cache = TrajectoryCache(provider, agent, path, **kwargs)
+    agent.step_observer = CacheObserver(agent.step_observer, cache)
+    return cache